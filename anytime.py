@@ -0,0 +1,221 @@
+"""
+Anytime lineup solvers
+
+Every engine wraps one of the solvers behind the same interface. incumbents(deadline,
+bound) is a generator of (lineup, optimal) pairs, the best Lineup found so far and
+whether it is proven best. It yields at least every CHECK_SECONDS while it runs and
+stops by the deadline, a time.time(), or once it has nothing left to do. bound, if
+given, is a function returning the best value found elsewhere (see portfolio.py);
+an exact engine only searches for better teams, and optimal then means no team
+beats the better of its lineup and the bound, its lineup possibly being None.
+
+progress(time_budget) turns that into Progress tuples and run(time_budget,
+callback) calls the callback with each of them, so
+
+    engine = ENGINES['branch_bound'](names, classes, values, costs, capacity, composition)
+    progress = engine.run(5, callback=show)
+
+has a team after the first incumbent, usually within milliseconds, and the best one
+found at the deadline. The search is cancelled by returning False from the callback,
+or by leaving a loop over progress(), which closes the generator.
+
+The knapsack and the MILP are single calls and yield once; the knapsack cannot be
+stopped, the MILP is given the time left as its time limit.
+"""
+
+from collections import namedtuple
+import random
+import time
+
+from branch_bound import BranchAndBound
+from cooling import LinearCooling
+from knapsack import ModifiedKnapsack
+from mcmc import TeamMCMC
+from milp_solver import MILPSolver
+from tabu import TabuSearch
+
+# seconds between two incumbents of a running engine
+CHECK_SECONDS = 0.1
+
+# the best lineup so far, the seconds since the start and whether it is proven best
+Progress = namedtuple('Progress', ['lineup', 'elapsed', 'optimal'])
+
+
+class AnytimeSolver:
+    """
+    The shared part of the engines. An engine subclasses it and defines
+
+        incumbents(deadline, bound=None)
+
+    the generator of (lineup, optimal) pairs described at the top of the module,
+    which progress() and run() drive.
+    """
+
+    def __init__(self, names, classes, values, costs, capacity, composition):
+
+        self.names = list(names)
+        self.classes = list(classes)
+        self.values = list(values)
+        self.costs = list(costs)
+        self.capacity = capacity
+        self.composition = composition
+
+    def progress(self, time_budget):
+        """
+        :return a generator of Progress, one for every incumbent of the engine; the
+                lineup only changes when it gets better
+        """
+        start = time.time()
+        best = None
+        for lineup, optimal in self.incumbents(start + time_budget):
+            if lineup is not None and (best is None or lineup.value > best.value):
+                best = lineup
+            if best is not None:
+                yield Progress(best, time.time() - start, optimal)
+            if optimal:
+                return
+
+    def run(self, time_budget, callback=None, interval=1.0):
+        """
+        Function: run
+        -----------------
+        Searches for time_budget seconds or until the lineup is proven best.
+
+        Parameters:
+            :param time_budget: seconds to search
+            :param callback: function (Progress) called on every better lineup and
+                             at least every interval seconds; returning False
+                             cancels the search
+            :param interval: seconds between callbacks when nothing improves
+
+        :return the last Progress, or None if no lineup was found
+        """
+        last = None
+        reported = 0.0
+        generator = self.progress(time_budget)
+        for progress in generator:
+            improved = last is None or progress.lineup.value > last.lineup.value
+            last = progress
+            if callback is None:
+                continue
+            if improved or progress.optimal or progress.elapsed - reported >= interval:
+                reported = progress.elapsed
+                if callback(progress) is False:
+                    generator.close()
+                    break
+        return last
+
+
+class AnnealingEngine(AnytimeSolver):
+    # simulated annealing restarts from random teams until the deadline, nothing if
+    # no team fits under the cap
+
+    def __init__(self, names, classes, values, costs, capacity, composition, schedule=None, seed=None):
+
+        AnytimeSolver.__init__(self, names, classes, values, costs, capacity, composition)
+        self.mcmc = TeamMCMC(names, classes, values, costs, capacity, composition)
+        self.schedule = schedule if schedule is not None else LinearCooling()
+        self.seed = seed
+
+    def incumbents(self, deadline, bound=None):
+        if self.seed is not None:
+            random.seed(self.seed)
+        mcmc = self.mcmc
+        best = None
+        checked = time.time()
+        while checked < deadline:
+            if not mcmc.make_random_team():
+                return
+            temp = self.schedule.start()
+            while temp is not None:
+                accepted = mcmc.step(temp)
+                if accepted is None:
+                    break
+                if best is None or mcmc.current_value > best.value:
+                    best = mcmc.get_lineup()
+                now = time.time()
+                if now - checked >= CHECK_SECONDS:
+                    checked = now
+                    yield best, False
+                    if now >= deadline:
+                        return
+                temp = self.schedule.cool(temp, accepted)
+            checked = time.time()
+            yield best, False
+
+
+class TabuEngine(AnytimeSolver):
+    # one deterministic tabu search, which may finish before the deadline
+
+    def __init__(self, names, classes, values, costs, capacity, composition, iterations=1000, patience=100):
+
+        AnytimeSolver.__init__(self, names, classes, values, costs, capacity, composition)
+        self.tabu = TabuSearch(names, classes, values, costs, capacity, composition)
+        self.iterations = iterations
+        self.patience = patience
+
+    def incumbents(self, deadline, bound=None):
+        checked = time.time()
+        best = None
+        for best in self.tabu.search(self.iterations, self.patience, deadline):
+            now = time.time()
+            if now - checked >= CHECK_SECONDS:
+                checked = now
+                yield best, False
+        yield best, False
+
+
+class BranchAndBoundEngine(AnytimeSolver):
+    # the exact search in slices of CHECK_SECONDS, optimal once nothing is left open
+
+    def __init__(self, names, classes, values, costs, capacity, composition):
+
+        AnytimeSolver.__init__(self, names, classes, values, costs, capacity, composition)
+        self.solver = BranchAndBound(names, classes, values, costs, capacity, composition)
+
+    def incumbents(self, deadline, bound=None):
+        solver = self.solver
+        solver.nodes = 0
+        stack = [solver.root_node()]
+        best_value, best_picks = float('-inf'), None
+        best, best_seen = None, None
+        while True:
+            if bound is not None:
+                best_value = max(best_value, bound())
+            slice_end = min(time.time() + CHECK_SECONDS, deadline)
+            stack, best_value, best_picks = solver.search(stack, best_value, best_picks, slice_end)
+            # search only replaces the picks with a better team
+            if best_picks is not best_seen:
+                best = solver.make_lineup(best_picks)
+                best_seen = best_picks
+            yield best, not stack
+            if not stack or time.time() >= deadline:
+                return
+
+
+class KnapsackEngine(AnytimeSolver):
+    # the DP, exact when every salary is a whole number of units
+
+    def incumbents(self, deadline, bound=None):
+        knapsack = ModifiedKnapsack(self.names, self.classes, self.values, self.costs,
+                                    self.capacity, self.composition)
+        lineup = knapsack.find_solution()
+        yield lineup, lineup is not None and all(cost % knapsack.unit == 0 for cost in self.costs)
+
+
+class MILPEngine(AnytimeSolver):
+
+    def incumbents(self, deadline, bound=None):
+        solver = MILPSolver(self.names, self.classes, self.values, self.costs,
+                            self.capacity, self.composition)
+        lineup = solver.find_solution(max(deadline - time.time(), 0.0))
+        yield lineup, solver.optimal
+
+
+ENGINES = {
+    'annealing': AnnealingEngine,
+    'tabu': TabuEngine,
+    'branch_bound': BranchAndBoundEngine,
+    'knapsack': KnapsackEngine,
+    'milp': MILPEngine,
+}
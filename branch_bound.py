@@ -0,0 +1,323 @@
+"""
+Branch and bound lineup solver
+
+The players of every class are ordered by their reduced value v - l*c, where l
+is the price of salary that minimizes the Lagrangian bound of the root
+
+    L(l) = l*capacity + sum over classes c of the best N_c reduced values
+
+L(l) is an upper bound on every team for any l >= 0, and at the best l it equals
+the LP relaxation of the problem. With the players in that order the bound of a
+node, the same sum over the players that are still open, is two prefix sums.
+
+The search is a depth first walk over the classes in turn, taking or skipping
+each player, starting with the classes with the fewest players so the bound is
+tightest where the search branches the most. Nothing is rounded, so salaries do not have to be whole units and
+the capacity can be anything.
+"""
+
+from collections import defaultdict
+from heapq import heappush, heappop
+from itertools import count
+import numpy as np
+import time
+
+from lineup import Lineup
+
+# nodes between two checks of the time budget
+CHECK_EVERY = 1024
+
+
+class BranchAndBound:
+
+    def __init__(self, names, classes, values, costs, capacity, composition):
+
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        self.costs = np.asarray(costs, dtype=float)
+        self.cost_list = list(costs)
+        self.capacity = capacity
+
+        by_class = defaultdict(list)
+        for i, c in enumerate(classes):
+            by_class[c].append(i)
+        self.class_names = sorted(composition, key=lambda c: (len(by_class[c]), c))
+        self.counts = [composition[c] for c in self.class_names]
+        self.class_players = [np.array(by_class[c], dtype=int) for c in self.class_names]
+
+        self.price = self.find_price()
+        self.order_players()
+
+        self.nodes = 0
+        self.upper_bound = None
+        self.gap = None
+
+    def lagrangian_bound(self, price):
+        bound = price * self.capacity
+        for players, count in zip(self.class_players, self.counts):
+            if len(players) < count:
+                return -np.inf
+            reduced = self.values[players] - price * self.costs[players]
+            bound += np.sort(reduced)[::-1][:count].sum()
+        return bound
+
+    def find_price(self):
+        # L is convex in the price: double the upper end of the search until it
+        # passes the minimum, then narrow the interval with a golden section search
+        hi = 1e-6
+        while hi < 1e6 and self.lagrangian_bound(2*hi) < self.lagrangian_bound(hi):
+            hi *= 2
+        lo, hi = 0.0, 2*hi
+        ratio = (np.sqrt(5) - 1) / 2
+        for step in range(100):
+            a = hi - ratio * (hi - lo)
+            b = lo + ratio * (hi - lo)
+            if self.lagrangian_bound(a) <= self.lagrangian_bound(b):
+                hi = b
+            else:
+                lo = a
+        return (lo + hi) / 2
+
+    def order_players(self):
+        # per class: players by reduced value, prefix sums of the reduced values and
+        # the cheapest cost of any number of players
+        self.ordered = []
+        self.reduced_prefix = []
+        self.cheapest_prefix = []
+        for players in self.class_players:
+            reduced = self.values[players] - self.price * self.costs[players]
+            order = players[np.argsort(-reduced, kind='mergesort')]
+            self.ordered.append(order)
+            self.reduced_prefix.append(np.append(0.0, np.cumsum(np.sort(reduced)[::-1])))
+            self.cheapest_prefix.append(np.append(0.0, np.cumsum(np.sort(self.costs[players]))))
+
+        # best reduced value, cheapest cost and number of players of all the classes
+        # after each class
+        k = len(self.class_names)
+        self.rest_reduced = np.zeros(k + 1)
+        self.rest_cheapest = np.zeros(k + 1)
+        self.rest_slots = np.zeros(k + 1, dtype=int)
+        for ci in range(k - 1, -1, -1):
+            count = self.counts[ci]
+            self.rest_slots[ci] = self.rest_slots[ci + 1] + count
+            if len(self.ordered[ci]) < count:
+                self.rest_reduced[ci] = -np.inf
+                self.rest_cheapest[ci] = np.inf
+                continue
+            self.rest_reduced[ci] = self.rest_reduced[ci + 1] + self.reduced_prefix[ci][count]
+            self.rest_cheapest[ci] = self.rest_cheapest[ci + 1] + self.cheapest_prefix[ci][count]
+
+    def bound(self, ci, pos, left, cost, value):
+        # the best the node can reach, -inf if it cannot be completed under the cap
+        players = len(self.ordered[ci])
+        if pos + left > players:
+            return -np.inf
+        if cost + self.cheapest_prefix[ci][left] + self.rest_cheapest[ci + 1] >= self.capacity:
+            return -np.inf
+        prefix = self.reduced_prefix[ci]
+        return value + self.price * (self.capacity - cost) + \
+               (prefix[pos + left] - prefix[pos]) + self.rest_reduced[ci + 1]
+
+    def root_node(self):
+        # a node is (bound, class, position in the class, players left to pick in
+        # the class, cost, value, picks) with picks a linked list (player, picks)
+        if not self.class_names:
+            return (0.0, 0, 0, 0, 0.0, 0.0, None)
+        return (self.bound(0, 0, self.counts[0], 0.0, 0.0), 0, 0, self.counts[0], 0.0, 0.0, None)
+
+    def search(self, stack, best_value, best_picks, deadline, deferred=None, accept=None, leaves=None):
+        """
+        Depth first search from the nodes on the stack.
+
+        For iter_solutions, nodes that cannot beat best_value are pushed on the
+        deferred heap (-bound, tie, node) instead of being dropped, nodes for which
+        accept(picks, number of picks) is false are dropped, and every team reached
+        is added to leaves.
+
+        :return a tuple (stack, best_value, best_picks) where the stack holds the
+                nodes still to search, empty when the search is complete
+        """
+        k = len(self.class_names)
+        while stack:
+            node = stack.pop()
+            bound, ci, pos, left, cost, value, picks = node
+            if bound <= best_value:
+                if deferred is not None and bound > -np.inf:
+                    heappush(deferred, (-bound, next(self.tie), node))
+                continue
+
+            if accept is not None and not accept(picks, self.rest_slots[0] - self.rest_slots[ci + 1] - left):
+                continue
+
+            self.nodes += 1
+            if deadline is not None and self.nodes % CHECK_EVERY == 0 and time.time() >= deadline:
+                stack.append(node)
+                return stack, best_value, best_picks
+
+            # a class is complete, move on to the next one
+            while left == 0 and ci < k:
+                ci += 1
+                pos = 0
+                left = self.counts[ci] if ci < k else 0
+            if ci == k:
+                if leaves is not None:
+                    leaves.append((value, picks))
+                best_value = value
+                best_picks = picks
+                continue
+
+            i = self.ordered[ci][pos]
+            skip = self.bound(ci, pos + 1, left, cost, value)
+            if skip > best_value:
+                stack.append((skip, ci, pos + 1, left, cost, value, picks))
+            elif deferred is not None and skip > -np.inf:
+                heappush(deferred, (-skip, next(self.tie), (skip, ci, pos + 1, left, cost, value, picks)))
+            # the player is taken first, the search follows the reduced value order
+            take_cost = cost + self.costs[i]
+            take_value = value + self.values[i]
+            if left > 1:
+                take = self.bound(ci, pos + 1, left - 1, take_cost, take_value)
+            elif ci + 1 < k:
+                take = self.bound(ci + 1, 0, self.counts[ci + 1], take_cost, take_value)
+            else:
+                take = take_value if take_cost < self.capacity else -np.inf
+            if take > best_value:
+                stack.append((take, ci, pos + 1, left - 1, take_cost, take_value, (i, picks)))
+            elif deferred is not None and take > -np.inf:
+                heappush(deferred, (-take, next(self.tie), (take, ci, pos + 1, left - 1, take_cost, take_value, (i, picks))))
+        return stack, best_value, best_picks
+
+    def picked(self, picks):
+        # the players of a linked list of picks
+        team = []
+        while picks is not None:
+            i, picks = picks
+            team.append(i)
+        return team
+
+    def make_lineup(self, picks):
+        team = self.picked(picks)
+        return Lineup(float(self.values[team].sum()), sum(self.cost_list[i] for i in team),
+                      tuple(sorted(self.names[i] for i in team)))
+
+    def find_solution(self, time_budget=None, incumbent=None):
+        """
+        Function: find_solution
+        -----------------
+        Finds the highest valued team that costs less than the capacity.
+
+        When the time budget runs out the best team found so far is returned and
+        self.gap is how far its value may be from the optimum, relative to its
+        value. An optimal solve leaves self.gap at 0. self.upper_bound is the bound
+        on the optimum and self.nodes the number of nodes searched.
+
+        Parameters:
+            :param time_budget: seconds to search, unlimited if None
+            :param incumbent: a known Lineup to start from, e.g. from annealing
+
+        :return the best Lineup found, or None if no team fits under the capacity
+        """
+        deadline = time.time() + time_budget if time_budget is not None else None
+        best_value = incumbent.value if incumbent is not None else -np.inf
+        best_picks = None
+        self.nodes = 0
+        self.upper_bound = None
+
+        stack, best_value, best_picks = self.search([self.root_node()], best_value, best_picks, deadline)
+
+        self.upper_bound = max([node[0] for node in stack] + [best_value])
+        if best_value == -np.inf:
+            self.gap = None
+            return None
+        gap = self.upper_bound - best_value
+        self.gap = gap / abs(best_value) if best_value else gap
+        if best_picks is None:
+            return incumbent
+        return self.make_lineup(best_picks)
+
+    def iter_solutions(self, accept, time_budget=None):
+        """
+        Function: iter_solutions
+        -----------------
+        Yields the best team for which accept is true, then the best team for
+        which accept is still true after the caller has seen the first, and so on.
+
+        accept(picks, count) is called with the linked list of a node's picks and
+        their number. It may change between teams but only from true to false:
+        once it rejects the picks of a node it must reject every node with more
+        picks, since rejected nodes and teams are forgotten.
+
+        It is one search: nodes that could not beat the team being looked for are
+        kept on a heap by bound rather than dropped, and the search for the next
+        team starts from the teams already reached and the kept nodes that can
+        still beat the best of them, so no node is expanded twice.
+
+        Parameters:
+            :param accept: function (picks, count) -> bool
+            :param time_budget: seconds to search, unlimited if None; when it runs
+                                out the last team yielded may not be the best left
+
+        :return a generator of linked lists of picks, see make_lineup
+        """
+        deadline = time.time() + time_budget if time_budget is not None else None
+        slots = self.rest_slots[0]
+        self.nodes = 0
+
+        leaves = []
+        deferred = []
+        self.tie = count()
+        stack = [self.root_node()]
+        while True:
+            # the best team already reached that is still accepted
+            leaves.sort(key=lambda leaf: leaf[0])
+            best_value, best_picks = -np.inf, None
+            while leaves:
+                if accept(leaves[-1][1], slots):
+                    best_value, best_picks = leaves[-1]
+                    break
+                leaves.pop()
+
+            while deferred and -deferred[0][0] > best_value:
+                stack.append(heappop(deferred)[2])
+            stack, best_value, best_picks = self.search(stack, best_value, best_picks, deadline,
+                                                        deferred, accept, leaves)
+            if best_picks is None:
+                return
+            yield best_picks
+            if stack:
+                return
+
+    def find_top_solutions(self, top, min_difference=1, time_budget=None):
+        """
+        Function: find_top_solutions
+        -----------------
+        Finds the best team, then the best team with at least min_difference
+        players not in the first, then the best differing that much from both, and
+        so on, in one search (see iter_solutions).
+
+        Parameters:
+            :param top: the number of teams
+            :param min_difference: the fewest players any two teams may differ by
+            :param time_budget: seconds to search, unlimited if None; when it runs
+                                out the teams found so far are returned, the last
+                                one possibly not the best left
+
+        :return a list of up to top Lineups, best first
+        """
+        max_common = self.rest_slots[0] - min_difference
+        # one 0/1 row per chosen team
+        selected = np.zeros((top, len(self.names)), dtype=int)
+        lineups = []
+
+        def accept(picks, picked):
+            # the players a node shares with a team only grow further down the tree
+            if not lineups or picked <= max_common:
+                return True
+            return not (selected[:len(lineups), self.picked(picks)].sum(axis=1) > max_common).any()
+
+        for picks in self.iter_solutions(accept, time_budget):
+            selected[len(lineups), self.picked(picks)] = 1
+            lineups.append(self.make_lineup(picks))
+            if len(lineups) == top:
+                break
+        return lineups
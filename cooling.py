@@ -0,0 +1,65 @@
+"""
+Cooling schedules for TeamMCMC.anneal
+
+A schedule gives the first temperature with start() and, after every proposal,
+the next one with cool(temp, accepted). cool() returns None once the schedule is
+done.
+"""
+
+class LinearCooling:
+    # the original fixed schedule, arange(1000, 0, -0.25)
+
+    def __init__(self, start=1000.0, stop=0.0, step=0.25):
+        self.start_temp = start
+        self.stop_temp = stop
+        self.step = step
+
+    def start(self):
+        return self.start_temp
+
+    def cool(self, temp, accepted):
+        temp -= self.step
+        return temp if temp > self.stop_temp else None
+
+
+class GeometricCooling:
+
+    def __init__(self, start=1000.0, stop=0.25, alpha=0.998):
+        self.start_temp = start
+        self.stop_temp = stop
+        self.alpha = alpha
+
+    def start(self):
+        return self.start_temp
+
+    def cool(self, temp, accepted):
+        temp *= self.alpha
+        return temp if temp > self.stop_temp else None
+
+
+class AdaptiveCooling:
+    # geometric cooling that speeds up while more than target of the proposals are
+    # accepted, i.e. while the chain is still a random walk
+
+    def __init__(self, start=1000.0, stop=0.25, alpha=0.998, target=0.3, smoothing=0.02):
+        self.start_temp = start
+        self.stop_temp = stop
+        self.alpha = alpha
+        self.target = target
+        self.smoothing = smoothing
+        self.rate = 1.0
+
+    def start(self):
+        self.rate = 1.0
+        return self.start_temp
+
+    def cool(self, temp, accepted):
+        # moving average of the acceptance rate
+        self.rate += self.smoothing * ((1.0 if accepted else 0.0) - self.rate)
+        temp *= self.alpha ** max(1.0, self.rate / self.target)
+        return temp if temp > self.stop_temp else None
+
+
+COOLING_SCHEDULES = {'linear': LinearCooling,
+                     'geometric': GeometricCooling,
+                     'adaptive': AdaptiveCooling}
@@ -2,12 +2,25 @@
 
 import argparse
 
-from stat_parsers.player_stats import PlayerStats
+from stat_parsers.player_stats import PlayerStats, ROSTER_WORKERS
+from stat_parsers.roster_cache import ROSTER_CACHE_TTL
 from stat_parsers.ballpark_stats import BallparkStats
 from stat_parsers.team_stats import TeamStats
 from stat_parsers.league_stats import LeagueStats
 from stat_parsers.daily_stats import DailyStats
+from stat_parsers.snapshot import load_stats
+from stat_parsers.loader_registry import get_parse_counts
 from stat_equations import StatEquations
+from player_salary_scores import PlayerSalaryScores
+from knapsack import ModifiedKnapsack
+from mcmc import TeamMCMC
+from tabu import TabuSearch
+from milp_solver import MILPSolver
+from branch_bound import BranchAndBound
+from multi_entry import MultiEntryGenerator
+from anytime import ENGINES
+from portfolio import Portfolio
+from pruning import prune_players, print_report
 
 
 
@@ -25,20 +38,40 @@ def main():
     parser.add_argument('salaries', help='File containing player salaries and positions.')
     parser.add_argument('projections', help='File containing projected points.')
     parser.add_argument('stats', help='Directory containing all stats.')
-    parser.add_argument('--knapsack', help='Find a team using the modified knapsack approach.')
+    parser.add_argument('--knapsack', action='store_true', help='Find a team using the modified knapsack approach.')
     parser.add_argument('--mcmc', action='store_true', help='Find a team using the MCMC approach.')
+    parser.add_argument('--tabu', action='store_true', help='Find a team with tabu search.')
+    parser.add_argument('--milp', action='store_true', help='Find a team with a mixed integer program (scipy.optimize.milp if installed).')
+    parser.add_argument('--lineups', type=int, help='Find this many distinct teams with branch and bound.')
+    parser.add_argument('--min-difference', type=int, default=1, help='Fewest players any two of the --lineups teams differ by.')
+    parser.add_argument('--entries', type=int, help='Find this many teams for a multi-entry contest.')
+    parser.add_argument('--max-exposure', type=float, default=1.0, help='Largest share of the --entries teams a player may be in.')
+    parser.add_argument('--max-overlap', type=int, help='Most players any two of the --entries teams may share, one less than a full team by default.')
+    parser.add_argument('--anytime', choices=sorted(ENGINES), help='Find a team with this engine, printing every better team as it is found.')
+    parser.add_argument('--portfolio', action='store_true', help='Race the solvers in separate processes and keep the best team.')
+    parser.add_argument('--time-budget', type=float, default=10.0, help='Seconds the --anytime engine or the --portfolio may search.')
+    parser.add_argument('--no-prune', action='store_true', help='Hand every player to the solvers, including dominated ones.')
+    parser.add_argument('--roster-workers', type=int, default=ROSTER_WORKERS, help='Number of team rosters to fetch at once.')
+    parser.add_argument('--roster-ttl', type=int, default=ROSTER_CACHE_TTL, help='Seconds a cached roster is used before asking ESPN again.')
+    parser.add_argument('--offline', action='store_true', help='Only use cached rosters, never contact ESPN.')
+    parser.add_argument('--snapshot', action='store_true', help='Load stats from the compiled snapshot, rebuilding it when stale.')
     args = parser.parse_args()
 
-    print 'Player Stats...'
-    player_stats = PlayerStats(args.stats)
-    print 'Ballpark Stats...'
-    ballpark_stats = BallparkStats(args.stats)
-    print 'Team Stats...'
-    team_stats = TeamStats(args.stats)
-    print 'League Stats...'
-    league_stats = LeagueStats(args.stats)
-    print 'Daily Stats...'
-    daily_stats = DailyStats(args.stats)
+    if args.snapshot:
+        print 'Stats Snapshot...'
+        player_stats, ballpark_stats, team_stats, league_stats, daily_stats = \
+            load_stats(args.stats, roster_workers=args.roster_workers, roster_ttl=args.roster_ttl, offline=args.offline)
+    else:
+        print 'Player Stats...'
+        player_stats = PlayerStats(args.stats, roster_workers=args.roster_workers, roster_ttl=args.roster_ttl, offline=args.offline)
+        print 'Ballpark Stats...'
+        ballpark_stats = BallparkStats(args.stats)
+        print 'Team Stats...'
+        team_stats = TeamStats(args.stats)
+        print 'League Stats...'
+        league_stats = LeagueStats(args.stats)
+        print 'Daily Stats...'
+        daily_stats = DailyStats(args.stats)
 
 
     # start computing some stats here
@@ -69,28 +102,93 @@ def main():
 
 
     names = player_stats.get_active_players()
-    names = player_stats.starting_pitchers.values()
+    names = player_stats.get_starting_pitchers()
 
     for n in names:
         print n, eq.get_score(n)
 
-
-    # players = PlayerSalaryScores()
-    # players.read_positions_and_salaries(args.salaries)
-    # players.read_projections(args.projections)
-    #
-    # names = players.get_names()
-    # classes = [players.get_position(n) for n in names]
-    # values = [players.get_score(n) for n in names]
-    # weights = [players.get_salary(n) for n in names]
-    #
-    # if args.knapsack:
-    #     knapsack = ModifiedKnapsack(names, classes, values, weights, CAPACITY, TEAM_COMP)
-    #    #knapsack.find_solution()
-    #
-    # if args.mcmc:
-    #     mcmc = TeamMCMC(names, classes, values, weights, CAPACITY, TEAM_COMP)
-    #     mcmc.find_simulated_annealing_solution()
+    counts = get_parse_counts()
+    print 'Stat files parsed: %d, parses avoided: %d' %(counts['parsed'], counts['reused'])
+
+
+    players = PlayerSalaryScores()
+    players.read_positions_and_salaries(args.salaries)
+    players.read_projections(args.projections)
+
+    # only players with a projection can be picked
+    names = [n for n in players.get_names() if players.get_score(n) is not None]
+    classes = [players.get_position(n) for n in names]
+    values = [players.get_score(n) for n in names]
+    weights = [players.get_salary(n) for n in names]
+    # pruning only keeps the best team, the --lineups and --entries teams come from every player
+    everyone = (names, classes, values, weights)
+
+    if not args.no_prune:
+        (names, classes, values, weights), report = prune_players(names, classes, values, weights, TEAM_COMP)
+        print 'Pruned players...'
+        print_report(report)
+
+    if args.anytime:
+        def show(progress):
+            lineup = progress.lineup
+            print '%6.2fs' % progress.elapsed, '$%d' % lineup.cost, lineup.value, list(lineup.names)
+        engine = ENGINES[args.anytime](names, classes, values, weights, CAPACITY, TEAM_COMP)
+        progress = engine.run(args.time_budget, callback=show)
+        if progress is None:
+            print 'No team fits under the salary cap.'
+        elif progress.optimal:
+            print 'Proven best.'
+
+    if args.portfolio:
+        def show_engine(progress):
+            lineup = progress.lineup
+            print '%6.2fs' % progress.elapsed, '$%d' % lineup.cost, lineup.value, list(lineup.names), portfolio.winner
+        portfolio = Portfolio(names, classes, values, weights, CAPACITY, TEAM_COMP)
+        progress = portfolio.run(args.time_budget, callback=show_engine)
+        if progress is None:
+            print 'No team fits under the salary cap.'
+        elif progress.optimal:
+            print 'Proven best.'
+
+    if args.knapsack:
+        knapsack = ModifiedKnapsack(names, classes, values, weights, CAPACITY, TEAM_COMP)
+        lineup = knapsack.find_solution()
+        if lineup is None:
+            print 'No team fits under the salary cap.'
+        else:
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names)
+
+    if args.milp:
+        lineup = MILPSolver(names, classes, values, weights, CAPACITY, TEAM_COMP).find_solution()
+        if lineup is None:
+            print 'No team fits under the salary cap.'
+        else:
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names)
+
+    if args.lineups:
+        solver = BranchAndBound(*(everyone + (CAPACITY, TEAM_COMP)))
+        for lineup in solver.find_top_solutions(args.lineups, args.min_difference):
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names)
+
+    if args.entries:
+        generator = MultiEntryGenerator(*(everyone + (CAPACITY, TEAM_COMP, args.max_exposure, args.max_overlap)))
+        for lineup in generator.generate(args.entries):
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names)
+        exposures = generator.get_exposures()
+        for name in sorted(exposures, key=lambda n: -exposures[n])[:10]:
+            print '%5.1f%% %s' % (100 * exposures[name], name)
+
+    if args.mcmc:
+        mcmc = TeamMCMC(names, classes, values, weights, CAPACITY, TEAM_COMP)
+        mcmc.find_simulated_annealing_solution()
+
+    if args.tabu:
+        tabu = TabuSearch(names, classes, values, weights, CAPACITY, TEAM_COMP)
+        lineup = tabu.find_solution()
+        if lineup is None:
+            print 'No team fits under the salary cap.'
+        else:
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names), '(%d swaps)' % tabu.iterations
 
 
 if __name__ == '__main__':
@@ -1,9 +1,15 @@
 from collections import defaultdict
+import numpy as np
+
+from lineup import Lineup
+
+# salaries are multiples of $100
+SALARY_UNIT = 100
 
 
 class ModifiedKnapsack:
 
-    def __init__(self, names, classes, values, weights, capacity, class_restrictions):
+    def __init__(self, names, classes, values, weights, capacity, class_restrictions, unit=SALARY_UNIT):
 
         self.names = names
         self.all_classes = set(classes)
@@ -11,6 +17,7 @@ class ModifiedKnapsack:
         self.weights = weights
         self.capacity = capacity
         self.class_restrictions = class_restrictions
+        self.unit = unit
 
         self.name_index = dict([(name, i) for i, name in enumerate(names)])
 
@@ -21,8 +28,99 @@ class ModifiedKnapsack:
     def name_ind(self, name):
         return self.name_index[name]
 
+    def budget_units(self):
+        # the team must cost less than the capacity; a weight that is not a whole
+        # number of units is rounded up, so the solution never goes over
+        return int(np.ceil(1.0 * self.capacity / self.unit)) - 1
+
+    def solve_class(self, names, count, budget):
+        """
+        Function: solve_class
+        -----------------
+        0/1 knapsack with exactly count players of one class.
+
+        Parameters:
+            :param names: the players of the class
+            :param count: the number of players to pick
+            :param budget: the largest total weight in units
+
+        :return a tuple (best, took, units) where best[b] is the best value of count
+                players weighing at most b units (-inf if there is none), took[i, j, b]
+                tells whether player i was picked for j players in b units, and units
+                are the weights of the players
+        """
+        values = np.array([self.values[self.name_ind(n)] for n in names], dtype=float)
+        units = np.ceil(np.array([self.weights[self.name_ind(n)] for n in names], dtype=float) / self.unit).astype(int)
+
+        # table[j, b]: the best value of j players weighing at most b units
+        table = np.empty((count + 1, budget + 1))
+        table.fill(-np.inf)
+        table[0, :] = 0.0
+        took = np.zeros((len(names), count + 1, budget + 1), dtype=bool)
+        for i in range(len(names)):
+            w = units[i]
+            if w > budget:
+                continue
+            for j in range(count, 0, -1):
+                candidate = table[j - 1, :budget + 1 - w] + values[i]
+                better = candidate > table[j, w:]
+                table[j, w:][better] = candidate[better]
+                took[i, j, w:] = better
+        return table[count], took, units
+
     def find_solution(self):
-        start = min(self.values)
+        """
+        Function: find_solution
+        -----------------
+        Finds the highest valued team with class_restrictions[c] players of every
+        class c that costs less than the capacity.
+
+        Weights are counted in whole units of self.unit, so the solution is exact
+        when every weight is a multiple of the unit.
+
+        :return the best Lineup, or None if no team fits under the capacity
+        """
+        budget = self.budget_units()
+
+        # best[b]: the best value of the classes combined so far in at most b units
+        best = np.zeros(budget + 1)
+        splits = []
+        solved = []
+        for c in sorted(self.class_restrictions):
+            count = self.class_restrictions[c]
+            class_best, took, units = self.solve_class(self.names_by_class[c], count, budget)
+            solved.append((c, count, took, units))
+
+            combined = np.empty(budget + 1)
+            split = np.zeros(budget + 1, dtype=int)
+            for b in range(budget + 1):
+                # b - k units for the classes before, k units for this one
+                totals = best[b::-1] + class_best[:b + 1]
+                k = np.argmax(totals)
+                combined[b] = totals[k]
+                split[b] = k
+            best = combined
+            splits.append(split)
+
+        if best[budget] == -np.inf:
+            return None
+
+        # walk back through the classes and then through each class's players
+        team = []
+        b = budget
+        for (c, count, took, units), split in reversed(zip(solved, splits)):
+            class_units = split[b]
+            b -= class_units
+            j = count
+            names = self.names_by_class[c]
+            for i in range(len(names) - 1, -1, -1):
+                if j == 0:
+                    break
+                if took[i, j, class_units]:
+                    team.append(names[i])
+                    class_units -= units[i]
+                    j -= 1
 
-        for c, names in self.names_by_class.items():
-            print c, len(names), names
\ No newline at end of file
+        value = sum(self.values[self.name_ind(n)] for n in team)
+        cost = sum(self.weights[self.name_ind(n)] for n in team)
+        return Lineup(value, cost, tuple(sorted(team)))
@@ -0,0 +1,19 @@
+from collections import namedtuple
+
+
+# A lineup found by one of the solvers, names are sorted
+Lineup = namedtuple('Lineup', ['value', 'cost', 'names'])
+
+
+def best_lineups(lineups, top):
+    # the top highest valued lineups, each set of players counted once
+    best = []
+    seen = set()
+    for lineup in sorted(lineups, key=lambda l: -l.value):
+        if lineup.names in seen:
+            continue
+        seen.add(lineup.names)
+        best.append(lineup)
+        if len(best) == top:
+            break
+    return best
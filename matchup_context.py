@@ -0,0 +1,87 @@
+from collections import namedtuple
+
+from stat_parsers.team_stats import get_teams
+
+
+# One row per team playing today. avg_park_factor and hr_park_factor are keyed by
+# batter hand ('left'/'right').
+Matchup = namedtuple('Matchup', ['team',
+                                 'opponent',
+                                 'home_or_away',
+                                 'park',
+                                 'opp_pitcher',
+                                 'opp_pitcher_hand',
+                                 'park_factor',
+                                 'avg_park_factor',
+                                 'hr_park_factor'])
+
+
+class MatchupContext:
+
+    def __init__(self, player_stats, team_stats, ballpark_stats):
+        self.player_stats = player_stats
+        ''':type: PlayerStats'''
+        self.team_stats = team_stats
+        ''':type: TeamStats'''
+        self.ballpark_stats = ballpark_stats
+        ''':type: BallparkStats'''
+
+        # built on first use, so nothing is read when the context is constructed
+        self.matchups = None
+
+    def build(self):
+        self.matchups = {}
+        for team in get_teams():
+            self.invalidate(team)
+
+    def built(self):
+        if self.matchups is None:
+            self.build()
+        return self.matchups
+
+    def invalidate(self, team):
+        # recomputes the row of a single team, e.g. after its opponent's starter changed
+        if self.matchups is None:
+            return
+        opp_team = self.team_stats.get_opponent(team)
+        if opp_team is None:
+            self.matchups.pop(team, None)
+            return
+
+        home_or_away = self.team_stats.get_home_or_away(team)
+        if home_or_away=='home':
+            park = team
+        else:
+            park = opp_team
+
+        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        if opp_pitcher is not None:
+            opp_pitcher_hand = self.player_stats.get_throwing_hand(opp_pitcher)
+        else:
+            opp_pitcher_hand = None
+
+        hands = ['left', 'right']
+        self.matchups[team] = Matchup(team=team,
+                                      opponent=opp_team,
+                                      home_or_away=home_or_away,
+                                      park=park,
+                                      opp_pitcher=opp_pitcher,
+                                      opp_pitcher_hand=opp_pitcher_hand,
+                                      park_factor=self.ballpark_stats.get_overall_park_factor(park),
+                                      avg_park_factor=dict((h, self.ballpark_stats.get_avg_park_factor(park, h)) for h in hands),
+                                      hr_park_factor=dict((h, self.ballpark_stats.get_hr_park_factor(park, h)) for h in hands))
+
+    def set_starting_pitcher(self, team, pitcher):
+        # a new starter only changes the row of the team batting against him
+        self.player_stats.set_starting_pitcher(team, pitcher)
+        if self.matchups is None:
+            return
+        opp_team = self.team_stats.get_opponent(team)
+        if opp_team is not None:
+            self.invalidate(opp_team)
+
+    def get(self, team):
+        return self.built().get(team)
+
+    def get_teams(self):
+        return self.built().keys()
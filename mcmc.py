@@ -1,106 +1,380 @@
-from random import choice, shuffle, random
-from collections import defaultdict
+from random import choice, shuffle, random, randrange, seed as random_seed
+from bisect import bisect_left
 from math import exp
-from numpy import arange
+from multiprocessing import Pool, cpu_count
+import numpy as np
+import time
+
+from cooling import LinearCooling
+from lineup import Lineup, best_lineups
+
+# random draws sample_neighbor makes before falling back to listing every neighbor
+NEIGHBOR_TRIES = 100
+
+# acceptance rate under which a chain counts as cold, see anneal
+COLD_ACCEPTANCE = 0.1
+
+# fixed temperatures of the replica exchange chains, coldest first
+REPLICA_TEMPS = [0.1, 0.2, 0.4, 0.8, 1.6, 3.2, 6.4, 12.8]
 
 class TeamMCMC:
 
-    def __init__(self, names, classes, values, costs, capacity, object_composition):
+    def __init__(self, names, classes, values, costs, capacity, object_composition, sample_neighbors=True):
 
-        self.names = names
-        self.values = dict(zip(names, values))
-        self.costs = dict(zip(names, costs))
-        self.classes = dict(zip(names, classes))
+        # players are referred to by their index in names from here on
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        self.costs = np.asarray(costs)
         self.capacity = capacity
-        self.valid_comp = []
+
+        self.class_names = sorted(set(classes) | set(object_composition))
+        class_ids = dict((c, k) for k, c in enumerate(self.class_names))
+        self.classes = np.array([class_ids[c] for c in classes], dtype=int)
+
+        # one slot per roster spot, each slot takes a player of a fixed class
+        valid_comp = []
         for c, count in object_composition.items():
-            self.valid_comp.extend([c]*count)
+            valid_comp.extend([class_ids[c]]*count)
+        self.slot_classes = np.array(valid_comp, dtype=int)
 
-        self.available_names_by_class = defaultdict(list)
-        for i, n in enumerate(names):
-            self.available_names_by_class[classes[i]].append(n)
+        # the players of a class are kept in one array with the available ones in
+        # front: pool_size[k] is the number available, pool_pos[i] the position of
+        # player i in its pool, so taking or releasing a player is a single swap
+        self.initial_pools = [np.flatnonzero(self.classes == k) for k in range(len(self.class_names))]
 
-        # current team status to be updated during MCMC
-        self.current_team = []
-        self.current_value = None
-        self.current_cost = None
+        # the players of each class sorted by cost, to find the ones under a budget by bisection
+        self.sample_neighbors = sample_neighbors
+        self.sorted_pools = []
+        self.sorted_costs = []
+        for pool in self.initial_pools:
+            by_cost = pool[np.argsort(self.costs[pool], kind='mergesort')]
+            self.sorted_pools.append(by_cost.tolist())
+            self.sorted_costs.append(self.costs[by_cost].tolist())
+
+        # some team fits under the cap when the cheapest players of every slot do
+        needed = np.bincount(self.slot_classes, minlength=len(self.class_names))
+        self.feasible = all(len(self.sorted_costs[k]) >= needed[k] for k in range(len(needed))) and \
+                        sum(sum(self.sorted_costs[k][:needed[k]]) for k in range(len(needed))) < self.capacity
+
+        # current team status to be updated during MCMC, -1 marks an empty slot
+        self.slots = np.empty(len(self.slot_classes), dtype=int)
+        self.clear_team()
 
     def get_available(self, object_class):
-        return self.available_names_by_class[object_class]
+        k = self.class_names.index(object_class)
+        return [self.names[i] for i in self.pools[k][:self.pool_size[k]]]
 
-    def add_player(self, name):
-        self.current_team.append(name)
-        self.available_names_by_class[self.classes[name]].remove(name)
-        self.current_value += self.values[name]
-        self.current_cost += self.costs[name]
+    def take_player(self, i):
+        # swap player i with the last available player of its class
+        k = self.classes[i]
+        pool = self.pools[k]
+        last = self.pool_size[k] - 1
+        p, j = self.pool_pos[i], pool[last]
+        pool[p], pool[last] = j, i
+        self.pool_pos[j], self.pool_pos[i] = p, last
+        self.pool_size[k] = last
 
-    def remove_player(self, name):
-        self.current_team.remove(name)
-        self.available_names_by_class[self.classes[name]].append(name)
-        self.current_value -= self.values[name]
-        self.current_cost -= self.costs[name]
+    def release_player(self, i):
+        # swap player i with the first taken player of its class
+        k = self.classes[i]
+        pool = self.pools[k]
+        first = self.pool_size[k]
+        p, j = self.pool_pos[i], pool[first]
+        pool[p], pool[first] = j, i
+        self.pool_pos[j], self.pool_pos[i] = p, first
+        self.pool_size[k] = first + 1
+
+    def add_player(self, slot, i):
+        self.slots[slot] = i
+        self.take_player(i)
+        self.current_value += self.values[i]
+        self.current_cost += self.costs[i]
+
+    def remove_player(self, slot):
+        i = self.slots[slot]
+        self.slots[slot] = -1
+        self.release_player(i)
+        self.current_value -= self.values[i]
+        self.current_cost -= self.costs[i]
 
     def make_random_team(self):
-        team_found = False
+        # returns False if no team fits under the capacity
         self.clear_team()
-        while len(self.current_team) < len(self.valid_comp):
+        if not self.feasible:
+            return False
+        while (self.slots < 0).any():
             self.clear_team()
-            random_comp = list(self.valid_comp)
-            shuffle(random_comp)
-            for new_class in random_comp:
-                candidates = [name for name in self.get_available(new_class) if (self.costs[name] + self.current_cost) < self.capacity]
+            order = range(len(self.slots))
+            shuffle(order)
+            for slot in order:
+                k = self.slot_classes[slot]
+                available = self.pools[k][:self.pool_size[k]]
+                candidates = available[self.costs[available] + self.current_cost < self.capacity]
                 if len(candidates) > 0:
-                    self.add_player(choice(candidates))
+                    self.add_player(slot, choice(candidates))
+        return True
 
     def clear_team(self):
-        for name in self.current_team:
-            self.available_names_by_class[self.classes[name]].append(name)
-        self.current_team = []
-        self.current_value = 0
+        # the pools go back to their initial order, so a seeded restart does not
+        # depend on the restarts before it
+        self.pools = [pool.copy() for pool in self.initial_pools]
+        self.pool_size = np.array([len(pool) for pool in self.pools], dtype=int)
+        self.pool_pos = np.zeros(len(self.names), dtype=int)
+        for pool in self.pools:
+            self.pool_pos[pool] = np.arange(len(pool))
+        self.slots.fill(-1)
+        self.current_value = 0.0
         self.current_cost = 0
 
     def get_neighbor(self):
-        neighbors = []
-        for name in self.current_team:
-            for candidate in self.get_available(self.classes[name]):
-                if (self.current_cost - self.costs[name] + self.costs[candidate]) < self.capacity:
-                    neighbors.append( (name, candidate) )
-        old, new = choice(neighbors)
-        return old, new
-
-    def transition_to_neighbor(self, old_name, new_name):
-        # remove old_name from the team
-        self.current_team.remove(old_name)
-        self.available_names_by_class[self.classes[old_name]].append(old_name)
-        self.current_cost -= self.costs[old_name]
-        self.current_value -= self.values[old_name]
-
-        # add new_name to the team
-        self.current_team.append(new_name)
-        self.available_names_by_class[self.classes[new_name]].remove(new_name)
-        self.current_cost += self.costs[new_name]
-        self.current_value += self.values[new_name]
+        if self.sample_neighbors:
+            return self.sample_neighbor()
+        return self.enumerate_neighbor()
+
+    def sample_neighbor(self):
+        # draws a random slot, then a random player of its class that fits the budget
+        # left by the slot's player; players already on the team are rejected
+        for attempt in range(NEIGHBOR_TRIES):
+            slot = randrange(len(self.slots))
+            k = self.slot_classes[slot]
+            budget = self.capacity - self.current_cost + self.costs[self.slots[slot]]
+            fits = bisect_left(self.sorted_costs[k], budget)
+            if fits == 0:
+                continue
+            new = self.sorted_pools[k][randrange(fits)]
+            if self.pool_pos[new] < self.pool_size[k]:
+                return slot, new
+        return self.enumerate_neighbor()
+
+    def enumerate_neighbor(self):
+        # every (slot, available player of the slot's class) swap that stays under the cap
+        slots = []
+        candidates = []
+        for slot, old in enumerate(self.slots):
+            k = self.slot_classes[slot]
+            available = self.pools[k][:self.pool_size[k]]
+            fits = available[self.current_cost - self.costs[old] + self.costs[available] < self.capacity]
+            slots.append(np.repeat(slot, len(fits)))
+            candidates.append(fits)
+        slots = np.concatenate(slots)
+        if len(slots) == 0:
+            return None
+        n = randrange(len(slots))
+        return slots[n], np.concatenate(candidates)[n]
+
+    def transition_to_neighbor(self, slot, new):
+        self.remove_player(slot)
+        self.add_player(slot, new)
+
+    def get_team(self):
+        return sorted(self.names[i] for i in self.slots if i >= 0)
+
+    def get_lineup(self):
+        return self.make_lineup(self.slots)
+
+    def make_lineup(self, slots):
+        players = slots[slots >= 0]
+        return Lineup(float(self.values[players].sum()), int(self.costs[players].sum()),
+                      tuple(sorted(self.names[i] for i in players)))
 
     def print_team(self):
-        print '$%d' % self.current_cost, self.current_value, sorted(self.current_team)
+        print '$%d' % self.current_cost, float(self.current_value), self.get_team()
 
     def should_transition(self, old_val, new_val, temp):
         if old_val < new_val:
             return True
         delta = old_val - new_val
-        if random < exp(1.0*delta/temp):
+        if random() < exp(-1.0*delta/temp):
             return True
         else:
             return False
 
-    def find_simulated_annealing_solution(self):
-        for i in range(10):
+    def step(self, temp):
+        # one proposal at the given temperature, returns whether it was accepted or
+        # None when no swap fits under the cap
+        neighbor = self.get_neighbor()
+        if neighbor is None:
+            return None
+        slot, new = neighbor
+        new_team_value = self.current_value - self.values[self.slots[slot]] + self.values[new]
+        if self.should_transition(self.current_value, new_team_value, temp):
+            self.transition_to_neighbor(slot, new)
+            return True
+        return False
+
+    def anneal(self, schedule=None, patience=None, time_budget=None):
+        """
+        Anneals from a random team until the schedule is done, no better team was
+        found for patience proposals once the chain is cold, or time_budget seconds
+        have passed. The number of proposals made is left in self.iterations.
+
+        The chain is cold once its moving acceptance rate drops under
+        COLD_ACCEPTANCE; while it is hotter it is a random walk and patience does
+        not count.
+
+        :param schedule: a cooling schedule from cooling.py, LinearCooling() if None
+        :return the best lineup seen, or None if no team fits under the capacity
+        """
+        if schedule is None:
+            schedule = LinearCooling()
+        if time_budget is not None:
+            deadline = time.time() + time_budget
+        self.iterations = 0
+        if not self.make_random_team():
+            return None
+
+        best_value = self.current_value
+        best_slots = self.slots.copy()
+        since_best = 0
+        rate = 1.0
+        temp = schedule.start()
+        while temp is not None:
+            accepted = self.step(temp)
+            if accepted is None:
+                break
+            self.iterations += 1
+            rate += 0.02 * ((1.0 if accepted else 0.0) - rate)
+            if self.current_value > best_value:
+                best_value = self.current_value
+                best_slots = self.slots.copy()
+                since_best = 0
+            elif rate < COLD_ACCEPTANCE:
+                since_best += 1
+                if patience is not None and since_best >= patience:
+                    break
+            if time_budget is not None and time.time() >= deadline:
+                break
+            temp = schedule.cool(temp, accepted)
+        return self.make_lineup(best_slots)
+
+    def get_state(self):
+        # the arrays of the current team; they are not copied, so the team must not
+        # be changed while another state is set
+        return (self.slots, self.pools, self.pool_size, self.pool_pos, self.current_value, self.current_cost)
+
+    def set_state(self, state):
+        self.slots, self.pools, self.pool_size, self.pool_pos, self.current_value, self.current_cost = state
+
+    def find_replica_exchange_solution(self, temps=REPLICA_TEMPS, steps=1000, swap_every=10, top=5, seed=None):
+        """
+        Runs one chain per temperature and every swap_every steps offers to swap
+        the teams of neighboring temperatures, so good teams found by the hot chains
+        move down to the cold ones instead of being lost between restarts.
+
+        A swap between temperatures Ti and Tj is accepted by should_transition with
+        the log-likelihoods of both teams before and after the swap.
+
+        After the run, self.swap_stats holds one dict per pair of neighboring
+        temperatures with the number of swaps 'tried' and 'accepted' and the
+        acceptance 'rate'; rates near zero mean the ladder has gaps.
+
+        :return the top highest valued distinct lineups seen, best first, none if
+                no team fits under the capacity
+        """
+        if seed is not None:
+            random_seed(seed)
+        if not self.feasible:
+            self.swap_stats = []
+            return []
+
+        states = []
+        for temp in temps:
+            self.slots = np.empty(len(self.slot_classes), dtype=int)
             self.make_random_team()
-            for temp in arange(1000, 0, -0.25):
-                old_name, new_name = self.get_neighbor()
-                new_team_value = self.current_value - self.values[old_name] + self.values[new_name]
-                if self.should_transition(self.current_value, new_team_value, temp):
-                    self.transition_to_neighbor(old_name, new_name)
-                else:
-                    continue
-            self.print_team()
\ No newline at end of file
+            states.append(self.get_state())
+
+        tried = [0]*(len(temps) - 1)
+        accepted = [0]*(len(temps) - 1)
+        found = [self.get_lineup()]
+        best_value = self.current_value
+        for n in range(steps):
+            for r, temp in enumerate(temps):
+                self.set_state(states[r])
+                self.step(temp)
+                if self.current_value > best_value:
+                    best_value = self.current_value
+                    found.append(self.get_lineup())
+                states[r] = self.get_state()
+
+            if (n + 1) % swap_every == 0:
+                # alternate between the even and the odd pairs of the ladder
+                for r in range((n // swap_every) % 2, len(temps) - 1, 2):
+                    v_i, v_j = states[r][4], states[r + 1][4]
+                    t_i, t_j = temps[r], temps[r + 1]
+                    tried[r] += 1
+                    if self.should_transition(v_i/t_i + v_j/t_j, v_j/t_i + v_i/t_j, 1.0):
+                        states[r], states[r + 1] = states[r + 1], states[r]
+                        accepted[r] += 1
+
+        for state in states:
+            self.set_state(state)
+            found.append(self.get_lineup())
+        self.set_state(states[0])
+
+        self.swap_stats = []
+        for r in range(len(temps) - 1):
+            self.swap_stats.append({'temps': (temps[r], temps[r + 1]),
+                                    'tried': tried[r],
+                                    'accepted': accepted[r],
+                                    'rate': 1.0*accepted[r]/tried[r] if tried[r] else None})
+        return best_lineups(found, top)
+
+    def find_simulated_annealing_solution(self, schedule=None, patience=None, time_budget=None):
+        for i in range(10):
+            lineup = self.anneal(schedule, patience, time_budget)
+            if lineup is None:
+                print 'No team fits under the cap.'
+                return
+            print '$%d' % lineup.cost, lineup.value, list(lineup.names)
+            print '%d iterations' % self.iterations
+
+    def find_parallel_solutions(self, restarts=10, top=5, workers=None, seed=None, schedule=None, patience=None, time_budget=None):
+        """
+        Runs independent annealing restarts on a process pool.
+
+        Restart i is seeded with seed + i, so a given seed gives the same lineups
+        whatever the number of workers. Without a seed every call differs.
+        schedule, patience and time_budget are passed on to anneal; the number of
+        proposals of each restart is left in the list self.restart_iterations.
+
+        :return the top highest valued distinct lineups, best seen by any restart
+                first, none if no team fits under the capacity
+        """
+        if seed is None:
+            seed = randrange(2**31)
+        seeds = [seed + i for i in range(restarts)]
+        if workers is None:
+            workers = cpu_count()
+        workers = min(workers, restarts)
+
+        options = (schedule, patience, time_budget)
+        if workers <= 1:
+            results = [_anneal_restart(s, self, options) for s in seeds]
+        else:
+            pool = Pool(workers, _init_worker, (self, options))
+            try:
+                results = pool.map(_anneal_restart, seeds)
+            finally:
+                pool.close()
+                pool.join()
+        self.restart_iterations = [iterations for lineup, iterations in results]
+        return best_lineups([lineup for lineup, iterations in results if lineup is not None], top)
+
+
+# the TeamMCMC each pool worker anneals and the anneal options, sent once per
+# worker instead of once per restart
+_worker_mcmc = None
+_worker_options = None
+
+def _init_worker(mcmc, options):
+    global _worker_mcmc, _worker_options
+    _worker_mcmc = mcmc
+    _worker_options = options
+
+def _anneal_restart(restart_seed, mcmc=None, options=None):
+    if mcmc is None:
+        mcmc, options = _worker_mcmc, _worker_options
+    random_seed(restart_seed)
+    lineup = mcmc.anneal(*options)
+    return lineup, mcmc.iterations
+
@@ -0,0 +1,158 @@
+"""
+Mixed integer program for a lineup
+
+One binary variable per player, an equality per class for the composition and
+the salary cap as a single row. Extra linear rows (stacks, exposures, ...) and
+players that must be in or out of the team are added with include(), exclude()
+and add_constraint().
+
+The program is solved with scipy.optimize.milp when scipy has it (scipy 1.9 and
+later). Without it, problems that only use include() and exclude() are solved by
+BranchAndBound instead, and a problem with extra rows raises ImportError.
+"""
+
+import numpy as np
+
+from branch_bound import BranchAndBound
+from lineup import Lineup
+
+try:
+    from scipy.optimize import milp, LinearConstraint, Bounds
+    HAVE_MILP = True
+except ImportError:
+    HAVE_MILP = False
+
+
+class MILPSolver:
+
+    def __init__(self, names, classes, values, costs, capacity, composition):
+
+        self.names = list(names)
+        self.classes = list(classes)
+        self.values = np.asarray(values, dtype=float)
+        self.costs = np.asarray(costs, dtype=float)
+        self.cost_list = list(costs)
+        self.capacity = capacity
+        self.composition = composition
+
+        self.name_index = dict((name, i) for i, name in enumerate(self.names))
+        self.included = set()
+        self.excluded = set()
+        self.constraints = []
+        self.optimal = None
+
+    def include(self, name):
+        self.included.add(self.name_index[name])
+        self.excluded.discard(self.name_index[name])
+
+    def exclude(self, name):
+        self.excluded.add(self.name_index[name])
+        self.included.discard(self.name_index[name])
+
+    def add_constraint(self, coefficients, lb=-np.inf, ub=np.inf):
+        """
+        Adds the row lb <= sum of coefficients[name] * x[name] <= ub, e.g. at least
+        three players of one team with {name: 1 for every player of the team} and lb=3
+        """
+        row = np.zeros(len(self.names))
+        for name, coefficient in coefficients.items():
+            row[self.name_index[name]] = coefficient
+        self.constraints.append((row, lb, ub))
+
+    def salary_limit(self):
+        # the team must cost less than the capacity; with whole salaries that is
+        # at most capacity - 1, otherwise a small tolerance under it
+        if float(self.capacity).is_integer() and all(float(c).is_integer() for c in self.cost_list):
+            return self.capacity - 1
+        return self.capacity - 1e-6
+
+    def find_solution(self, time_budget=None):
+        """
+        Function: find_solution
+        -----------------
+        Finds the highest valued team that costs less than the capacity and meets
+        every added constraint. self.optimal tells whether the team was proven
+        best, or that no team meets the constraints, before the time budget ran out.
+
+        Parameters:
+            :param time_budget: seconds for the solver, unlimited if None
+
+        :return the best Lineup, or None if no team meets the constraints
+        """
+        if HAVE_MILP:
+            return self.solve_milp(time_budget)
+        if self.constraints:
+            raise ImportError('extra lineup constraints need scipy.optimize.milp (scipy 1.9 or later)')
+        return self.solve_branch_bound(time_budget)
+
+    def solve_milp(self, time_budget):
+        n = len(self.names)
+        rows = []
+        lower = []
+        upper = []
+        for c, count in self.composition.items():
+            rows.append(np.array([1.0 if x == c else 0.0 for x in self.classes]))
+            lower.append(count)
+            upper.append(count)
+        rows.append(self.costs)
+        lower.append(-np.inf)
+        upper.append(self.salary_limit())
+        for row, lb, ub in self.constraints:
+            rows.append(row)
+            lower.append(lb)
+            upper.append(ub)
+
+        # players of a class without slots and excluded players are fixed at 0,
+        # included players at 1
+        lb = np.zeros(n)
+        ub = np.array([1.0 if x in self.composition else 0.0 for x in self.classes])
+        for i in self.excluded:
+            ub[i] = 0.0
+        for i in self.included:
+            lb[i] = 1.0
+
+        options = {}
+        if time_budget is not None:
+            options['time_limit'] = time_budget
+        result = milp(-self.values,
+                      constraints=LinearConstraint(np.array(rows), lower, upper),
+                      integrality=np.ones(n),
+                      bounds=Bounds(lb, ub),
+                      options=options)
+        # 0 is an optimal solution, 2 a proven infeasible problem
+        self.optimal = result.status in (0, 2)
+        if result.x is None:
+            return None
+        return self.make_lineup(np.flatnonzero(result.x > 0.5))
+
+    def solve_branch_bound(self, time_budget):
+        # included players are taken out of the problem: their slots and salary are
+        # removed from the composition and the capacity
+        composition = dict(self.composition)
+        capacity = self.capacity
+        for i in self.included:
+            c = self.classes[i]
+            if composition.get(c, 0) == 0:
+                self.optimal = True
+                return None
+            composition[c] -= 1
+            capacity -= self.cost_list[i]
+
+        pool = [i for i in range(len(self.names)) if i not in self.included and i not in self.excluded]
+        solver = BranchAndBound([self.names[i] for i in pool],
+                                [self.classes[i] for i in pool],
+                                self.values[pool],
+                                [self.cost_list[i] for i in pool],
+                                capacity,
+                                composition)
+        lineup = solver.find_solution(time_budget)
+        # proven once the search has closed every node: the gap is 0, or no team
+        # was found and no open node could still hold one
+        self.optimal = solver.gap == 0 or solver.upper_bound == -np.inf
+        if lineup is None:
+            return None
+        return self.make_lineup(sorted(self.included) + [self.name_index[name] for name in lineup.names])
+
+    def make_lineup(self, team):
+        return Lineup(float(self.values[team].sum()), sum(self.cost_list[i] for i in team),
+                      tuple(sorted(self.names[i] for i in team)))
@@ -0,0 +1,146 @@
+import numpy as np
+
+from lineup import Lineup, best_lineups
+
+
+class MultiChainAnnealer:
+    """
+    Simulated annealing over many lineups at once.
+
+    Every chain is one row of a (chains x slots) matrix of player indices and all
+    chains take a step together: one random slot and one random player of the
+    slot's class is proposed per chain, and the Metropolis test is done on the
+    whole vector of value changes.
+    """
+
+    def __init__(self, names, classes, values, costs, capacity, object_composition, chains=256, seed=None):
+
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        self.costs = np.asarray(costs, dtype=float)
+        self.capacity = capacity
+        self.chains = chains
+        self.rand = np.random.RandomState(seed)
+
+        self.class_names = sorted(set(classes) | set(object_composition))
+        class_ids = dict((c, k) for k, c in enumerate(self.class_names))
+        self.classes = np.array([class_ids[c] for c in classes], dtype=int)
+
+        valid_comp = []
+        for c, count in object_composition.items():
+            valid_comp.extend([class_ids[c]]*count)
+        self.slot_classes = np.array(valid_comp, dtype=int)
+
+        # the players of class k are pools[k, :pool_size[k]], padded with -1
+        pools = [np.flatnonzero(self.classes == k) for k in range(len(self.class_names))]
+        self.pool_size = np.array([len(pool) for pool in pools], dtype=int)
+        self.pools = np.empty((len(pools), self.pool_size.max()), dtype=int)
+        self.pools.fill(-1)
+        for k, pool in enumerate(pools):
+            self.pools[k, :len(pool)] = pool
+
+        # cheapest possible cost of the slots after each slot, used to start only
+        # with lineups that can still be completed under the cap
+        cheapest = [np.sort(self.costs[pool]) for pool in pools]
+        slot_min = np.zeros(len(self.slot_classes))
+        used = np.zeros(len(pools), dtype=int)
+        self.feasible = True
+        for slot, k in enumerate(self.slot_classes):
+            if used[k] >= len(cheapest[k]):
+                self.feasible = False
+                break
+            slot_min[slot] = cheapest[k][used[k]]
+            used[k] += 1
+        # the cheapest lineup must cost less than the cap, or no chain can start
+        self.feasible = self.feasible and slot_min.sum() < self.capacity
+        self.min_rest = np.append(np.cumsum(slot_min[::-1])[::-1][1:], 0)
+
+        self.lineups = None
+        self.current_value = None
+        self.current_cost = None
+
+    def draw(self, slots):
+        # a random player of the class of each of the given slots
+        k = self.slot_classes[slots]
+        return self.pools[k, (self.rand.random_sample(len(slots)) * self.pool_size[k]).astype(int)]
+
+    def make_random_teams(self):
+        """
+        Starts every chain from a random lineup under the cap.
+
+        :return False if no lineup fits under the capacity
+        """
+        if not self.feasible:
+            return False
+        slots = len(self.slot_classes)
+        self.lineups = np.empty((self.chains, slots), dtype=int)
+        self.lineups.fill(-1)
+        self.current_cost = np.zeros(self.chains)
+        for slot in range(slots):
+            todo = np.arange(self.chains)
+            while len(todo) > 0:
+                new = self.draw(np.repeat(slot, len(todo)))
+                cost = self.current_cost[todo] + self.costs[new]
+                ok = (cost + self.min_rest[slot] < self.capacity) & \
+                     ~(self.lineups[todo] == new[:, None]).any(axis=1)
+                self.lineups[todo[ok], slot] = new[ok]
+                self.current_cost[todo[ok]] = cost[ok]
+                todo = todo[~ok]
+        self.current_value = self.values[self.lineups].sum(axis=1)
+        return True
+
+    def step(self, temp):
+        # one proposal per chain, returns the number of chains that moved
+        chains = np.arange(self.chains)
+        slots = self.rand.randint(len(self.slot_classes), size=self.chains)
+        old = self.lineups[chains, slots]
+        new = self.draw(slots)
+
+        new_cost = self.current_cost - self.costs[old] + self.costs[new]
+        delta = self.values[new] - self.values[old]
+        valid = (new_cost < self.capacity) & ~(self.lineups == new[:, None]).any(axis=1)
+        with np.errstate(over='ignore'):
+            accept = valid & ((delta > 0) | (self.rand.random_sample(self.chains) < np.exp(delta/temp)))
+
+        moved = chains[accept]
+        self.lineups[moved, slots[accept]] = new[accept]
+        self.current_cost[moved] = new_cost[accept]
+        self.current_value[moved] += delta[accept]
+        return len(moved)
+
+    def anneal(self, temps=None):
+        """
+        Anneals every chain from a random start, keeping the best lineup each chain
+        visited.
+
+        :param temps: the temperature of each step, the same schedule as TeamMCMC if None
+        :return a tuple (values, lineups) of the best value and lineup matrix per chain,
+                or None if no lineup fits under the capacity
+        """
+        if temps is None:
+            temps = np.arange(1000, 0, -0.25)
+        if not self.make_random_teams():
+            return None
+        best_value = self.current_value.copy()
+        best_rows = self.lineups.copy()
+        for temp in temps:
+            self.step(temp)
+            better = self.current_value > best_value
+            best_value[better] = self.current_value[better]
+            best_rows[better] = self.lineups[better]
+        return best_value, best_rows
+
+    def find_solutions(self, top=5, temps=None):
+        """
+        :return the top highest valued distinct lineups over all chains, best first,
+                none if no lineup fits under the capacity
+        """
+        annealed = self.anneal(temps)
+        if annealed is None:
+            return []
+        values, lineups = annealed
+        found = []
+        for row in lineups:
+            found.append(Lineup(float(self.values[row].sum()), int(self.costs[row].sum()),
+                                tuple(sorted(self.names[i] for i in row))))
+        return best_lineups(found, top)
@@ -0,0 +1,135 @@
+"""
+Lineups for multi-entry contests
+
+MultiEntryGenerator streams lineups one at a time from a single branch and bound
+search (BranchAndBound.iter_solutions), each the best team that
+
+    - has no player who is already in max_exposure of the entries, and
+    - shares at most max_overlap players with every lineup before it, one player
+      less than a full team if not given, so no lineup comes out twice.
+
+Lineups and the set of capped players are bitsets over the players (a Python int
+with bit i set for player i), so the exposure check is a single AND. For the
+overlaps every player also has a bitset over the lineups he is in; adding up the
+bitsets of a team's players bit by bit gives, in a few big integer operations,
+how many players it shares with each lineup.
+"""
+
+from branch_bound import BranchAndBound
+
+
+def count_bits(bits):
+    return bin(bits).count('1')
+
+def shared_more_than(lineup_sets, limit, lineups):
+    """
+    :param lineup_sets: for every player of a team, the bitset of the lineups he is in
+    :param limit: the most players the team may share with a lineup
+    :param lineups: the number of lineups
+    :return a bitset of the lineups sharing more than limit players with the team
+    """
+    # planes[b] holds bit b of the number of shared players, for every lineup at once
+    planes = []
+    for carry in lineup_sets:
+        for b in range(len(planes)):
+            planes[b], carry = planes[b] ^ carry, planes[b] & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+
+    # compare every count with limit + 1, from the highest bit down
+    target = limit + 1
+    above = 0
+    equal = (1 << lineups) - 1
+    for b in range(max(len(planes), target.bit_length()) - 1, -1, -1):
+        plane = planes[b] if b < len(planes) else 0
+        if (target >> b) & 1:
+            equal &= plane
+        else:
+            above |= equal & plane
+            equal &= ~plane
+    return above | equal
+
+
+class MultiEntryGenerator:
+
+    def __init__(self, names, classes, values, costs, capacity, composition, max_exposure=1.0, max_overlap=None):
+
+        self.names = list(names)
+        self.max_exposure = max_exposure
+        if max_overlap is None:
+            max_overlap = sum(composition.values()) - 1
+        self.max_overlap = max_overlap
+        self.solver = BranchAndBound(names, classes, values, costs, capacity, composition)
+        self.bits = [1 << i for i in range(len(self.names))]
+        self.reset()
+
+    def reset(self):
+        self.exposure = [0] * len(self.names)
+        self.capped = 0
+        self.lineups = []
+        self.lineup_bits = []
+        self.player_lineups = [0] * len(self.names)
+
+    def team_bits(self, picks):
+        bits = 0
+        while picks is not None:
+            i, picks = picks
+            bits |= self.bits[i]
+        return bits
+
+    def accept(self, picks, picked):
+        # both checks can only turn false as lineups are added, as the search needs
+        if self.team_bits(picks) & self.capped:
+            return False
+        if picked > self.max_overlap and self.lineups:
+            lineup_sets = []
+            while picks is not None:
+                i, picks = picks
+                if self.player_lineups[i]:
+                    lineup_sets.append(self.player_lineups[i])
+            if len(lineup_sets) > self.max_overlap and \
+                    shared_more_than(lineup_sets, self.max_overlap, len(self.lineups)):
+                return False
+        return True
+
+    def generate(self, entries, time_budget=None):
+        """
+        Function: generate
+        -----------------
+        Yields up to entries lineups, best first, as they are found.
+
+        A player is capped once he is in int(max_exposure * entries) lineups (at
+        least one). Fewer lineups come out when the caps and overlaps leave no
+        team, or when the time budget runs out.
+
+        Parameters:
+            :param entries: the number of lineups
+            :param time_budget: seconds for the whole batch, unlimited if None
+
+        :return a generator of Lineups
+        """
+        self.reset()
+        cap = max(1, int(self.max_exposure * entries))
+        for picks in self.solver.iter_solutions(self.accept, time_budget):
+            bits = self.team_bits(picks)
+            self.lineup_bits.append(bits)
+            for i in self.solver.picked(picks):
+                self.player_lineups[i] |= 1 << len(self.lineups)
+                self.exposure[i] += 1
+                if self.exposure[i] >= cap:
+                    self.capped |= self.bits[i]
+
+            lineup = self.solver.make_lineup(picks)
+            self.lineups.append(lineup)
+            yield lineup
+            if len(self.lineups) == entries:
+                return
+
+    def get_exposures(self):
+        """
+        :return a dict from every player in at least one lineup to the share of the lineups he is in
+        """
+        return dict((self.names[i], 1.0 * count / len(self.lineups))
+                    for i, count in enumerate(self.exposure) if count)
@@ -0,0 +1,142 @@
+"""
+Solver portfolio
+
+Runs several anytime engines (anytime.py) at once, each in its own process on the
+same pool. Every better lineup is sent back to the parent, and its value goes into
+a shared multiprocessing.Value that the exact engines use as their bound, so
+branch and bound only searches for teams that beat what the others already have.
+
+An exact engine that finishes sends the value it proved no team beats, which may
+be the value of a lineup another engine has put in the shared bound but not yet
+sent. The race ends once the best lineup received reaches a proven value, when
+every engine is done, or at the deadline, and the other processes are terminated.
+"""
+
+from multiprocessing import Process, Queue, Value
+from Queue import Empty
+import time
+
+from anytime import ENGINES, Progress
+
+PORTFOLIO_ENGINES = ('knapsack', 'branch_bound', 'tabu', 'annealing')
+
+# seconds after the deadline the parent waits for the last lineups
+GRACE_SECONDS = 0.2
+
+
+def _run_engine(name, pool, deadline, shared, results):
+    # sends (name, lineup, proven, done): proven is None, or a value no team beats
+    engine = ENGINES[name](*pool)
+    bound_read = [float('-inf')]
+
+    def bound():
+        bound_read[0] = shared.value
+        return bound_read[0]
+
+    best = None
+    try:
+        for lineup, optimal in engine.incumbents(deadline, bound):
+            improved = lineup is not None and (best is None or lineup.value > best.value)
+            if improved:
+                best = lineup
+                with shared.get_lock():
+                    if lineup.value > shared.value:
+                        shared.value = lineup.value
+            if optimal:
+                # nothing beats the better of the engine's lineup and the bound it
+                # last read, which may be a lineup still on its way from another engine
+                proven = max(bound_read[0], best.value if best is not None else float('-inf'))
+                results.put((name, best, proven, False))
+                break
+            if improved:
+                results.put((name, lineup, None, False))
+    finally:
+        results.put((name, None, None, True))
+
+
+class Portfolio:
+
+    def __init__(self, names, classes, values, costs, capacity, composition, engines=PORTFOLIO_ENGINES):
+
+        self.pool = (list(names), list(classes), list(values), list(costs), capacity, composition)
+        self.engines = list(engines)
+        self.found = {}
+        self.winner = None
+
+    def run(self, time_budget, callback=None):
+        """
+        Function: run
+        -----------------
+        Races the engines for up to time_budget seconds.
+
+        After the race self.found maps every engine to the best lineup it sent and
+        self.winner is the engine of the returned lineup.
+
+        Parameters:
+            :param time_budget: seconds to search
+            :param callback: function (Progress) called on every better lineup;
+                             returning False ends the race
+
+        :return a Progress with the best lineup, or None if no engine found one;
+                optimal is true when an exact engine proved it best
+        """
+        start = time.time()
+        deadline = start + time_budget
+        shared = Value('d', float('-inf'))
+        results = Queue()
+        processes = []
+        for name in self.engines:
+            process = Process(target=_run_engine, args=(name, self.pool, deadline, shared, results))
+            process.daemon = True
+            process.start()
+            processes.append(process)
+
+        self.found = {}
+        self.winner = None
+        best = None
+        proven = None
+        running = len(processes)
+        try:
+            while running:
+                # once a value is proven best, wait for its lineup however long it takes
+                if proven is None:
+                    timeout = max(deadline + GRACE_SECONDS - time.time(), 0.0)
+                else:
+                    timeout = GRACE_SECONDS
+                try:
+                    name, lineup, value, done = results.get(timeout=timeout)
+                except Empty:
+                    if proven is None or not any(process.is_alive() for process in processes):
+                        break
+                    continue
+                if done:
+                    running -= 1
+                    continue
+                if value is not None and (proven is None or value > proven):
+                    proven = value
+                if lineup is not None:
+                    if name not in self.found or lineup.value > self.found[name].value:
+                        self.found[name] = lineup
+                    if best is None or lineup.value > best.value:
+                        best = lineup
+                        self.winner = name
+                        if callback is not None and \
+                                callback(Progress(best, time.time() - start, self.is_proven(best, proven))) is False:
+                            break
+                if self.is_proven(best, proven):
+                    break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+        if best is None:
+            return None
+        return Progress(best, time.time() - start, self.is_proven(best, proven))
+
+    def is_proven(self, best, proven):
+        # the shared bound only ever holds values of lineups that were found
+        if proven is None:
+            return False
+        return best is None and proven == float('-inf') or best is not None and best.value >= proven
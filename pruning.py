@@ -0,0 +1,85 @@
+"""
+Dominance pruning of the player pool
+
+A player is dominated when at least N other players of the same position cost
+no more and are projected no lower, N being the number of slots of that position.
+Whatever team uses a dominated player, one of those N players is left out of it
+and can take his place for the same or a better team, so dominated players are
+dropped before any solver sees them.
+"""
+
+from collections import defaultdict
+from heapq import heappush, heappushpop
+
+
+def find_dominated(classes, values, costs, composition):
+    """
+    Function: find_dominated
+    -----------------
+    Finds the players dominated by at least composition[c] cheaper and better
+    players of their class c.
+
+    Players are taken in order of cost, the better first among equal costs, and
+    each is compared with the N highest values before it. Of two identical players
+    only the later one is dominated.
+
+    Parameters:
+        :param classes: the class of every player
+        :param values: the value of every player
+        :param costs: the cost of every player
+        :param composition: the number of players of each class in a team
+
+    :return a set of player indices
+    """
+    by_class = defaultdict(list)
+    for i, c in enumerate(classes):
+        by_class[c].append(i)
+
+    dominated = set()
+    for c, players in by_class.items():
+        count = composition.get(c, 0)
+        if count == 0:
+            # a class without slots can never be picked
+            dominated.update(players)
+            continue
+
+        best = []
+        for i in sorted(players, key=lambda i: (costs[i], -values[i], i)):
+            if len(best) == count and best[0] >= values[i]:
+                dominated.add(i)
+            elif len(best) < count:
+                heappush(best, values[i])
+            else:
+                heappushpop(best, values[i])
+    return dominated
+
+
+def prune_players(names, classes, values, costs, composition):
+    """
+    Function: prune_players
+    -----------------
+    Drops the dominated players from the pool handed to the solvers.
+
+    :return a tuple ((names, classes, values, costs), report) with the lists of the
+            players that are left and a dict from class to (players left, players before)
+    """
+    dominated = find_dominated(classes, values, costs, composition)
+    keep = [i for i in range(len(names)) if i not in dominated]
+
+    report = {}
+    for c in set(classes):
+        before = sum(1 for x in classes if x == c)
+        left = sum(1 for i in keep if classes[i] == c)
+        report[c] = (left, before)
+
+    pool = ([names[i] for i in keep],
+            [classes[i] for i in keep],
+            [values[i] for i in keep],
+            [costs[i] for i in keep])
+    return pool, report
+
+
+def print_report(report):
+    for c in sorted(report):
+        left, before = report[c]
+        print '%-3s %4d of %4d players left, %d pruned' % (c, left, before, before - left)
@@ -0,0 +1,96 @@
+import csv
+
+import numpy as np
+
+from stat_parsers.stat_store import StatStore
+
+
+# Derived per player rates used by several equations in StatEquations
+RATE_FEATURES = ['exp_ab',        # at bats per game
+                 'adj_slg',       # (1B + 2*2B + 3*3B - 0.25*(AB - H)) / (AB - HR)
+                 'hr_per_pa',
+                 'sb_per_g',
+                 'runs_per_pa',   # 0.330*BA + 0.187*BB% + 0.560*HR/PA
+                 'expected_ip',   # innings pitched per game started
+                 'k_per_9']
+
+
+def divide(numerator, denominator):
+    # elementwise, NaN where the denominator is zero
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, np.nan, numerator / denominator)
+
+
+class RateFeatures:
+
+    def __init__(self, player_stats):
+        self.player_stats = player_stats
+        ''':type: PlayerStats'''
+
+        # built on first use, so nothing is read when the features are constructed
+        self.features = None
+
+    def build(self):
+        # every feature is computed for all players of a year at once, from whole columns
+        self.player_stats.load('batter_totals')
+        self.player_stats.load('pitcher_totals')
+        stats = self.player_stats.stats
+
+        self.features = StatStore()
+        for name in stats.names:
+            self.features.add(name)
+
+        for year in stats.get_years():
+            col = lambda stat: stats.column(stat, year)
+            ab = col('ab_total')
+            g = col('g_total')
+            hr = col('hr_total')
+            pa = col('pa_total')
+            ip = col('ip_total')
+
+            hr_per_pa = divide(hr, pa)
+            features = {'exp_ab': divide(ab, g),
+                        'adj_slg': divide(col('1b_total') + 2.0 * col('2b_total') + 3.0 * col('3b_total') -
+                                          0.25 * (ab - col('h_total')), ab - hr),
+                        'hr_per_pa': hr_per_pa,
+                        'sb_per_g': divide(col('sb_total'), g),
+                        'runs_per_pa': 0.330 * col('ba_total') + 0.187 * col('bb_percent_total') + 0.560 * hr_per_pa,
+                        'expected_ip': divide(ip, col('gs_total')),
+                        'k_per_9': divide(col('k_pitched_total'), ip / 9.0)}
+
+            for feature in RATE_FEATURES:
+                self.features.set_column(feature, year, features[feature])
+
+    def built(self):
+        if self.features is None:
+            self.build()
+        return self.features
+
+    def get(self, player, feature, year):
+        # NaN, not None, when a stat is missing or a denominator is zero, so a
+        # missing stat gives a NaN score like score_many instead of a TypeError
+        features = self.built()
+        i = features.get_id(player)
+        if i is None:
+            return float('nan')
+        return float(features.column(feature, year)[i])
+
+    def take(self, feature, year, players):
+        features = self.built()
+        return features.take(feature, year, None, features.lookup(players))
+
+    def export(self, outfile):
+        # writes one row per player and year with at least one feature
+        self.built()
+        with open(outfile, 'w') as f:
+            writer = csv.writer(f, quotechar='"')
+            writer.writerow(['Name', 'Year'] + RATE_FEATURES)
+            for year in self.features.get_years():
+                columns = [self.features.column(feature, year) for feature in RATE_FEATURES]
+                for i, name in enumerate(self.features.names):
+                    row = [c[i] for c in columns]
+                    if all(np.isnan(row)):
+                        continue
+                    if isinstance(name, unicode):
+                        name = name.encode('utf-8')
+                    writer.writerow([name, year] + ['' if np.isnan(v) else '%.6f' % v for v in row])
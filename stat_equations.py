@@ -1,6 +1,11 @@
+import numpy as np
+
+from matchup_context import MatchupContext, Matchup
+from rate_features import RateFeatures
+
 class StatEquations:
 
-    def __init__(self, player_stats, team_stats, ballpark_stats, league_stats, daily_stats):
+    def __init__(self, player_stats, team_stats, ballpark_stats, league_stats, daily_stats, matchups=None, rates=None):
         self.player_stats = player_stats
         ''':type: PlayerStats'''
         self.ballpark_stats = ballpark_stats
@@ -12,6 +17,18 @@ class StatEquations:
         self.daily_stats = daily_stats
         ''':type: DailyStats'''
 
+        # opponent, park and opposing starter of every team playing today
+        if matchups is None:
+            matchups = MatchupContext(player_stats, team_stats, ballpark_stats)
+        self.matchups = matchups
+        ''':type: MatchupContext'''
+
+        # derived per player rates (AB per game, IP per start, ...)
+        if rates is None:
+            rates = RateFeatures(player_stats)
+        self.rates = rates
+        ''':type: RateFeatures'''
+
         self.year = 2014
 
     ############
@@ -19,35 +36,29 @@ class StatEquations:
     ############
 
     def pitcher_points_expected_for_k(self, player):
-        pitcher_k_per_9 = self.player_stats.get_k_pitched(self.year, player) / (self.player_stats.get_ip(self.year, player) / 9.0)
-        expected_ip = self.player_stats.get_ip(self.year, player) / self.player_stats.get_gs(self.year, player)
+        pitcher_k_per_9 = self.rates.get(player, 'k_per_9', self.year)
+        expected_ip = self.rates.get(player, 'expected_ip', self.year)
 
         playerTeam = self.player_stats.get_team(player)
         playerPitchHand = self.player_stats.get_throwing_hand(player)
-        oppTeam = self.team_stats.get_opponent(playerTeam)
+        oppTeam = self.matchups.get(playerTeam).opponent
 
         opp_k_percentage = (self.team_stats.get_so(self.year, oppTeam, playerPitchHand) / self.team_stats.get_pa(self.year, oppTeam, playerPitchHand)) / self.league_stats.get_k_percent(self.year)
 
         return pitcher_k_per_9 * (expected_ip/9) * opp_k_percentage
 
     def pitcher_expected_ip(self, player):
-        return self.player_stats.get_ip(self.year, player) / self.player_stats.get_gs(self.year, player)
+        return self.rates.get(player, 'expected_ip', self.year)
 
     def pitcher_points_expected_for_win(self, player):
         # TODO: need vegas lines
         return 2
 
     def pitcher_points_expected_for_er(self, player):
-        player_team = self.player_stats.get_team(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        player_loc = self.team_stats.get_home_or_away(player_team)
-        xfip = self.player_stats.get_xfip(self.year, player, player_loc)
-
-        if player_loc=='home':
-            park_team = player_team
-        else:
-            park_team = opp_team
-        park_factor = self.ballpark_stats.get_overall_park_factor(park_team)
+        matchup = self.matchups.get(self.player_stats.get_team(player))
+        opp_team = matchup.opponent
+        xfip = self.player_stats.get_xfip(self.year, player, matchup.home_or_away)
+        park_factor = matchup.park_factor
 
         player_hand = self.player_stats.get_throwing_hand(player)
         pitcher_hand_hits = 1.0 * self.team_stats.get_woba(self.year, opp_team, player_hand) / self.league_stats.get_woba(self.year)
@@ -60,29 +71,21 @@ class StatEquations:
 
 
     def batter_points_expected_for_hits(self, player):
-        adj_slg = (1.0 * self.player_stats.get_1b_total(self.year, player) +
-                   2.0 * self.player_stats.get_2b_total(self.year, player) +
-                   3.0 * self.player_stats.get_3b_total(self.year, player) -
-                   0.25 * (self.player_stats.get_ab_total(self.year, player) - self.player_stats.get_h_total(self.year, player))) / \
-                  (self.player_stats.get_ab_total(self.year, player) - self.player_stats.get_hr_total(self.year, player))
+        adj_slg = self.rates.get(player, 'adj_slg', self.year)
 
-        exp_ab = 1.0 * self.player_stats.get_ab_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        exp_ab = self.rates.get(player, 'exp_ab', self.year)
 
         player_team = self.player_stats.get_team(player)
         player_hand = self.player_stats.get_batting_hand(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        matchup = self.matchups.get(player_team)
+        opp_pitcher = matchup.opp_pitcher
         opp_pitcher_woba = self.player_stats.get_woba_allowed(self.year, opp_pitcher, player_hand)
         opp_pitcher_eff = 1.0 * opp_pitcher_woba / self.league_stats.get_woba(self.year)
 
-        opp_pitcher_hand = self.player_stats.get_throwing_hand(opp_pitcher)
+        opp_pitcher_hand = matchup.opp_pitcher_hand
         player_bat_eff = 1.0 * self.player_stats.get_woba(self.year, player, opp_pitcher_hand) / self.league_stats.get_woba(self.year)
 
-        if self.team_stats.get_home_or_away(player_team)=='home':
-            park = player_team
-        else:
-            park = opp_team
-        park_factor = self.ballpark_stats.get_avg_park_factor(park, player_hand)
+        park_factor = matchup.avg_park_factor.get(player_hand)
 
         return adj_slg * exp_ab * opp_pitcher_eff * player_bat_eff * park_factor
 
@@ -90,12 +93,12 @@ class StatEquations:
     def batter_points_expected_for_walks(self, player):
         batter_walk_percentage = self.player_stats.get_bb_percent_total(self.year, player)
 
-        exp_ab = 1.0 * self.player_stats.get_ab_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        exp_ab = self.rates.get(player, 'exp_ab', self.year)
 
         player_team = self.player_stats.get_team(player)
         player_hand = self.player_stats.get_batting_hand(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        matchup = self.matchups.get(player_team)
+        opp_pitcher = matchup.opp_pitcher
         pitcher_bb_perc = 1.0 * self.player_stats.get_bb_allowed(self.year, opp_pitcher, player_hand) / self.player_stats.get_tbf(self.year, opp_pitcher, player_hand)
         league_bb_perc = 1.0 * self.league_stats.get_bb(self.year) / self.league_stats.get_pa(self.year)
         pitcher_eff_walk = pitcher_bb_perc / league_bb_perc
@@ -103,36 +106,31 @@ class StatEquations:
         return batter_walk_percentage * exp_ab * pitcher_eff_walk
 
     def batter_points_expected_for_hr(self, player):
-        batter_hr_percentage = 1.0 * self.player_stats.get_hr_total(self.year, player) / self.player_stats.get_pa_total(self.year, player)
+        batter_hr_percentage = self.rates.get(player, 'hr_per_pa', self.year)
 
-        exp_ab = 1.0 * self.player_stats.get_ab_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        exp_ab = self.rates.get(player, 'exp_ab', self.year)
 
         player_team = self.player_stats.get_team(player)
         player_hand = self.player_stats.get_batting_hand(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        matchup = self.matchups.get(player_team)
+        opp_pitcher = matchup.opp_pitcher
         opp_pitcher_hr_percentage = 1.0 * self.player_stats.get_hr_allowed(self.year, opp_pitcher, player_hand) / self.player_stats.get_tbf(self.year, opp_pitcher, player_hand)
         league_avg_hr_percentage = 1.0 * self.league_stats.get_hr(self.year) / self.league_stats.get_pa(self.year)
         opp_pitcher_eff_hr = opp_pitcher_hr_percentage / league_avg_hr_percentage
 
-        opp_pitcher_hand = self.player_stats.get_throwing_hand(opp_pitcher)
+        opp_pitcher_hand = matchup.opp_pitcher_hand
         batter_hr_vs_hand_percentage = self.player_stats.get_hr(self.year, player, opp_pitcher_hand) / self.player_stats.get_pa(self.year, player, opp_pitcher_hand)
         batter_eff_hr = batter_hr_vs_hand_percentage / league_avg_hr_percentage
 
-        if self.team_stats.get_home_or_away(player_team)=='home':
-            park = player_team
-        else:
-            park = opp_team
-        park_factor_hr = self.ballpark_stats.get_hr_park_factor(park, player_hand)
+        park_factor_hr = matchup.hr_park_factor.get(player_hand)
 
         return 4.0 * batter_hr_percentage * exp_ab * opp_pitcher_eff_hr * batter_eff_hr * park_factor_hr
 
 
     def batter_points_expected_for_sb(self, player):
-        batter_sb_per_game = 1.0 * self.player_stats.get_sb_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        batter_sb_per_game = self.rates.get(player, 'sb_per_g', self.year)
 
-        player_team = self.player_stats.get_team(player)
-        opp_team = self.team_stats.get_opponent(player_team)
+        opp_team = self.matchups.get(self.player_stats.get_team(player)).opponent
         team_sb_percentage = 1.0 * self.team_stats.get_sb_allowed(self.year, opp_team) / (self.team_stats.get_sb_allowed(self.year, opp_team) + self.team_stats.get_cs_fielding(self.year, opp_team))
         league_sb_percentage =  1.0 * self.league_stats.get_sb(self.year) / (self.league_stats.get_sb(self.year) + self.league_stats.get_cs(self.year))
         team_eff_sb = team_sb_percentage / league_sb_percentage
@@ -140,27 +138,21 @@ class StatEquations:
         return 2.0* batter_sb_per_game * team_eff_sb
 
     def batter_points_expected_for_runs(self, player):
-        batter_runs_per_pa = 0.330 * self.player_stats.get_ba_total(self.year, player) + \
-                             0.187 * self.player_stats.get_bb_percent_total(self.year, player) + \
-                             0.560 * self.player_stats.get_hr_total(self.year, player) / self.player_stats.get_pa_total(self.year, player)
+        batter_runs_per_pa = self.rates.get(player, 'runs_per_pa', self.year)
 
-        exp_ab = 1.0 * self.player_stats.get_ab_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        exp_ab = self.rates.get(player, 'exp_ab', self.year)
 
         player_team = self.player_stats.get_team(player)
         player_hand = self.player_stats.get_batting_hand(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        matchup = self.matchups.get(player_team)
+        opp_pitcher = matchup.opp_pitcher
         opp_pitcher_woba = self.player_stats.get_woba_allowed(self.year, opp_pitcher, player_hand)
         opp_pitcher_eff = 1.0 * opp_pitcher_woba / self.league_stats.get_woba(self.year)
 
-        opp_pitcher_hand = self.player_stats.get_throwing_hand(opp_pitcher)
+        opp_pitcher_hand = matchup.opp_pitcher_hand
         player_bat_eff = 1.0 * self.player_stats.get_woba(self.year, player, opp_pitcher_hand) / self.league_stats.get_woba(self.year)
 
-        if self.team_stats.get_home_or_away(player_team)=='home':
-            park = player_team
-        else:
-            park = opp_team
-        park_factor = self.ballpark_stats.get_overall_park_factor(park)
+        park_factor = matchup.park_factor
 
         # TODO: get batting order for runs
         batting_order_factor = 1.0
@@ -171,27 +163,21 @@ class StatEquations:
 
 
     def batter_points_expected_for_rbi(self, player):
-        batter_runs_per_pa = 0.330 * self.player_stats.get_ba_total(self.year, player) + \
-                             0.187 * self.player_stats.get_bb_percent_total(self.year, player) + \
-                             0.560 * self.player_stats.get_hr_total(self.year, player) / self.player_stats.get_pa_total(self.year, player)
+        batter_runs_per_pa = self.rates.get(player, 'runs_per_pa', self.year)
 
-        exp_ab = 1.0 * self.player_stats.get_ab_total(self.year, player) / self.player_stats.get_g_total(self.year, player)
+        exp_ab = self.rates.get(player, 'exp_ab', self.year)
 
         player_team = self.player_stats.get_team(player)
         player_hand = self.player_stats.get_batting_hand(player)
-        opp_team = self.team_stats.get_opponent(player_team)
-        opp_pitcher = self.player_stats.get_starting_pitcher(opp_team)
+        matchup = self.matchups.get(player_team)
+        opp_pitcher = matchup.opp_pitcher
         opp_pitcher_woba = self.player_stats.get_woba_allowed(self.year, opp_pitcher, player_hand)
         opp_pitcher_eff = 1.0 * opp_pitcher_woba / self.league_stats.get_woba(self.year)
 
-        opp_pitcher_hand = self.player_stats.get_throwing_hand(opp_pitcher)
+        opp_pitcher_hand = matchup.opp_pitcher_hand
         player_bat_eff = 1.0 * self.player_stats.get_woba(self.year, player, opp_pitcher_hand) / self.league_stats.get_woba(self.year)
 
-        if self.team_stats.get_home_or_away(player_team)=='home':
-            park = player_team
-        else:
-            park = opp_team
-        park_factor = self.ballpark_stats.get_overall_park_factor(park)
+        park_factor = matchup.park_factor
 
         # TODO: get batting order for RBI
         batting_order_factor = 1.0
@@ -214,3 +200,113 @@ class StatEquations:
                    self.batter_points_expected_for_hr(player) + \
                    self.batter_points_expected_for_sb(player) + \
                    self.batter_points_expected_for_walks(player)
+
+    ################
+    # BATCH SCORES #
+    ################
+
+    SCORE_COMPONENTS = ['ip', 'er', 'k', 'win', 'runs', 'hits', 'rbi', 'hr', 'sb', 'walks']
+
+    def score_many(self, players):
+        # Scores every player in one vectorized pass, with the same formulas as the
+        # pitcher_points_expected_for_* and batter_points_expected_for_* methods.
+        # Returns (components, totals): components has one row per player and one
+        # column per SCORE_COMPONENTS entry (0 where a component does not apply to
+        # the player's position), totals is the row sum. Missing stats give NaN.
+        # the getters below read their own families; these are the families of the
+        # columns taken straight from the StatStores
+        for family in ('pitcher_home_away', 'pitcher_splits', 'batter_splits', 'batter_totals'):
+            self.player_stats.load(family)
+        for family in ('team_totals', 'team_splits', 'fielding'):
+            self.team_stats.load(family)
+
+        y = self.year
+        ps = self.player_stats.stats
+        ts = self.team_stats.stats
+        n = len(players)
+
+        # everything that needs a dict lookup is gathered once per player
+        teams = [self.player_stats.get_team(p) for p in players]
+        matchups = [self.matchups.get(t) for t in teams]
+        no_matchup = Matchup(*([None] * len(Matchup._fields)))
+        matchups = [m if m is not None else no_matchup for m in matchups]
+        opps = [m.opponent for m in matchups]
+        home_or_away = np.array([m.home_or_away for m in matchups], dtype=object)
+        opp_pitchers = [m.opp_pitcher for m in matchups]
+        is_pitcher = np.array([self.player_stats.get_fielding_position(p)=='P' for p in players])
+        bats = np.array([self.player_stats.get_batting_hand(p) for p in players], dtype=object)
+        throws = np.array([self.player_stats.get_throwing_hand(p) for p in players], dtype=object)
+        opp_throws = np.array([m.opp_pitcher_hand for m in matchups], dtype=object)
+
+        ids = ps.lookup(players)
+        opp_pitcher_ids = ps.lookup(opp_pitchers)
+        team_ids = ts.lookup(teams)
+        opp_ids = ts.lookup(opps)
+
+        def split(store, stat, ids, hands, suffix):
+            left = store.take(stat, y, 'L' + suffix, ids)
+            right = store.take(stat, y, 'R' + suffix, ids)
+            return np.where(hands=='left', left, np.where(hands=='right', right, np.nan))
+
+        def park_factor(values):
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        league_woba = self.league_stats.get_woba(y)
+        league_hr_perc = 1.0 * self.league_stats.get_hr(y) / self.league_stats.get_pa(y)
+        league_bb_perc = 1.0 * self.league_stats.get_bb(y) / self.league_stats.get_pa(y)
+        league_sb_perc = 1.0 * self.league_stats.get_sb(y) / (self.league_stats.get_sb(y) + self.league_stats.get_cs(y))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # pitchers
+            expected_ip = self.rates.take('expected_ip', y, players)
+            k_per_9 = self.rates.take('k_per_9', y, players)
+            opp_k_perc = (split(ts, 'so', opp_ids, throws, 'HP') / split(ts, 'pa', opp_ids, throws, 'HP')) / self.league_stats.get_k_percent(y)
+            # no home or away split without a matchup
+            xfip = np.where(home_or_away=='home', ps.take('xfip', y, 'home', ids),
+                            np.where(home_or_away=='away', ps.take('xfip', y, 'away', ids), np.nan))
+            pitcher_hand_hits = split(ts, 'woba', opp_ids, throws, 'HP') / league_woba
+            overall_park = park_factor([m.park_factor for m in matchups])
+
+            pitcher_k = k_per_9 * (expected_ip / 9) * opp_k_perc
+            pitcher_er = -1.0 / 9 * xfip * overall_park * pitcher_hand_hits * expected_ip
+
+            # batters
+            exp_ab = self.rates.take('exp_ab', y, players)
+            hr_per_pa = self.rates.take('hr_per_pa', y, players)
+            runs_per_pa = self.rates.take('runs_per_pa', y, players)
+            bb_perc = ps.take('bb_percent_total', y, None, ids)
+
+            opp_pitcher_eff = split(ps, 'woba_allowed', opp_pitcher_ids, bats, 'HB') / league_woba
+            player_bat_eff = split(ps, 'woba', ids, opp_throws, 'HP') / league_woba
+            opp_tbf = split(ps, 'tbf', opp_pitcher_ids, bats, 'HB')
+
+            batter_hits = self.rates.take('adj_slg', y, players) * exp_ab * opp_pitcher_eff * player_bat_eff * park_factor([m.avg_park_factor and m.avg_park_factor.get(h) for m, h in zip(matchups, bats)])
+
+            pitcher_eff_walk = (split(ps, 'bb_allowed', opp_pitcher_ids, bats, 'HB') / opp_tbf) / league_bb_perc
+            batter_walks = bb_perc * exp_ab * pitcher_eff_walk
+
+            opp_pitcher_eff_hr = (split(ps, 'hr_allowed', opp_pitcher_ids, bats, 'HB') / opp_tbf) / league_hr_perc
+            batter_eff_hr = (split(ps, 'hr', ids, opp_throws, 'HP') / split(ps, 'pa', ids, opp_throws, 'HP')) / league_hr_perc
+            batter_hr = 4.0 * hr_per_pa * exp_ab * opp_pitcher_eff_hr * batter_eff_hr * park_factor([m.hr_park_factor and m.hr_park_factor.get(h) for m, h in zip(matchups, bats)])
+
+            opp_sb_allowed = ts.take('sb_allowed', y, None, opp_ids)
+            team_sb_perc = opp_sb_allowed / (opp_sb_allowed + ts.take('cs_fielding', y, None, opp_ids))
+            batter_sb = 2.0 * self.rates.take('sb_per_g', y, players) * (team_sb_perc / league_sb_perc)
+
+            team_factor = ts.take('runs_team', y, None, team_ids) / (self.league_stats.get_hr(y) / 30.0)
+            batter_runs = runs_per_pa * exp_ab * opp_pitcher_eff * player_bat_eff * overall_park * team_factor
+
+        components = np.zeros((n, len(self.SCORE_COMPONENTS)))
+        p, b = is_pitcher, ~is_pitcher
+        components[p, 0] = expected_ip[p]
+        components[p, 1] = pitcher_er[p]
+        components[p, 2] = pitcher_k[p]
+        components[p, 3] = 2
+        components[b, 4] = batter_runs[b]
+        components[b, 5] = batter_hits[b]
+        components[b, 6] = batter_runs[b]
+        components[b, 7] = batter_hr[b]
+        components[b, 8] = batter_sb[b]
+        components[b, 9] = batter_walks[b]
+
+        return components, components.sum(axis=1)
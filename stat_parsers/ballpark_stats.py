@@ -1,29 +1,33 @@
+from lazy import LazyStats, loads
+from team_stats import resolve_team
+from loader_registry import read_table
 from collections import defaultdict
-import csv
 import json
 
-class BallparkStats:
+class BallparkStats(LazyStats):
+
+    STAT_FAMILIES = [('park', 'read_ballpark_stats')]
 
     def __init__(self, statsDir):
         self.statsDir = statsDir.rstrip('/')
 
         self.stats = defaultdict(dict)
-
-        self.read_ballpark_stats()
+        self.loaded = set()
 
     def read_ballpark_stats(self):
         stats = ['overall', 'avg_lhb', 'avg_rhb', 'hr_lhb', 'hr_rhb']
         infile = '%s/Park Factor/Ball Park Factor.csv' %(self.statsDir)
-        reader = csv.reader(open(infile), quotechar='"')
-        header = reader.next()
-        for items in reader:
-            team = items[0].upper()
+        header, rows = read_table(infile)
+        for items in rows:
+            team = resolve_team(items[0]) or items[0].upper()
             for i, stat_val in enumerate([float(x) for x in items[1:6]]):
                 self.stats[team][stats[i]] = stat_val
 
+    @loads('park')
     def get_overall_park_factor(self, team):
         return self.stats[team]['overall']
 
+    @loads('park')
     def get_avg_park_factor(self, team, hand):
         if hand.lower()=='left':
             return self.stats[team]['avg_lhb']
@@ -32,6 +36,7 @@ class BallparkStats:
         else:
             return None
 
+    @loads('park')
     def get_hr_park_factor(self, team, hand):
         if hand.lower()=='left':
             return self.stats[team]['hr_lhb']
@@ -41,4 +46,5 @@ class BallparkStats:
             return None
 
     def printStats(self):
+        self.preload()
         print json.dumps(self.stats, indent=4)
\ No newline at end of file
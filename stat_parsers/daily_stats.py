@@ -1,31 +1,33 @@
 from team_stats import *
+from stat_store import StatStore
+from lazy import LazyStats, loads
+from loader_registry import read_table
 from collections import defaultdict
-import csv
 import json
 
-class DailyStats:
+class DailyStats(LazyStats):
+
+    STAT_FAMILIES = [('team_totals', 'read_team_stats'),
+                     ('team_splits', 'read_team_left_right')]
 
     def __init__(self, statsDir):
         self.statsDir = statsDir.rstrip('/')
 
-        self.stats = defaultdict(dict)
-        self.stats = defaultdict(lambda: defaultdict( lambda: defaultdict( lambda: defaultdict (dict))))
-
-        self.read_team_stats()
-        self.read_team_left_right()
+        self.stats = StatStore()
+        self.loaded = set()
 
     def read_team_stats(self):
         years = [2013, 2014]
         for year in years:
             infile = '%s/Team/%d Team Stats.csv' %(self.statsDir, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 team = get_team_by_mascot(items[0])
-                self.stats[team][year]['runs_team'] = float(items[1])
+                self.stats.set(team, 'runs_team', year, float(items[1]))
 
+    @loads('team_totals')
     def get_runs(self, year, team):
-        return self.stats[team][year]['runs_team']
+        return self.stats.get(team, 'runs_team', year)
 
     def read_team_left_right(self):
         stats = ['so', 'pa']
@@ -33,28 +35,30 @@ class DailyStats:
         for year in years:
             for hand in ['RHP', 'LHP']:
                 infile = '%s/Team/%d Team Stats vs %s.csv' %(self.statsDir, year, hand)
-                reader = csv.reader(open(infile), quotechar='"')
-                header = reader.next()
-                for items in reader:
+                header, rows = read_table(infile)
+                for items in rows:
                     team = get_team_by_mascot(items[0])
                     for i, stat_val in enumerate([float(x) for x in items[1:3]]):
-                        self.stats[team][year][stats[i]][hand] = stat_val
+                        self.stats.set(team, stats[i], year, stat_val, hand)
 
+    @loads('team_splits')
     def get_so(self, year, team, hand):
         if hand.lower()=='left':
-            return self.stats[team][year]['so']['LHP']
+            return self.stats.get(team, 'so', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[team][year]['so']['RHP']
+            return self.stats.get(team, 'so', year, 'RHP')
         else:
             return None
 
+    @loads('team_splits')
     def get_pa(self, year, team, hand):
         if hand.lower()=='left':
-            return self.stats[team][year]['pa']['LHP']
+            return self.stats.get(team, 'pa', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[team][year]['pa']['RHP']
+            return self.stats.get(team, 'pa', year, 'RHP')
         else:
             return None
 
     def printStats(self):
-        print json.dumps(self.stats, indent=4)
\ No newline at end of file
+        self.preload()
+        print json.dumps(self.stats.as_dict(), indent=4)
\ No newline at end of file
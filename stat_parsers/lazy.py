@@ -0,0 +1,49 @@
+"""
+Lazy loading of stat families
+
+A stats class lists its stat families in STAT_FAMILIES as (family, read method)
+pairs and decorates every getter with @loads(family). Nothing is read when the
+object is constructed; the first call to any getter of a family runs its read
+method, and preload() reads every family up front for batch jobs.
+"""
+
+from functools import wraps
+
+def loads(family):
+    """
+    Decorator for getters that need the given stat family to be read first
+    """
+    def decorator(getter):
+        @wraps(getter)
+        def wrapper(self, *args, **kwargs):
+            if family not in self.loaded:
+                self.load(family)
+            return getter(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+class LazyStats:
+
+    STAT_FAMILIES = []
+
+    def load(self, family):
+        """
+        Reads the given stat family unless it has been read already
+        """
+        if family in self.loaded:
+            return
+        getattr(self, dict(self.STAT_FAMILIES)[family])()
+        self.loaded.add(family)
+
+    def preload(self):
+        """
+        Reads every stat family
+        """
+        for family, read_method in self.STAT_FAMILIES:
+            self.load(family)
+
+    def set_loaded(self):
+        """
+        Marks every stat family as read, used when the stats are restored from a snapshot
+        """
+        self.loaded.update(family for family, read_method in self.STAT_FAMILIES)
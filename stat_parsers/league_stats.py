@@ -1,55 +1,66 @@
+from lazy import LazyStats, loads
+from loader_registry import read_table
 from collections import defaultdict
-import csv
 import json
 
-class LeagueStats:
+class LeagueStats(LazyStats):
+
+    STAT_FAMILIES = [('league', 'read_league_stats')]
 
     def __init__(self, statsDir):
         self.statsDir = statsDir.rstrip('/')
 
         self.stats = defaultdict(dict)
-
-        self.read_league_stats()
+        self.loaded = set()
 
     def read_league_stats(self):
         stats = ['k_percent', 'ops', 'sb', 'cs', 'hr', 'pa', 'bb', 'r', 'woba']
         years = [2013, 2014]
         for year in years:
             infile = '%s/League/%d League Stats.csv' %(self.statsDir, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 for i, stat_val in enumerate([float(x.rstrip('%')) for x in items[1:10]]):
                     if stats[i]=='k_percent':
                         stat_val/=100.0
                     self.stats[year][stats[i]] = stat_val
 
+    @loads('league')
     def get_k_percent(self, year):
         return self.stats[year]['k_percent']
 
+    @loads('league')
     def get_ops(self, year):
         return self.stats[year]['ops']
 
+    @loads('league')
     def get_sb(self, year):
         return self.stats[year]['sb']
 
+    @loads('league')
     def get_cs(self, year):
         return self.stats[year]['cs']
 
+    @loads('league')
     def get_hr(self, year):
         return self.stats[year]['hr']
 
+    @loads('league')
     def get_pa(self, year):
         return self.stats[year]['pa']
 
+    @loads('league')
     def get_bb(self, year):
         return self.stats[year]['bb']
 
+    @loads('league')
     def get_r(self, year):
         return self.stats[year]['r']
 
+    @loads('league')
     def get_woba(self, year):
         return self.stats[year]['woba']
 
     def print_stats(self):
+        self.preload()
         print json.dumps(self.stats, indent=4)
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Process wide registry of parsed stat files
+
+Several stats classes read the same CSVs (TeamStats and DailyStats both read the
+Team Stats and Team Stats vs RHP/LHP files). read_table() parses each file once
+per process and hands the same rows to every caller; a file is parsed again only
+if it changed on disk. get_parse_counts() reports how many parses were avoided.
+"""
+
+import csv
+import os
+import threading
+
+_tables = {}
+_counts = {'parsed': 0, 'reused': 0}
+_lock = threading.Lock()
+
+def read_table(infile, header=True):
+    """
+    Function: read_table
+    -----------------
+    Reads a CSV file, or returns the rows parsed by an earlier call.
+
+    The rows are shared between callers and must not be modified.
+
+    Parameters:
+        :param infile: the CSV file
+        :param header: whether the first line of the file is a header
+
+    :return a tuple (header, rows) where header is a tuple of column names (None
+            if the file has no header) and rows is a list of tuples of strings
+    """
+    path = os.path.abspath(infile)
+    mtime = os.path.getmtime(path)
+    with _lock:
+        entry = _tables.get((path, header))
+        if entry is not None and entry[0]==mtime:
+            _counts['reused'] += 1
+            return entry[1], entry[2]
+
+    reader = csv.reader(open(path), quotechar='"')
+    names = tuple(reader.next()) if header else None
+    rows = [tuple(items) for items in reader]
+
+    with _lock:
+        _tables[(path, header)] = (mtime, names, rows)
+        _counts['parsed'] += 1
+    return names, rows
+
+def get_parse_counts():
+    """
+    :return a dict with the number of files 'parsed' and the number of parses 'reused'
+    """
+    with _lock:
+        return dict(_counts)
+
+def clear_tables():
+    """
+    Forgets every parsed file and resets the counts
+    """
+    with _lock:
+        _tables.clear()
+        _counts['parsed'] = 0
+        _counts['reused'] = 0
@@ -58,52 +58,73 @@ Source of stats: Fangraphs & FanDuel salary scrape
 
 import time
 from team_stats import *
+from roster_cache import RosterCache, ROSTER_CACHE_TTL
+from stat_store import StatStore
+from lazy import LazyStats, loads
+from loader_registry import read_table
 from collections import defaultdict
-import csv
 import json
 import urllib2
+import httplib
 import re
 from bs4 import BeautifulSoup
+from multiprocessing.pool import ThreadPool
 import sys
 
-class PlayerStats:
+ROSTER_URL = 'http://espn.go.com/mlb/team/roster/_/name/%s/sort/lastName/%s-%s'
+ROSTER_WORKERS = 8
+ROSTER_TIMEOUT = 10
+ROSTER_RETRIES = 3
 
-    def __init__(self, statsDir):
+HAND_MAP = {'R': 'right',
+            'L': 'left',
+            'B': 'switch',
+            'S': 'switch'}
+
+class PlayerStats(LazyStats):
+
+    STAT_FAMILIES = [('rosters', 'read_rosters'),
+                     ('pitcher_home_away', 'read_pitcher_stats_home_away'),
+                     ('pitcher_splits', 'read_pitcher_stats_vs_RHB_LHB'),
+                     ('pitcher_totals', 'read_pitcher_stats_total'),
+                     ('catcher_fielding', 'read_catcher_fielding_stats'),
+                     ('batter_splits', 'read_batter_stats_vs_RHP_LHP'),
+                     ('batter_totals', 'read_batter_stats_total'),
+                     ('fanduel', 'read_fanduel_positions_and_salaries')]
+
+    def __init__(self, statsDir, roster_workers=ROSTER_WORKERS, roster_ttl=ROSTER_CACHE_TTL, offline=False,
+                 roster_url=ROSTER_URL):
         """
         Function: _init_
         -----------------
 
-        This is the initial function. It takes in the stats directory as a parameter,
-        and calls the 'read_*' functions.
+        This is the initial function. It takes in the stats directory as a parameter.
+        Nothing is read here: each 'read_*' function is called the first time one of
+        the getters of its stat family (see STAT_FAMILIES) is used, or all of them at
+        once by preload().
 
         Parameters:
             :param statsDir: Directory in Dropbox with all Stats. Should always be:
                         /Dropbox/MDI Fantasy Sports/Stats
+            :param roster_workers: number of team rosters fetched from ESPN at once
+            :param roster_ttl: number of seconds a cached roster is used without asking ESPN
+            :param offline: if True, rosters are only read from the cache and ESPN is never contacted
+            :param roster_url: roster page URL, formatted with (team, location, mascot)
 
         :return nothing
         """
         self.statsDir = statsDir.rstrip('/')
-
-        self.stats = defaultdict(lambda: defaultdict( lambda: defaultdict( lambda: defaultdict (dict))))
+        self.roster_workers = roster_workers
+        self.roster_cache = RosterCache(self.statsDir, roster_ttl)
+        self.offline = offline
+        self.roster_url = roster_url
+
+        # numeric stats by (stat, year, split) column, see StatStore
+        self.stats = StatStore()
+        # per player attributes: team, bats, throws, fielding_position, salary, starting
+        self.info = defaultdict(dict)
         self.starting_pitchers = {}
-
-        self.read_rosters()
-        self.read_pitcher_stats_home_away()
-        self.read_pitcher_stats_vs_RHB_LHB()
-        self.read_pitcher_stats_total()
-        self.read_catcher_fielding_stats()
-        self.read_batter_stats_vs_RHP_LHP()
-        self.read_batter_stats_total()
-
-        # must be read after rosters
-        self.read_fanduel_positions_and_salaries()
-
-        # print len([name for name, stats in self.stats.items() if 'bats' in stats])
-        # print len([name for name, stats in self.stats.items() if 2014 in stats])
-        # print len([name for name, stats in self.stats.items() if 2013 in stats])
-
-        # self.printStats()
-        # self.printPitchers()
+        self.loaded = set()
 
     def printStats(self):
         """
@@ -116,7 +137,9 @@ class PlayerStats:
 
         :return none
         """
-        print json.dumps(self.stats, indent=4)
+        self.preload()
+        print json.dumps(self.stats.as_dict(), indent=4)
+        print json.dumps(self.info, indent=4)
 
     def printPitchers(self):
         """
@@ -129,6 +152,7 @@ class PlayerStats:
 
         :return none
         """
+        self.load('fanduel')
         print json.dumps(self.starting_pitchers, indent=4)
 
     def read_pitcher_stats_home_away(self):
@@ -149,13 +173,13 @@ class PlayerStats:
         for year in years:
             for loc in ['Home', 'Away']:
                 infile = '%s/Pitcher/%d/%d %s Pitcher Stats.csv' %(self.statsDir, year, year, loc)
-                reader = csv.reader(open(infile), quotechar='"')
-                header = reader.next()
-                for items in reader:
+                header, rows = read_table(infile)
+                for items in rows:
                     player = items[0].lower()
                     xfip = float(items[2])
-                    self.stats[player][year][stat][loc.lower()] = xfip
+                    self.stats.set(player, stat, year, xfip, loc.lower())
 
+    @loads('pitcher_home_away')
     def get_pitcher_xfip_allowed(self, year, player, homeOrAway):
         """
         Function: get_pitcher_xfip_allowed
@@ -172,7 +196,7 @@ class PlayerStats:
         equations used in:
             pitcher_points_expected_for_er
         """
-        return self.stats[player][year]['xfip'][homeOrAway]
+        return self.stats.get(player, 'xfip', year, homeOrAway)
 
     def read_pitcher_stats_vs_RHB_LHB(self):
         """
@@ -192,13 +216,13 @@ class PlayerStats:
         for year in years:
             for hand in ['RHB', 'LHB']:
                 infile = '%s/Pitcher/%d/%d Pitcher Stats vs %s.csv' %(self.statsDir, year, year, hand)
-                reader = csv.reader(open(infile), quotechar='"')
-                header = reader.next()
-                for items in reader:
+                header, rows = read_table(infile)
+                for items in rows:
                     player = items[0].lower()
                     for i, stat_val in enumerate([float(x) for x in items[2:6]]):
-                        self.stats[player][year][stats[i]][hand] = stat_val
+                        self.stats.set(player, stats[i], year, stat_val, hand)
 
+    @loads('pitcher_splits')
     def get_pitcher_hr_allowed_vs_RHB_LHB(self, year, player, hand):
         """
         Function: get_pitcher_hr_allowed_vs_RHB_LHB
@@ -216,12 +240,13 @@ class PlayerStats:
             batter_points_expected_for_hr
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['hr_allowed']['LHB']
+            return self.stats.get(player, 'hr_allowed', year, 'LHB')
         elif hand.lower()=='right':
-            return self.stats[player][year]['hr_allowed']['RHB']
+            return self.stats.get(player, 'hr_allowed', year, 'RHB')
         else:
             return None
 
+    @loads('pitcher_splits')
     def get_pitcher_bb_allowed_vs_RHB_LHB(self, year, player, hand):
         """
         Function: get_pitcher_bb_allowed_vs_RHB_LHB
@@ -239,12 +264,13 @@ class PlayerStats:
             batter_points_expected_for_walks
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['bb_allowed']['LHB']
+            return self.stats.get(player, 'bb_allowed', year, 'LHB')
         elif hand.lower()=='right':
-            return self.stats[player][year]['bb_allowed']['RHB']
+            return self.stats.get(player, 'bb_allowed', year, 'RHB')
         else:
             return None
 
+    @loads('pitcher_splits')
     def get_pitcher_total_batters_faced_vs_RHB_LHB(self, year, player, hand):
         """
         Function: get_pitcher_total_batters_faced_vs_RHB_LHB
@@ -263,12 +289,13 @@ class PlayerStats:
             batter_points_expected_for_hr
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['tbf']['LHB']
+            return self.stats.get(player, 'tbf', year, 'LHB')
         elif hand.lower()=='right':
-            return self.stats[player][year]['tbf']['RHB']
+            return self.stats.get(player, 'tbf', year, 'RHB')
         else:
             return None
 
+    @loads('pitcher_splits')
     def get_pitcher_woba_allowed_vs_RHB_LHB(self, year, player, hand):
         """
         Function: get_pitcher_woba_allowed_vs_RHB_LHB
@@ -288,9 +315,9 @@ class PlayerStats:
             batter_points_expected_for_hits
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['woba_allowed']['LHB']
+            return self.stats.get(player, 'woba_allowed', year, 'LHB')
         elif hand.lower()=='right':
-            return self.stats[player][year]['woba_allowed']['RHB']
+            return self.stats.get(player, 'woba_allowed', year, 'RHB')
         else:
             return None
 
@@ -311,13 +338,13 @@ class PlayerStats:
         years = [2013, 2014]
         for year in years:
             infile = '%s/Pitcher/%d/%d Total Pitcher Stats.csv' %(self.statsDir, year, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 player = items[0].lower()
                 for i, stat_val in enumerate([float(x) for x in items[2:5]]):
-                    self.stats[player][year][stats[i]] = stat_val
+                    self.stats.set(player, stats[i], year, stat_val)
 
+    @loads('pitcher_totals')
     def get_pitcher_total_games_started(self, year, player):
         """
         Function: get_pitcher_total_games_started
@@ -334,8 +361,9 @@ class PlayerStats:
             pitcher_points_expected_for_k
             pitcher_expected_ip
         """
-        return self.stats[player][year]['gs_total']
+        return self.stats.get(player, 'gs_total', year)
 
+    @loads('pitcher_totals')
     def get_pitcher_total_k(self, year, player):
         """
         Function: get_pitcher_total_k
@@ -351,8 +379,9 @@ class PlayerStats:
         equations used in:
             pitcher_points_expected_for_k
         """
-        return self.stats[player][year]['k_pitched_total']
+        return self.stats.get(player, 'k_pitched_total', year)
 
+    @loads('pitcher_totals')
     def get_pitcher_total_innings_pitched(self, year, player):
         """
         Function: get_pitcher_total_innings_pitched
@@ -369,7 +398,7 @@ class PlayerStats:
             pitcher_points_expected_for_k
             pitcher_expected_ip
         """
-        return self.stats[player][year]['ip_total']
+        return self.stats.get(player, 'ip_total', year)
 
     def read_catcher_fielding_stats(self):
         """
@@ -387,13 +416,13 @@ class PlayerStats:
         years = [2013, 2014]
         for year in years:
             infile = '%s/Catcher/%d Catcher Stats.csv' %(self.statsDir, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 player = items[0].lower()
                 for i, stat_val in enumerate([float(x) for x in items[2:4]]):
-                    self.stats[player][year][stats[i]] = stat_val
+                    self.stats.set(player, stats[i], year, stat_val)
 
+    @loads('catcher_fielding')
     def get_catcher_fielding_stolen_bases_allowed(self, year, player):
         """
         Function: get_catcher_fielding_stolen_bases_allowed
@@ -409,8 +438,9 @@ class PlayerStats:
         equations used in:
             Not used yet. Would be used in batter_points_expected_for_sb
         """
-        return self.stats[player][year]['sb_catcher']
+        return self.stats.get(player, 'sb_catcher', year)
 
+    @loads('catcher_fielding')
     def get_catcher_fielding_caught_stealing(self, year, player):
         """
         Function: get_catcher_fielding_caught_stealing
@@ -426,7 +456,7 @@ class PlayerStats:
         equations used in:
             Not used yet. Would be used in batter_points_expected_for_sb
         """
-        return self.stats[player][year]['cs_catcher']
+        return self.stats.get(player, 'cs_catcher', year)
 
     def read_batter_stats_vs_RHP_LHP(self):
         """
@@ -446,13 +476,13 @@ class PlayerStats:
         for year in years:
             for hand in ['RHP', 'LHP']:
                 infile = '%s/Batter/%d/%d Batter Stats vs %s.csv' %(self.statsDir, year, year, hand)
-                reader = csv.reader(open(infile), quotechar='"')
-                header = reader.next()
-                for items in reader:
+                header, rows = read_table(infile)
+                for items in rows:
                     player = items[0].lower()
                     for i, stat_val in enumerate([float(x) for x in items[2:6]]):
-                        self.stats[player][year][stats[i]][hand] = stat_val
+                        self.stats.set(player, stats[i], year, stat_val, hand)
 
+    @loads('batter_splits')
     def get_batter_plate_appearances_vs_RHP_LHP(self, year, player, hand):
         """
         Function: get_batter_plate_appearances_vs_RHP_LHP
@@ -470,12 +500,13 @@ class PlayerStats:
             batter_points_expected_for_hr
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['pa']['LHP']
+            return self.stats.get(player, 'pa', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[player][year]['pa']['RHP']
+            return self.stats.get(player, 'pa', year, 'RHP')
         else:
             return None
 
+    @loads('batter_splits')
     def get_batter_hr_vs_RHP_LHP(self, year, player, hand):
         """
         Function: get_batter_hr_vs_RHP_LHP
@@ -493,12 +524,13 @@ class PlayerStats:
             batter_points_expected_for_hr
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['hr']['LHP']
+            return self.stats.get(player, 'hr', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[player][year]['hr']['RHP']
+            return self.stats.get(player, 'hr', year, 'RHP')
         else:
             return None
 
+    @loads('batter_splits')
     def get_batter_k_vs_RHP_LHP(self, year, player, hand):
         #TODO: Check to see why this is not used
         """
@@ -517,12 +549,13 @@ class PlayerStats:
             Not used...interesting.
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['k']['LHP']
+            return self.stats.get(player, 'k', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[player][year]['k']['RHP']
+            return self.stats.get(player, 'k', year, 'RHP')
         else:
             return None
 
+    @loads('batter_splits')
     def get_batter_woba_vs_RHP_LHP(self, year, player, hand):
         """
         Function: get_batter_woba_vs_RHP_LHP
@@ -542,9 +575,9 @@ class PlayerStats:
             batter_points_expected_for_hits
         """
         if hand.lower()=='left':
-            return self.stats[player][year]['woba']['LHP']
+            return self.stats.get(player, 'woba', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[player][year]['woba']['RHP']
+            return self.stats.get(player, 'woba', year, 'RHP')
         else:
             return None
 
@@ -577,15 +610,15 @@ class PlayerStats:
         years = [2013, 2014]
         for year in years:
             infile = '%s/Batter/%d/%d Total Batter Stats.csv' %(self.statsDir, year, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 player = items[0].lower()
                 for i, stat_val in enumerate([float(x.rstrip('%')) for x in items[2:15]]):
                     if stats[i]=='bb_percent_total':
                         stat_val/=100.0
-                    self.stats[player][year][stats[i]] = stat_val
+                    self.stats.set(player, stats[i], year, stat_val)
 
+    @loads('batter_totals')
     def get_batter_1b_total(self, year, player):
         """
         Function: get_batter_1b_total
@@ -601,8 +634,9 @@ class PlayerStats:
         equations used in:
             batter_points_expected_for_hits
         """
-        return self.stats[player][year]['1b_total']
+        return self.stats.get(player, '1b_total', year)
 
+    @loads('batter_totals')
     def get_batter_2b_total(self, year, player):
         """
         Function: get_batter_2b_total
@@ -618,8 +652,9 @@ class PlayerStats:
         equations used in:
             batter_points_expected_for_hits
         """
-        return self.stats[player][year]['2b_total']
+        return self.stats.get(player, '2b_total', year)
 
+    @loads('batter_totals')
     def get_batter_3b_total(self, year, player):
         """
         Function: get_batter_3b_total
@@ -635,8 +670,9 @@ class PlayerStats:
         equations used in:
             batter_points_expected_for_hits
         """
-        return self.stats[player][year]['3b_total']
+        return self.stats.get(player, '3b_total', year)
 
+    @loads('batter_totals')
     def get_batter_hits_total(self, year, player):
         """
         Function: get_batter_hits_total
@@ -652,8 +688,9 @@ class PlayerStats:
         equations used in:
             batter_points_expected_for_hits
         """
-        return self.stats[player][year]['h_total']
+        return self.stats.get(player, 'h_total', year)
 
+    @loads('batter_totals')
     def get_batter_bb_total(self, year, player):
         """
         Function: get_batter_bb_total
@@ -669,8 +706,9 @@ class PlayerStats:
         equations used in:
             not used...probably because we already have the bb% stat
         """
-        return self.stats[player][year]['bb_total']
+        return self.stats.get(player, 'bb_total', year)
 
+    @loads('batter_totals')
     def get_batter_bb_percent_total(self, year, player):
         """
         Function: get_batter_bb_percent_total
@@ -688,8 +726,9 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player][year]['bb_percent_total']
+        return self.stats.get(player, 'bb_percent_total', year)
 
+    @loads('batter_totals')
     def get_batter_hr_total(self, year, player):
         """
         Function: get_batter_hr_total
@@ -708,8 +747,9 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player][year]['hr_total']
+        return self.stats.get(player, 'hr_total', year)
 
+    @loads('batter_totals')
     def get_batter_ab_total(self, year, player):
         """
         Function: get_batter_ab_total
@@ -729,8 +769,9 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player][year]['ab_total']
+        return self.stats.get(player, 'ab_total', year)
 
+    @loads('batter_totals')
     def get_batter_pa_total(self, year, player):
         """
         Function: get_batter_pa_total
@@ -750,8 +791,9 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player][year]['pa_total']
+        return self.stats.get(player, 'pa_total', year)
 
+    @loads('batter_totals')
     def get_batter_ba_total(self, year, player):
         """
         Function: get_batter_ba_total
@@ -770,8 +812,9 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player][year]['ba_total']
+        return self.stats.get(player, 'ba_total', year)
 
+    @loads('batter_totals')
     def get_batter_games_played_total(self, year, player):
         """
         Function: get_batter_games_played_total
@@ -792,8 +835,9 @@ class PlayerStats:
             batter_points_expected_for_rbi
             batter_points_expected_for_sb
         """
-        return self.stats[player][year]['g_total']
+        return self.stats.get(player, 'g_total', year)
 
+    @loads('batter_totals')
     def get_batter_sb_total(self, year, player):
         """
         Function: get_batter_sb_total
@@ -809,8 +853,9 @@ class PlayerStats:
         equations used in:
             batter_points_expected_for_sb
         """
-        return self.stats[player][year]['sb_total']
+        return self.stats.get(player, 'sb_total', year)
 
+    @loads('batter_totals')
     def get_batter_cs_total(self, year, player):
         #TODO: determine why we dont use this stat
         """
@@ -827,7 +872,7 @@ class PlayerStats:
         equations used in:
             not used yet...might not use
         """
-        return self.stats[player][year]['cs_total']
+        return self.stats.get(player, 'cs_total', year)
 
     def read_fanduel_positions_and_salaries(self):
         """
@@ -842,22 +887,24 @@ class PlayerStats:
 
         :return nothing
         """
+        # team of each starting pitcher comes from the rosters
+        self.load('rosters')
         try:
             date = time.strftime('%Y-%m-%d')
             # TODO: this is a daily stat
             infile = '%s/Daily/%s-fanduel-salaries.csv' %(self.statsDir, date)
-            reader = csv.reader(open(infile), quotechar='"')
-        except IOError:
+            header, rows = read_table(infile, header=False)
+        except (IOError, OSError):
             print "Salaries don't exist, dipshit."
-        for items in reader:
+        for items in rows:
             # Sample entry:
             # OF,Colby RasmusDL,2.3,37,TAM@TOR,"$3,500 ",Add
             position = items[0]
             player, status = self._clean_name(items[1])
             player = self._normalize_name(player)
             salary = self._clean_salary(items[5])
-            self.stats[player]['fielding_position'] = position
-            self.stats[player]['salary'] = salary
+            self.info[player]['fielding_position'] = position
+            self.info[player]['salary'] = salary
 
             # TODO: change to None when we have real lineups
             starting = True
@@ -865,7 +912,7 @@ class PlayerStats:
                 starting = True
             if status=='DL':
                 starting = False
-            self.stats[player]['starting'] = status
+            self.info[player]['starting'] = status
 
             if status=='P':
                 team = self.get_team(player)
@@ -884,6 +931,7 @@ class PlayerStats:
         """
         return int(salary.strip().replace('$', '').replace(',', ''))
 
+    @loads('fanduel')
     def get_player_fielding_position(self, player):
         """
         Function: get_player_fielding_position
@@ -898,8 +946,9 @@ class PlayerStats:
         equations used in:
            get_score
         """
-        return self.stats[player]['fielding_position']
+        return self.info.get(player, {}).get('fielding_position')
 
+    @loads('fanduel')
     def get_player_salary(self, player):
         """
         Function: get_player_salary
@@ -914,8 +963,9 @@ class PlayerStats:
         equations used in:
            get_score
         """
-        return self.stats[player]['salary']
+        return self.info.get(player, {}).get('salary')
 
+    @loads('fanduel')
     def get_player_starting_status(self, player):
         #TODO: Where is this used?
 
@@ -935,9 +985,9 @@ class PlayerStats:
         equations used in:
            unknown
         """
-        return self.stats[player]['starting']
+        return self.info.get(player, {}).get('starting')
 
-    def read_rosters(self):
+    def read_rosters(self, workers=None, timeout=ROSTER_TIMEOUT, retries=ROSTER_RETRIES, revalidate=True):
         """
         Function:read_rosters
         -----------------
@@ -945,50 +995,141 @@ class PlayerStats:
 
             http://espn.go.com/mlb/team/roster/_/name/(TEAM)/sort/lastName/(LOCATION)-(MASCOT)
 
+        Parsed rosters are kept in the roster cache (see RosterCache). Only teams whose
+        cached roster is older than the TTL are requested, and when revalidating the
+        cached ETag/Last-Modified are sent so an unchanged page is not downloaded again.
+        In offline mode only the cache is read. If a request fails for a team that is
+        already cached, the stale roster is used and it is requested again next run.
+
+        The rosters are fetched concurrently by a bounded pool of threads and merged
+        in team order, so the result does not depend on which request finishes first.
+
         Note: This method includes:
 
             - Mapping for Handedness of Batters and Pitchers
             - Normalization of Team Identifier across ESPN and FanDuel
 
         Parameters:
-            :param none
+            :param workers: number of rosters fetched at once (defaults to roster_workers from _init_)
+            :param timeout: seconds to wait on each request
+            :param retries: number of attempts per team before giving up
+            :param revalidate: send the cached validators with each request
 
         :return nothing
         """
-        handMap = {'R': 'right',
-                   'L': 'left',
-                   'B': 'switch',
-                   'S': 'switch'}
-
-        for team in get_teams():
-            url_team = team
-            if team=='LOS':
-                url_team = 'LAD'
-            elif team=='CWS':
-                url_team='CHW'
-            elif team=='SDP':
-                url_team='SD'
-            elif team=='SFG':
-                url_team='SF'
-
-            url_mascot = get_team_mascot(team).lower().replace(' ', '-')
-            url_location = get_team_location(team).lower().replace(' ', '-')
-            url = 'http://espn.go.com/mlb/team/roster/_/name/%s/sort/lastName/%s-%s' %(url_team.lower(), url_location, url_mascot)
-            doc = urllib2.urlopen(url).read()
-            soup = BeautifulSoup(doc)
-            tab = soup.find('table')
-            # header = [td.text for td in tab.find_all('tr')[1].find_all('td')]
-            # Header for data is : ['NO.', 'NAME', 'POS', 'BAT', 'THW', 'AGE', 'HT', 'WT', 'BIRTH PLACE', 'SALARY']
-            player_data = [[td.text for td in tr.find_all('td')] for tr in tab.find_all('tr')[2:]]
-            for p in player_data:
-                # TODO: could use this DL information.
-                player = re.sub('DL[0-9]*$', '', p[1]).strip().lower()
-                # TODO: could use this position info
-                position = p[2]
-                self.stats[player]['team'] = team
-                self.stats[player]['bats'] = handMap[p[3]]
-                self.stats[player]['throws'] = handMap[p[4]]
+        if workers is None:
+            workers = self.roster_workers
+        cache = self.roster_cache
+        teams = sorted(get_teams())
 
+        if self.offline:
+            stale = []
+            for team in teams:
+                if not cache.has_team(team):
+                    print 'No cached roster for %s, skipping it.' %(team)
+        else:
+            stale = [team for team in teams if not cache.is_fresh(team)]
+
+        if stale:
+            def fetch(team):
+                if revalidate:
+                    etag, last_modified = cache.get_validators(team)
+                else:
+                    etag, last_modified = None, None
+                try:
+                    return self._fetch_roster(team, timeout, retries, etag, last_modified)
+                except (IOError, httplib.HTTPException) as e:
+                    if not cache.has_team(team):
+                        raise
+                    print 'Could not fetch the roster for %s (%s), using the cached one.' %(team, e)
+                    return None
+
+            if workers > 1:
+                pool = ThreadPool(min(workers, len(stale)))
+                try:
+                    results = pool.map(fetch, stale)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                results = [fetch(team) for team in stale]
+
+            for team, result in zip(stale, results):
+                if result is None:
+                    continue
+                roster, etag, last_modified = result
+                if roster is None:
+                    cache.touch(team)
+                else:
+                    cache.set_roster(team, roster, etag, last_modified)
+            cache.write()
+
+        for roster in [cache.get_roster(team) for team in teams]:
+            for player, team, bats, throws in roster:
+                self.info[player]['team'] = team
+                self.info[player]['bats'] = bats
+                self.info[player]['throws'] = throws
+
+    def _fetch_roster(self, team, timeout, retries, etag=None, last_modified=None):
+        """
+        Function: _fetch_roster
+        -----------------
+        Private method to download and parse the ESPN roster of a single team
+
+        Parameters:
+            :param team: the team whose roster we want
+            :param timeout: seconds to wait on each request
+            :param retries: number of attempts before the last error is raised
+            :param etag: ETag of the cached roster, sent as If-None-Match
+            :param last_modified: Last-Modified of the cached roster, sent as If-Modified-Since
+
+        :return a tuple (roster, etag, last_modified) where roster is a list of
+                (player, team, bats, throws) tuples, or None if the page has not changed
+
+        equations used in:
+            read_rosters
+        """
+        url_team = get_team_espn_code(team)
+        url_mascot = get_team_mascot(team).lower().replace(' ', '-')
+        url_location = get_team_location(team).lower().replace(' ', '-')
+        url = self.roster_url %(url_team.lower(), url_location, url_mascot)
+
+        request = urllib2.Request(url)
+        if etag:
+            request.add_header('If-None-Match', etag)
+        if last_modified:
+            request.add_header('If-Modified-Since', last_modified)
+
+        for attempt in range(1, retries + 1):
+            try:
+                response = urllib2.urlopen(request, timeout=timeout)
+                doc = response.read()
+                break
+            except urllib2.HTTPError as e:
+                if e.code==304:
+                    return None, etag, last_modified
+                if attempt==retries:
+                    raise
+            except (IOError, httplib.HTTPException):
+                if attempt==retries:
+                    raise
+            time.sleep(0.5 * attempt)
+
+        soup = BeautifulSoup(doc)
+        tab = soup.find('table')
+        # header = [td.text for td in tab.find_all('tr')[1].find_all('td')]
+        # Header for data is : ['NO.', 'NAME', 'POS', 'BAT', 'THW', 'AGE', 'HT', 'WT', 'BIRTH PLACE', 'SALARY']
+        player_data = [[td.text for td in tr.find_all('td')] for tr in tab.find_all('tr')[2:]]
+        roster = []
+        for p in player_data:
+            # TODO: could use this DL information.
+            player = re.sub('DL[0-9]*$', '', p[1]).strip().lower()
+            # TODO: could use this position info
+            position = p[2]
+            roster.append((player, team, HAND_MAP[p[3]], HAND_MAP[p[4]]))
+        return roster, response.info().getheader('ETag'), response.info().getheader('Last-Modified')
+
+    @loads('rosters')
     def get_player_throwing_hand(self, player):
         """
         Function: get_player_throwing_hand
@@ -1010,8 +1151,9 @@ class PlayerStats:
            batter_points_expected_for_runs
            batter_points_expected_for_rbi
         """
-        return self.stats[player]['throws']
+        return self.info.get(player, {}).get('throws')
 
+    @loads('rosters')
     def get_player_batting_hand(self, player):
         """
         Function: get_player_batting_hand
@@ -1033,8 +1175,9 @@ class PlayerStats:
            batter_points_expected_for_runs
            batter_points_expected_for_rbi
         """
-        return self.stats[player]['bats']
+        return self.info.get(player, {}).get('bats')
 
+    @loads('rosters')
     def get_player_team(self, player):
         """
         Function: get_player_team
@@ -1057,7 +1200,7 @@ class PlayerStats:
             batter_points_expected_for_runs
             batter_points_expected_for_rbi
         """
-        return self.stats[player]['team']
+        return self.info.get(player, {}).get('team')
 
     def get_player_batting_position(self, player):
         # TODO: not computing position right now
@@ -1080,6 +1223,7 @@ class PlayerStats:
         return 4
         #return randint(1, 9)
 
+    @loads('fanduel')
     def get_starting_pitcher(self, team):
         """
         Function: get_starting_pitcher
@@ -1089,16 +1233,47 @@ class PlayerStats:
         Parameters:
             :param team: the team whose starting pitcher we are looking for
 
-        :return the SP for the specified team
+        :return the SP for the specified team, None if the team has no starter today
 
         equations used in:
-            batter_points_expected_for_hits
-            batter_points_expected_for_walks
-            batter_points_expected_for_hr
-            batter_points_expected_for_runs
-            batter_points_expected_for_rbi
+            MatchupContext
         """
-        return self.starting_pitchers[team]
+        return self.starting_pitchers.get(team)
+
+    @loads('fanduel')
+    def set_starting_pitcher(self, team, player):
+        """
+        Function: set_starting_pitcher
+        -----------------
+        Helper method to change the starting pitcher of a given team, e.g. after a late scratch
+
+        Parameters:
+            :param team: the team whose starting pitcher changed
+            :param player: the new starting pitcher
+
+        :return nothing
+
+        equations used in:
+            MatchupContext
+        """
+        self.starting_pitchers[team] = player
+
+    @loads('fanduel')
+    def get_starting_pitchers(self):
+        """
+        Function: get_starting_pitchers
+        -----------------
+        Helper method for all of the starting pitchers of the day
+
+        Parameters:
+            :param none
+
+        :return a list of the starting pitchers of every team playing today
+
+        equations used in:
+            find_team.py
+        """
+        return self.starting_pitchers.values()
 
     def _normalize_name(self, name):
         """
@@ -1143,6 +1318,7 @@ class PlayerStats:
         else:
             return name.lower(), None
 
+    @loads('fanduel')
     def get_active_players(self):
         """
         Function: get_active_players
@@ -1158,9 +1334,37 @@ class PlayerStats:
             find_team.py
         """
         players = []
-        for k, v in self.stats.items():
+        for k, v in self.info.items():
             # TODO: hack to avoid players when we don't know their starting pitcher.
             # this should not be an issue when we read real rosters.
             if v.get('starting', False) and (v.get('team', None) in self.starting_pitchers):
                 players.append(k)
         return players
+
+    # Short names used by StatEquations
+    get_xfip = get_pitcher_xfip_allowed
+    get_hr_allowed = get_pitcher_hr_allowed_vs_RHB_LHB
+    get_bb_allowed = get_pitcher_bb_allowed_vs_RHB_LHB
+    get_tbf = get_pitcher_total_batters_faced_vs_RHB_LHB
+    get_woba_allowed = get_pitcher_woba_allowed_vs_RHB_LHB
+    get_gs = get_pitcher_total_games_started
+    get_k_pitched = get_pitcher_total_k
+    get_ip = get_pitcher_total_innings_pitched
+    get_pa = get_batter_plate_appearances_vs_RHP_LHP
+    get_hr = get_batter_hr_vs_RHP_LHP
+    get_woba = get_batter_woba_vs_RHP_LHP
+    get_1b_total = get_batter_1b_total
+    get_2b_total = get_batter_2b_total
+    get_3b_total = get_batter_3b_total
+    get_h_total = get_batter_hits_total
+    get_bb_percent_total = get_batter_bb_percent_total
+    get_hr_total = get_batter_hr_total
+    get_ab_total = get_batter_ab_total
+    get_pa_total = get_batter_pa_total
+    get_ba_total = get_batter_ba_total
+    get_g_total = get_batter_games_played_total
+    get_sb_total = get_batter_sb_total
+    get_fielding_position = get_player_fielding_position
+    get_throwing_hand = get_player_throwing_hand
+    get_batting_hand = get_player_batting_hand
+    get_team = get_player_team
@@ -0,0 +1,146 @@
+"""
+Class: RosterCache
+Author: Poirel & Jett
+
+This class keeps the parsed ESPN team rosters on disk so that PlayerStats does
+not have to download and parse every roster page on each run. All teams are
+kept in a single file:
+
+    - /Stats/Rosters/rosters.json
+
+Each entry is keyed by team code and stores the parsed (player, team, bats, throws)
+rows together with the time they were fetched and the ETag/Last-Modified validators
+returned by ESPN, which are sent back on the next request to revalidate the entry.
+"""
+
+import json
+import os
+import time
+
+ROSTER_CACHE_TTL = 3 * 60 * 60
+
+class RosterCache:
+
+    def __init__(self, statsDir, ttl=ROSTER_CACHE_TTL):
+        """
+        Function: _init_
+        -----------------
+
+        Reads the roster cache file if it exists.
+
+        Parameters:
+            :param statsDir: Directory in Dropbox with all Stats
+            :param ttl: number of seconds a cached roster is used without asking ESPN
+
+        :return nothing
+        """
+        self.statsDir = statsDir.rstrip('/')
+        self.ttl = ttl
+        self.path = '%s/Rosters/rosters.json' %(self.statsDir)
+        self.teams = {}
+        self.read()
+
+    def read(self):
+        """
+        Function: read
+        -----------------
+        Reads every cached roster with a single file read. A missing or corrupt
+        cache file is treated as an empty cache.
+
+        :return nothing
+        """
+        try:
+            with open(self.path) as f:
+                self.teams = json.load(f)
+        except (IOError, ValueError):
+            self.teams = {}
+
+    def write(self):
+        """
+        Function: write
+        -----------------
+        Writes the cache back to disk. The file is replaced atomically so a crash
+        never leaves a half written cache behind.
+
+        :return nothing
+        """
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp = '%s.tmp' %(self.path)
+        with open(tmp, 'w') as f:
+            json.dump(self.teams, f)
+        os.rename(tmp, self.path)
+
+    def has_team(self, team):
+        return team in self.teams
+
+    def is_fresh(self, team):
+        """
+        Function: is_fresh
+        -----------------
+        Parameters:
+            :param team: the team code
+
+        :return True if the team is cached and younger than the TTL
+        """
+        entry = self.teams.get(team)
+        return entry is not None and (time.time() - entry['fetched']) < self.ttl
+
+    def get_roster(self, team):
+        """
+        Function: get_roster
+        -----------------
+        Parameters:
+            :param team: the team code
+
+        :return a list of (player, team, bats, throws) tuples, empty if the team is not cached
+        """
+        entry = self.teams.get(team)
+        if entry is None:
+            return []
+        return [tuple(row) for row in entry['rows']]
+
+    def get_validators(self, team):
+        """
+        Function: get_validators
+        -----------------
+        Parameters:
+            :param team: the team code
+
+        :return a tuple (etag, last_modified) of the cached entry, (None, None) if unknown
+        """
+        entry = self.teams.get(team, {})
+        return entry.get('etag'), entry.get('last_modified')
+
+    def set_roster(self, team, roster, etag=None, last_modified=None):
+        """
+        Function: set_roster
+        -----------------
+        Stores a freshly parsed roster
+
+        Parameters:
+            :param team: the team code
+            :param roster: a list of (player, team, bats, throws) tuples
+            :param etag: ETag header returned with the roster page
+            :param last_modified: Last-Modified header returned with the roster page
+
+        :return nothing
+        """
+        self.teams[team] = {'fetched': time.time(),
+                            'etag': etag,
+                            'last_modified': last_modified,
+                            'rows': [list(row) for row in roster]}
+
+    def touch(self, team):
+        """
+        Function: touch
+        -----------------
+        Marks a cached roster as fresh again, used when ESPN reports it has not changed
+
+        Parameters:
+            :param team: the team code
+
+        :return nothing
+        """
+        self.teams[team]['fetched'] = time.time()
@@ -0,0 +1,245 @@
+"""
+Snapshot of the parsed stats directory
+
+compile_snapshot() writes the parsed state of PlayerStats, BallparkStats, TeamStats,
+LeagueStats and DailyStats to a single file so later runs do not have to parse
+every CSV again:
+
+    - /Stats/stats.snapshot
+
+Layout of the file:
+
+    - 8 byte magic and the 8 byte offset of the index
+    - every StatStore as a raw float64 matrix (one row per column), 64 byte aligned
+    - a small pickled index: the mtime, size and md5 of every file under the stats
+      directory, the date it was compiled on, the non numeric state of each object
+      and where each StatStore matrix lives in the file
+
+load_stats() memory-maps the matrices when the index still matches the stats
+directory, and otherwise parses the CSVs as usual and rewrites the snapshot.
+
+Usage:
+
+    python snapshot.py /path/to/Stats
+"""
+
+from player_stats import PlayerStats, ROSTER_WORKERS
+from ballpark_stats import BallparkStats
+from team_stats import TeamStats, get_teams
+from league_stats import LeagueStats
+from daily_stats import DailyStats
+from roster_cache import RosterCache, ROSTER_CACHE_TTL
+from stat_store import StatStore
+from collections import defaultdict
+import numpy as np
+import argparse
+import cPickle
+import hashlib
+import os
+import struct
+import time
+
+SNAPSHOT_MAGIC = 'AMSNAP01'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ALIGN = 64
+
+# attributes saved for each stats object, in the order load_stats returns them
+SNAPSHOT_OBJECTS = [('player_stats', ['stats', 'info', 'starting_pitchers']),
+                    ('ballpark_stats', ['stats']),
+                    ('team_stats', ['stats', 'info']),
+                    ('league_stats', ['stats']),
+                    ('daily_stats', ['stats'])]
+
+def get_snapshot_path(statsDir):
+    return '%s/stats.snapshot' %(statsDir.rstrip('/'))
+
+def _file_hash(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), ''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def _list_sources(statsDir, path):
+    # every file under the stats directory except the snapshot itself
+    skip = os.path.abspath(path)
+    sources = {}
+    for root, dirs, files in os.walk(statsDir):
+        for name in files:
+            infile = os.path.join(root, name)
+            if os.path.abspath(infile).startswith(skip):
+                continue
+            st = os.stat(infile)
+            sources[os.path.relpath(infile, statsDir)] = (st.st_mtime, st.st_size)
+    return sources
+
+def _is_current(statsDir, path, index, roster_ttl, offline):
+    if index.get('version') != SNAPSHOT_VERSION or index.get('date') != time.strftime('%Y-%m-%d'):
+        return False
+
+    saved = index['sources']
+    sources = _list_sources(statsDir, path)
+    if set(saved) != set(sources):
+        return False
+    for name, (mtime, size) in sources.items():
+        saved_mtime, saved_size, saved_hash = saved[name]
+        if size != saved_size:
+            return False
+        # a file that was touched but not changed keeps the snapshot valid
+        if mtime != saved_mtime and _file_hash(os.path.join(statsDir, name)) != saved_hash:
+            return False
+
+    # the rosters inside the snapshot expire with the roster cache
+    if not offline:
+        cache = RosterCache(statsDir, roster_ttl)
+        for team in get_teams():
+            if not cache.is_fresh(team):
+                return False
+    return True
+
+def compile_snapshot(statsDir, objects=None, path=None):
+    """
+    Function: compile_snapshot
+    -----------------
+    Reads every stat family of the given objects and writes them to the snapshot file.
+
+    Parameters:
+        :param statsDir: Directory in Dropbox with all Stats
+        :param objects: the five stats objects in load_stats order, read from the CSVs if None
+        :param path: snapshot file, defaults to stats.snapshot in statsDir
+
+    :return nothing
+    """
+    statsDir = statsDir.rstrip('/')
+    if path is None:
+        path = get_snapshot_path(statsDir)
+    if objects is None:
+        objects = (PlayerStats(statsDir), BallparkStats(statsDir), TeamStats(statsDir),
+                   LeagueStats(statsDir), DailyStats(statsDir))
+    for obj in objects:
+        obj.preload()
+
+    sources = {}
+    for name, (mtime, size) in _list_sources(statsDir, path).items():
+        sources[name] = (mtime, size, _file_hash(os.path.join(statsDir, name)))
+
+    index = {'version': SNAPSHOT_VERSION,
+             'date': time.strftime('%Y-%m-%d'),
+             'sources': sources,
+             'objects': {}}
+
+    tmp = '%s.tmp' %(path)
+    with open(tmp, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC + struct.pack('<Q', 0))
+        for obj, (obj_name, attrs) in zip(objects, SNAPSHOT_OBJECTS):
+            state = {}
+            for attr in attrs:
+                value = getattr(obj, attr)
+                if isinstance(value, StatStore):
+                    state[attr] = _write_store(f, value)
+                elif isinstance(value, defaultdict):
+                    state[attr] = dict(value)
+                else:
+                    state[attr] = value
+            index['objects'][obj_name] = state
+
+        index_offset = f.tell()
+        cPickle.dump(index, f, cPickle.HIGHEST_PROTOCOL)
+        f.seek(len(SNAPSHOT_MAGIC))
+        f.write(struct.pack('<Q', index_offset))
+    os.rename(tmp, path)
+
+def _write_store(f, store):
+    keys = sorted(store.columns)
+    rows = len(store)
+    offset = f.tell()
+    offset += -offset % SNAPSHOT_ALIGN
+    f.write('\0' * (offset - f.tell()))
+    for key in keys:
+        f.write(np.ascontiguousarray(store.columns[key][:rows], dtype='<f8').tostring())
+    return {'store': True, 'names': store.names, 'keys': keys, 'offset': offset}
+
+def _read_store(path, desc):
+    store = StatStore()
+    store.names = list(desc['names'])
+    store.ids = dict((name, i) for i, name in enumerate(store.names))
+    rows = len(store.names)
+    if rows and desc['keys']:
+        # copy-on-write, so the stats can still be changed in memory
+        matrix = np.memmap(path, dtype='<f8', mode='c', offset=desc['offset'], shape=(len(desc['keys']), rows))
+        store.columns = dict((key, matrix[j]) for j, key in enumerate(desc['keys']))
+        store.capacity = rows
+    return store
+
+def read_snapshot_index(path):
+    """
+    :return the index of the snapshot file, or None if it is missing or unreadable
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            index_offset, = struct.unpack('<Q', f.read(8))
+            f.seek(index_offset)
+            return cPickle.load(f)
+    except (IOError, EOFError, struct.error, cPickle.UnpicklingError):
+        return None
+
+def load_stats(statsDir, path=None, roster_workers=ROSTER_WORKERS, roster_ttl=ROSTER_CACHE_TTL, offline=False):
+    """
+    Function: load_stats
+    -----------------
+    Loads all stats from the snapshot when it is still current, otherwise reads all
+    of the CSVs and compiles a new snapshot.
+
+    Parameters:
+        :param statsDir: Directory in Dropbox with all Stats
+        :param path: snapshot file, defaults to stats.snapshot in statsDir
+        :param roster_workers, roster_ttl, offline: passed on to PlayerStats
+
+    :return a tuple (player_stats, ballpark_stats, team_stats, league_stats, daily_stats)
+    """
+    statsDir = statsDir.rstrip('/')
+    if path is None:
+        path = get_snapshot_path(statsDir)
+
+    index = read_snapshot_index(path)
+    if index is not None and _is_current(statsDir, path, index, roster_ttl, offline):
+        objects = (PlayerStats(statsDir, roster_workers, roster_ttl, offline),
+                   BallparkStats(statsDir),
+                   TeamStats(statsDir),
+                   LeagueStats(statsDir),
+                   DailyStats(statsDir))
+        for obj, (obj_name, attrs) in zip(objects, SNAPSHOT_OBJECTS):
+            state = index['objects'][obj_name]
+            for attr in attrs:
+                value = state[attr]
+                if isinstance(value, dict) and value.get('store') is True:
+                    setattr(obj, attr, _read_store(path, value))
+                elif isinstance(getattr(obj, attr), defaultdict):
+                    getattr(obj, attr).update(value)
+                else:
+                    setattr(obj, attr, value)
+            obj.set_loaded()
+        return objects
+
+    objects = (PlayerStats(statsDir, roster_workers, roster_ttl, offline),
+               BallparkStats(statsDir),
+               TeamStats(statsDir),
+               LeagueStats(statsDir),
+               DailyStats(statsDir))
+    try:
+        compile_snapshot(statsDir, objects, path)
+    except (IOError, OSError) as e:
+        print 'Could not write the stats snapshot: %s' %(e)
+    return objects
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile the stats directory into a snapshot.')
+    parser.add_argument('stats', help='Directory containing all stats.')
+    parser.add_argument('--output', help='Snapshot file, defaults to stats.snapshot in the stats directory.')
+    args = parser.parse_args()
+    compile_snapshot(args.stats, path=args.output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Class: StatStore
+Author: Poirel & Jett
+
+Columnar storage for numeric stats. Every player (or team) name is given an
+integer id, and each (stat, year, split) combination is kept as one contiguous
+float64 array indexed by that id. Stats that were never read are NaN.
+
+    store.set('mike trout', 'woba', 2014, 0.402, 'RHP')
+    store.get('mike trout', 'woba', 2014, 'RHP')            # 0.402
+    store.take('woba', 2014, 'RHP', store.lookup(names))    # array for many players
+"""
+
+import numpy as np
+
+class StatStore:
+
+    def __init__(self, capacity=256):
+        self.ids = {}
+        self.names = []
+        self.columns = {}
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+    def get_id(self, name):
+        """
+        :return the integer id of name, or None if it has no stats
+        """
+        return self.ids.get(name)
+
+    def add(self, name):
+        """
+        Function: add
+        -----------------
+        Gives name an id if it does not have one yet. The columns grow by doubling so
+        adding names one at a time stays amortized O(1).
+
+        :return the integer id of name
+        """
+        i = self.ids.get(name)
+        if i is None:
+            i = len(self.names)
+            if i >= self.capacity:
+                self._grow(max(2 * self.capacity, 256))
+            self.ids[name] = i
+            self.names.append(name)
+        return i
+
+    def _grow(self, capacity):
+        for key, col in self.columns.items():
+            new_col = np.empty(capacity, dtype=np.float64)
+            new_col.fill(np.nan)
+            new_col[:len(col)] = col
+            self.columns[key] = new_col
+        self.capacity = capacity
+
+    def _column(self, key):
+        col = self.columns.get(key)
+        if col is None:
+            col = np.empty(self.capacity, dtype=np.float64)
+            col.fill(np.nan)
+            self.columns[key] = col
+        return col
+
+    def set(self, name, stat, year, value, split=None):
+        i = self.add(name)
+        self._column((stat, year, split))[i] = value
+
+    def set_column(self, stat, year, values, split=None):
+        """
+        Sets a whole column at once, values must be indexed by id
+        """
+        self._column((stat, year, split))[:len(self.names)] = values
+
+    def get_years(self):
+        """
+        :return the sorted years that have at least one column
+        """
+        return sorted(set(year for stat, year, split in self.columns))
+
+    def get(self, name, stat, year, split=None):
+        """
+        :return the stat as a float, or None if it was never read for name
+        """
+        i = self.ids.get(name)
+        col = self.columns.get((stat, year, split))
+        if i is None or col is None:
+            return None
+        value = col[i]
+        if value != value:
+            return None
+        return float(value)
+
+    def column(self, stat, year, split=None):
+        """
+        :return the whole column as an array indexed by id (NaN where missing)
+        """
+        col = self.columns.get((stat, year, split))
+        if col is None:
+            col = np.empty(len(self.names), dtype=np.float64)
+            col.fill(np.nan)
+            return col
+        return col[:len(self.names)]
+
+    def lookup(self, names):
+        """
+        :return an integer array with the id of each name, -1 for unknown names
+        """
+        return np.array([self.ids.get(name, -1) for name in names], dtype=np.intp)
+
+    def take(self, stat, year, split, ids):
+        """
+        Function: take
+        -----------------
+        Vectorized get. ids is an array from lookup(); unknown ids (-1) give NaN.
+
+        :return a float64 array with one value per id
+        """
+        ids = np.asarray(ids, dtype=np.intp)
+        col = self.columns.get((stat, year, split))
+        if col is None:
+            out = np.empty(len(ids), dtype=np.float64)
+            out.fill(np.nan)
+            return out
+        out = col[np.where(ids < 0, 0, ids)]
+        out[ids < 0] = np.nan
+        return out
+
+    def as_dict(self):
+        """
+        :return the stats as nested dicts name -> year -> stat (-> split), for printing
+        """
+        stats = {}
+        for (stat, year, split), col in self.columns.items():
+            for i, name in enumerate(self.names):
+                value = col[i]
+                if value != value:
+                    continue
+                by_stat = stats.setdefault(name, {}).setdefault(year, {})
+                if split is None:
+                    by_stat[stat] = float(value)
+                else:
+                    by_stat.setdefault(stat, {})[split] = float(value)
+        return stats
@@ -1,5 +1,7 @@
+from stat_store import StatStore
+from lazy import LazyStats, loads
+from loader_registry import read_table
 from collections import defaultdict
-import csv
 import json
 
 TEAM_NAMES = {
@@ -95,20 +97,60 @@ TEAM_NAMES = {
             'league': 'NL'}
 }
 
+# ESPN codes that differ from the FanDuel codes used as team IDs
+ESPN_CODES = {'LOS': 'LAD',
+              'CWS': 'CHW',
+              'SDP': 'SD',
+              'SFG': 'SF'}
+
+# other names used for teams by our data sources
+TEAM_ALIASES = {'KC': 'KAN',
+                'TB': 'TAM',
+                'WSH': 'WAS',
+                'WSN': 'WAS',
+                'D-backs': 'ARI'}
+
+def _build_team_index():
+    by_mascot = {}
+    by_location = {}
+    index = {}
+    for team, v in TEAM_NAMES.items():
+        by_mascot[v['mascot'].lower()] = team
+        by_location.setdefault(v['location'].lower(), []).append(team)
+        index[team.lower()] = team
+        index[v['mascot'].lower()] = team
+        index[('%s %s' %(v['location'], v['mascot'])).lower()] = team
+    for team, code in ESPN_CODES.items():
+        index[code.lower()] = team
+    for alias, team in TEAM_ALIASES.items():
+        index[alias.lower()] = team
+
+    # a location shared by two teams (Chicago, New York, Los Angeles) does not identify a team
+    by_location = dict((loc, teams[0]) for loc, teams in by_location.items() if len(teams)==1)
+    for loc, team in by_location.items():
+        index.setdefault(loc, team)
+    return by_mascot, by_location, index
+
+_TEAMS_BY_MASCOT, _TEAMS_BY_LOCATION, _TEAM_INDEX = _build_team_index()
+
 def get_teams():
     return TEAM_NAMES.keys()
 
+def resolve_team(name):
+    """
+    Returns the team ID for a FanDuel code, ESPN code, mascot, location,
+    "location mascot" or alias (case insensitive), or None if it is unknown.
+    """
+    return _TEAM_INDEX.get(name.strip().lower())
+
 def get_team_by_mascot(mascot):
-    for k,v in TEAM_NAMES.items():
-        if v['mascot'].lower()==mascot.lower():
-            return k
-    return None
+    return _TEAMS_BY_MASCOT.get(mascot.strip().lower())
 
 def get_team_by_city(city):
-    for k,v in TEAM_NAMES.items():
-        if v['city'].lower()==city.lower():
-            return k
-    return None
+    return _TEAMS_BY_LOCATION.get(city.strip().lower())
+
+def get_team_espn_code(team):
+    return ESPN_CODES.get(team, team)
 
 def get_team_mascot(team):
     return TEAM_NAMES[team]['mascot']
@@ -119,35 +161,37 @@ def get_team_location(team):
 def get_team_league(team):
     return TEAM_NAMES[team]['league']
 
-class TeamStats:
+class TeamStats(LazyStats):
+
+    STAT_FAMILIES = [('team_totals', 'read_team_stats'),
+                     ('team_splits', 'read_team_left_right'),
+                     ('matchups', 'read_daily_matchups'),
+                     ('fielding', 'read_fielding_stats')]
 
     def __init__(self, statsDir):
         self.statsDir = statsDir.rstrip('/')
-        self.stats = defaultdict(lambda: defaultdict( lambda: defaultdict( lambda: defaultdict (dict))))
-
-        self.read_team_stats()
-        self.read_team_left_right()
-        self.read_daily_matchups()
-        self.read_fielding_stats()
-
-        # self.printStats()
+        self.stats = StatStore()
+        self.info = defaultdict(dict)
+        self.loaded = set()
 
 
     def printStats(self):
-        print json.dumps(self.stats, indent=4)
+        self.preload()
+        print json.dumps(self.stats.as_dict(), indent=4)
+        print json.dumps(self.info, indent=4)
 
     def read_team_stats(self):
         years = [2013, 2014]
         for year in years:
             infile = '%s/Team/%d Team Stats.csv' %(self.statsDir, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 team = get_team_by_mascot(items[0])
-                self.stats[team][year]['runs_team'] = float(items[1])
+                self.stats.set(team, 'runs_team', year, float(items[1]))
 
+    @loads('team_totals')
     def get_runs(self, year, team):
-        return self.stats[team][year]['runs_team']
+        return self.stats.get(team, 'runs_team', year)
 
     def read_team_left_right(self):
         stats = ['so', 'pa', 'woba']
@@ -155,68 +199,73 @@ class TeamStats:
         for year in years:
             for hand in ['RHP', 'LHP']:
                 infile = '%s/Team/%d Team Stats vs %s.csv' %(self.statsDir, year, hand)
-                reader = csv.reader(open(infile), quotechar='"')
-                header = reader.next()
-                for items in reader:
+                header, rows = read_table(infile)
+                for items in rows:
                     team = get_team_by_mascot(items[0])
                     for i, stat_val in enumerate([float(x) for x in items[1:4]]):
-                        self.stats[team][year][stats[i]][hand] = stat_val
+                        self.stats.set(team, stats[i], year, stat_val, hand)
 
+    @loads('team_splits')
     def get_so(self, year, team, hand):
         if hand.lower()=='left':
-            return self.stats[team][year]['so']['LHP']
+            return self.stats.get(team, 'so', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[team][year]['so']['RHP']
+            return self.stats.get(team, 'so', year, 'RHP')
         else:
             return None
 
+    @loads('team_splits')
     def get_pa(self, year, team, hand):
         if hand.lower()=='left':
-            return self.stats[team][year]['pa']['LHP']
+            return self.stats.get(team, 'pa', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[team][year]['pa']['RHP']
+            return self.stats.get(team, 'pa', year, 'RHP')
         else:
             return None
 
+    @loads('team_splits')
     def get_woba(self, year, team, hand):
         if hand.lower()=='left':
-            return self.stats[team][year]['woba']['LHP']
+            return self.stats.get(team, 'woba', year, 'LHP')
         elif hand.lower()=='right':
-            return self.stats[team][year]['woba']['RHP']
+            return self.stats.get(team, 'woba', year, 'RHP')
         else:
             return None
 
     def read_daily_matchups(self):
         # TODO: hard-coded daily stats
         infile = '%s/Test Data/Salaries/Fanduel- 6.3.2014 Salaries.csv' %(self.statsDir)
-        reader = csv.reader(open(infile), quotechar='"')
-        for items in reader:
-            away, home = items[4].split('@')
-            self.stats[home]['home_or_away'] = 'home'
-            self.stats[away]['home_or_away'] = 'away'
-            self.stats[home]['opponent'] = away
-            self.stats[away]['opponent'] = home
+        header, rows = read_table(infile, header=False)
+        for items in rows:
+            away, home = [resolve_team(team) or team for team in items[4].split('@')]
+            self.info[home]['home_or_away'] = 'home'
+            self.info[away]['home_or_away'] = 'away'
+            self.info[home]['opponent'] = away
+            self.info[away]['opponent'] = home
 
+    @loads('matchups')
     def get_home_or_away(self, team):
-        return self.stats[team]['home_or_away']
+        return self.info.get(team, {}).get('home_or_away')
 
+    @loads('matchups')
     def get_opponent(self, team):
-        return self.stats[team]['opponent']
+        return self.info.get(team, {}).get('opponent')
 
 
     def read_fielding_stats(self):
         years = [2013, 2014]
         for year in years:
             infile = '%s/Team/%d Team Fielding Stats.csv' %(self.statsDir, year)
-            reader = csv.reader(open(infile), quotechar='"')
-            header = reader.next()
-            for items in reader:
+            header, rows = read_table(infile)
+            for items in rows:
                 team = get_team_by_mascot(items[0])
-                self.stats[team][year]['sb_allowed'] = float(items[1])
-                self.stats[team][year]['cs_fielding'] = float(items[2])
+                self.stats.set(team, 'sb_allowed', year, float(items[1]))
+                self.stats.set(team, 'cs_fielding', year, float(items[2]))
 
+    @loads('fielding')
     def get_sb_allowed(self, year, team):
-        return self.stats[team][year]['sb_allowed']
+        return self.stats.get(team, 'sb_allowed', year)
 
+    @loads('fielding')
     def get_cs_fielding(self, year, team):
-        return self.stats[team][year]['cs_fielding']
\ No newline at end of file
+        return self.stats.get(team, 'cs_fielding', year)
\ No newline at end of file
@@ -0,0 +1,183 @@
+import numpy as np
+import time
+
+from lineup import Lineup
+
+# iterations a player who left the team may not come back
+TABU_TENURE = 10
+
+
+class TabuSearch:
+    """
+    Tabu search over single swaps.
+
+    Every iteration looks at every (slot, same class player) swap at once, one
+    NumPy expression per slot over the candidate arrays of the slot's class, and
+    makes the best one that fits under the cap, even when it lowers the value.
+    A player who leaves the team is tabu for tenure iterations unless bringing
+    him back beats the best team so far. There is nothing random, so a pool
+    always gives the same team.
+    """
+
+    def __init__(self, names, classes, values, costs, capacity, object_composition, tenure=TABU_TENURE):
+
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=float)
+        self.costs = np.asarray(costs, dtype=float)
+        self.cost_list = list(costs)
+        self.capacity = capacity
+        self.tenure = tenure
+
+        self.class_names = sorted(set(classes) | set(object_composition))
+        class_ids = dict((c, k) for k, c in enumerate(self.class_names))
+        self.classes = np.array([class_ids[c] for c in classes], dtype=int)
+
+        valid_comp = []
+        for c in sorted(object_composition):
+            valid_comp.extend([class_ids[c]]*object_composition[c])
+        self.slot_classes = np.array(valid_comp, dtype=int)
+
+        # candidates of every class with their costs and values side by side
+        self.candidates = [np.flatnonzero(self.classes == k) for k in range(len(self.class_names))]
+        self.candidate_costs = [self.costs[players] for players in self.candidates]
+        self.candidate_values = [self.values[players] for players in self.candidates]
+
+        self.slots = np.empty(len(self.slot_classes), dtype=int)
+        self.slots.fill(-1)
+        self.in_team = np.zeros(len(self.names), dtype=bool)
+        self.current_value = 0.0
+        self.current_cost = 0.0
+        self.iterations = 0
+
+    def make_greedy_team(self):
+        """
+        Fills the slots in order with the best player that still leaves room for
+        the cheapest players of the remaining slots.
+
+        :return False if no team fits under the capacity
+        """
+        self.slots.fill(-1)
+        self.in_team[:] = False
+        self.current_value = 0.0
+        self.current_cost = 0.0
+
+        # cheapest cost of the slots after each slot
+        used = np.zeros(len(self.class_names), dtype=int)
+        slot_min = np.zeros(len(self.slots))
+        for slot, k in enumerate(self.slot_classes):
+            cheapest = np.sort(self.candidate_costs[k])
+            if used[k] >= len(cheapest):
+                return False
+            slot_min[slot] = cheapest[used[k]]
+            used[k] += 1
+        min_rest = np.append(np.cumsum(slot_min[::-1])[::-1][1:], 0)
+
+        for slot, k in enumerate(self.slot_classes):
+            players = self.candidates[k]
+            fits = ~self.in_team[players] & \
+                   (self.current_cost + self.candidate_costs[k] + min_rest[slot] < self.capacity)
+            if not fits.any():
+                return False
+            j = np.flatnonzero(fits)[np.argmax(self.candidate_values[k][fits])]
+            self.add_player(slot, players[j])
+        return True
+
+    def add_player(self, slot, i):
+        self.slots[slot] = i
+        self.in_team[i] = True
+        self.current_value += self.values[i]
+        self.current_cost += self.costs[i]
+
+    def best_move(self, tabu_until, iteration, best_value):
+        """
+        :return the best (delta, slot, player) swap allowed this iteration, or None
+        """
+        best = None
+        for slot, k in enumerate(self.slot_classes):
+            old = self.slots[slot]
+            players = self.candidates[k]
+            delta = self.candidate_values[k] - self.values[old]
+            allowed = ~self.in_team[players] & \
+                      (self.current_cost - self.costs[old] + self.candidate_costs[k] < self.capacity) & \
+                      ((tabu_until[players] <= iteration) | (self.current_value + delta > best_value))
+            if not allowed.any():
+                continue
+            j = np.flatnonzero(allowed)[np.argmax(delta[allowed])]
+            if best is None or delta[j] > best[0]:
+                best = (delta[j], slot, players[j])
+        return best
+
+    def find_solution(self, iterations=1000, patience=100, time_budget=None):
+        """
+        Function: find_solution
+        -----------------
+        Runs the tabu search from the greedy team.
+
+        Parameters:
+            :param iterations: the most swaps to make
+            :param patience: stop after this many swaps without a better team, never if None
+            :param time_budget: seconds to search, unlimited if None
+
+        :return the best Lineup seen, or None if no team fits under the capacity;
+                the number of swaps made is left in self.iterations
+        """
+        deadline = time.time() + time_budget if time_budget is not None else None
+        lineup = None
+        for lineup in self.search(iterations, patience, deadline):
+            pass
+        return lineup
+
+    def search(self, iterations, patience, deadline):
+        """
+        The search of find_solution, with deadline a time.time() or None.
+
+        :return a generator of the best Lineup seen so far, once for the greedy team
+                and once after every swap
+        """
+        self.iterations = 0
+        if not self.make_greedy_team():
+            return
+
+        tabu_until = np.zeros(len(self.names), dtype=int)
+        best_value = self.current_value
+        best_slots = self.slots.copy()
+        best = self.make_lineup(best_slots)
+        yield best
+        since_best = 0
+        for iteration in range(iterations):
+            move = self.best_move(tabu_until, iteration, best_value)
+            if move is None:
+                break
+            delta, slot, new = move
+            old = self.slots[slot]
+
+            # values and costs follow the swap, the team is never summed again
+            self.in_team[old] = False
+            self.current_value -= self.values[old]
+            self.current_cost -= self.costs[old]
+            self.add_player(slot, new)
+            tabu_until[old] = iteration + 1 + self.tenure
+            self.iterations += 1
+
+            if self.current_value > best_value:
+                best_value = self.current_value
+                best_slots = self.slots.copy()
+                best = self.make_lineup(best_slots)
+                since_best = 0
+            else:
+                since_best += 1
+            yield best
+            if patience is not None and since_best >= patience:
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+        self.slots = best_slots
+        self.in_team[:] = False
+        self.in_team[best_slots] = True
+        self.current_value = self.values[best_slots].sum()
+        self.current_cost = self.costs[best_slots].sum()
+
+    def make_lineup(self, team):
+        return Lineup(float(self.values[team].sum()), sum(self.cost_list[i] for i in team),
+                      tuple(sorted(self.names[i] for i in team)))
@@ -0,0 +1,66 @@
+"""
+Player pools for the solver tests: small random pools with brute force answers
+and the sample slate shipped with the repo
+"""
+
+import itertools
+import os
+
+from player_salary_scores import PlayerSalaryScores
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+SMALL_COMP = {'P': 1, 'C': 1, 'OF': 3}
+
+CAPACITY = 35000
+TEAM_COMP = {'P': 1, 'C': 1, '1B': 1, '2B': 1, '3B': 1, 'SS': 1, 'OF': 3}
+
+
+def random_pool(rnd, players=(5, 16)):
+    """
+    :return (names, classes, values, costs, capacity) with whole $100 salaries and
+            values drawn from a continuum, so the best teams are not tied
+    """
+    names, classes, values, costs = [], [], [], []
+    for i in range(rnd.randint(*players)):
+        names.append('player%d' % i)
+        classes.append(rnd.choice(['P', 'C', 'OF', 'OF']))
+        values.append(rnd.uniform(0, 6))
+        costs.append(rnd.randrange(1000, 3000, 100))
+    return names, classes, values, costs, rnd.randrange(5000, 14000, 100)
+
+
+def all_teams(classes, values, costs, capacity, composition):
+    """
+    :return every (value, frozenset of players) team under the capacity, best first
+    """
+    by_class = dict((c, [i for i, x in enumerate(classes) if x == c]) for c in composition)
+    groups = [list(itertools.combinations(by_class[c], composition[c])) for c in sorted(composition)]
+    teams = []
+    for groups_picked in itertools.product(*groups):
+        team = frozenset(i for group in groups_picked for i in group)
+        if sum(costs[i] for i in team) < capacity:
+            teams.append((sum(values[i] for i in team), team))
+    teams.sort(key=lambda t: -t[0])
+    return teams
+
+
+def team_of(names, lineup):
+    index = dict((name, i) for i, name in enumerate(names))
+    return frozenset(index[name] for name in lineup.names)
+
+
+def sample_pool():
+    """
+    :return (names, classes, values, costs) of the players in sample-salaries.csv
+            that have a score in sample-scores.csv
+    """
+    players = PlayerSalaryScores()
+    players.read_positions_and_salaries(os.path.join(REPO, 'sample-salaries.csv'))
+    players.read_projections(os.path.join(REPO, 'sample-scores.csv'))
+    names = [n for n in players.get_names()
+             if players.get_score(n) is not None and players.get_salary(n) is not None]
+    return (names,
+            [players.get_position(n) for n in names],
+            [players.get_score(n) for n in names],
+            [players.get_salary(n) for n in names])
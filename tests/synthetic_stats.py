@@ -0,0 +1,107 @@
+"""
+Synthetic stats for the StatEquations and snapshot tests
+
+make_stats() fills the five stats objects of an empty stats directory in memory,
+through the same StatStores and info dicts the CSV readers fill, and marks every
+stat family as read. Three games are played: BOS at NYY, LOS at SFG and CHC at STL.
+"""
+
+import random
+
+from stat_parsers.player_stats import PlayerStats
+from stat_parsers.ballpark_stats import BallparkStats
+from stat_parsers.team_stats import TeamStats
+from stat_parsers.league_stats import LeagueStats
+from stat_parsers.daily_stats import DailyStats
+
+YEAR = 2014
+GAMES = [('BOS', 'NYY'), ('LOS', 'SFG'), ('CHC', 'STL')]
+HANDS = ['left', 'right']
+BATTERS_PER_TEAM = 4
+
+
+def add_pitcher(player_stats, rnd, name, team):
+    player_stats.info[name].update(team=team, bats='right', throws=rnd.choice(HANDS), fielding_position='P')
+    stats = player_stats.stats
+    stats.set(name, 'ip_total', YEAR, rnd.uniform(60, 200))
+    stats.set(name, 'gs_total', YEAR, rnd.randint(10, 33))
+    stats.set(name, 'k_pitched_total', YEAR, rnd.uniform(50, 250))
+    for split in ('home', 'away'):
+        stats.set(name, 'xfip', YEAR, rnd.uniform(2.5, 5.0), split)
+    for split in ('LHB', 'RHB'):
+        stats.set(name, 'woba_allowed', YEAR, rnd.uniform(0.25, 0.38), split)
+        stats.set(name, 'tbf', YEAR, rnd.uniform(200, 500), split)
+        stats.set(name, 'bb_allowed', YEAR, rnd.uniform(10, 50), split)
+        stats.set(name, 'hr_allowed', YEAR, rnd.uniform(3, 20), split)
+
+
+def add_batter(player_stats, rnd, name, team):
+    player_stats.info[name].update(team=team, bats=rnd.choice(HANDS), throws='right',
+                                   fielding_position=rnd.choice(['C', '1B', '2B', 'SS', '3B', 'OF']))
+    stats = player_stats.stats
+    g = rnd.randint(80, 160)
+    ab = g * rnd.uniform(3.2, 4.2)
+    h = ab * rnd.uniform(0.2, 0.32)
+    hr = h * rnd.uniform(0.05, 0.2)
+    stats.set(name, 'g_total', YEAR, g)
+    stats.set(name, 'ab_total', YEAR, ab)
+    stats.set(name, 'pa_total', YEAR, ab * 1.1)
+    stats.set(name, 'h_total', YEAR, h)
+    stats.set(name, 'hr_total', YEAR, hr)
+    stats.set(name, '1b_total', YEAR, h * 0.65)
+    stats.set(name, '2b_total', YEAR, h * 0.2)
+    stats.set(name, '3b_total', YEAR, h * 0.02)
+    stats.set(name, 'sb_total', YEAR, rnd.uniform(0, 30))
+    stats.set(name, 'ba_total', YEAR, h / ab)
+    stats.set(name, 'bb_percent_total', YEAR, rnd.uniform(0.04, 0.14))
+    for split in ('LHP', 'RHP'):
+        stats.set(name, 'woba', YEAR, rnd.uniform(0.26, 0.4), split)
+        stats.set(name, 'pa', YEAR, rnd.uniform(100, 400), split)
+        stats.set(name, 'hr', YEAR, rnd.uniform(2, 20), split)
+
+
+def make_stats(statsDir, seed=0):
+    """
+    :return (player_stats, team_stats, ballpark_stats, league_stats, daily_stats) in
+            the order StatEquations takes them
+    """
+    rnd = random.Random(seed)
+    player_stats = PlayerStats(statsDir, offline=True)
+    team_stats = TeamStats(statsDir)
+    ballpark_stats = BallparkStats(statsDir)
+    league_stats = LeagueStats(statsDir)
+    daily_stats = DailyStats(statsDir)
+
+    for away, home in GAMES:
+        team_stats.info[away].update(opponent=home, home_or_away='away')
+        team_stats.info[home].update(opponent=away, home_or_away='home')
+        for team in (away, home):
+            pitcher = 'pitcher %s' % team
+            add_pitcher(player_stats, rnd, pitcher, team)
+            player_stats.starting_pitchers[team] = pitcher
+            for i in range(BATTERS_PER_TEAM):
+                add_batter(player_stats, rnd, 'batter %s %d' % (team, i), team)
+
+            team_stats.stats.set(team, 'runs_team', YEAR, rnd.uniform(550, 800))
+            team_stats.stats.set(team, 'sb_allowed', YEAR, rnd.uniform(50, 120))
+            team_stats.stats.set(team, 'cs_fielding', YEAR, rnd.uniform(15, 45))
+            for split in ('LHP', 'RHP'):
+                team_stats.stats.set(team, 'pa', YEAR, rnd.uniform(1500, 4500), split)
+                team_stats.stats.set(team, 'so', YEAR, rnd.uniform(300, 1000), split)
+                team_stats.stats.set(team, 'woba', YEAR, rnd.uniform(0.29, 0.34), split)
+
+            ballpark_stats.stats[team].update(overall=rnd.uniform(0.9, 1.1),
+                                              avg_lhb=rnd.uniform(0.9, 1.1), avg_rhb=rnd.uniform(0.9, 1.1),
+                                              hr_lhb=rnd.uniform(0.8, 1.2), hr_rhb=rnd.uniform(0.8, 1.2))
+
+    league_stats.stats[YEAR].update(k_percent=0.2, ops=0.7, sb=2700, cs=1000, hr=4200,
+                                    pa=184000, bb=14000, r=19800, woba=0.31)
+
+    objects = (player_stats, team_stats, ballpark_stats, league_stats, daily_stats)
+    for obj in objects:
+        obj.set_loaded()
+    return objects
+
+
+def players(player_stats):
+    return sorted(player_stats.info)
@@ -0,0 +1,67 @@
+import time
+import unittest
+
+from anytime import ENGINES
+from knapsack import ModifiedKnapsack
+from tests.pools import CAPACITY, TEAM_COMP, sample_pool
+
+
+class AnytimeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = sample_pool() + (CAPACITY, TEAM_COMP)
+        cls.best = ModifiedKnapsack(*cls.pool).find_solution()
+
+    def test_exact_engines_prove_the_optimum(self):
+        for name in ('knapsack', 'branch_bound'):
+            progress = ENGINES[name](*self.pool).run(10)
+            self.assertAlmostEqual(progress.lineup.value, self.best.value)
+            self.assertTrue(progress.optimal)
+
+    def test_deadline(self):
+        reports = []
+        start = time.time()
+        progress = ENGINES['annealing'](*self.pool).run(0.5, callback=reports.append, interval=0.1)
+        self.assertTrue(time.time() - start < 1.0)
+        self.assertFalse(progress.optimal)
+        self.assertTrue(progress.lineup.cost < CAPACITY)
+
+        # a report on every better lineup and at least every interval
+        self.assertTrue(len(reports) >= 3)
+        values = [report.lineup.value for report in reports]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(reports[-1].lineup, progress.lineup)
+
+    def test_callback_cancels(self):
+        reports = []
+
+        def callback(progress):
+            reports.append(progress)
+            return progress.elapsed < 0.2
+
+        start = time.time()
+        progress = ENGINES['annealing'](*self.pool).run(10, callback=callback, interval=0.1)
+        self.assertTrue(time.time() - start < 1.0)
+        self.assertTrue(reports[-1].elapsed >= 0.2)
+        self.assertEqual(progress, reports[-1])
+
+    def test_leaving_progress_closes_the_engine(self):
+        generator = ENGINES['tabu'](*self.pool).progress(10)
+        first = next(generator)
+        generator.close()
+        self.assertTrue(first.lineup.cost < CAPACITY)
+        self.assertRaises(StopIteration, next, generator)
+
+    def test_no_team_under_the_cap(self):
+        pools = [(['p', 'c'], ['P', 'C'], [1.0, 1.0], [1000, 1000], 2000, {'P': 1, 'C': 1}),
+                 (['p', 'c'], ['P', 'C'], [1.0, 1.0], [1000, 1000], 5000, {'P': 1, 'C': 1, 'OF': 1})]
+        for pool in pools:
+            for name in sorted(ENGINES):
+                start = time.time()
+                self.assertEqual(ENGINES[name](*pool).run(5), None)
+                self.assertTrue(time.time() - start < 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
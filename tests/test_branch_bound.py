@@ -0,0 +1,69 @@
+import random
+import unittest
+
+from branch_bound import BranchAndBound
+from knapsack import ModifiedKnapsack
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+def brute_force_top(teams, top, min_difference, slots):
+    chosen = []
+    for value, team in teams:
+        if len(chosen) == top:
+            break
+        if all(slots - len(team & other) >= min_difference for other in chosen):
+            chosen.append(team)
+    return chosen
+
+class BranchAndBoundTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(19)
+        for trial in range(200):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            solver = BranchAndBound(names, classes, values, costs, capacity, SMALL_COMP)
+            lineup = solver.find_solution()
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            if not teams:
+                self.assertEqual(lineup, None)
+                continue
+            self.assertEqual(team_of(names, lineup), teams[0][1])
+            self.assertAlmostEqual(lineup.value, teams[0][0])
+            self.assertTrue(lineup.cost < capacity)
+            self.assertEqual(solver.gap, 0)
+
+    def test_sample_slate(self):
+        pool = sample_pool() + (CAPACITY, TEAM_COMP)
+        best = ModifiedKnapsack(*pool).find_solution()
+        solver = BranchAndBound(*pool)
+        self.assertAlmostEqual(solver.find_solution().value, best.value)
+        self.assertEqual(solver.gap, 0)
+
+        # an optimal incumbent is proven and returned as it is
+        self.assertEqual(BranchAndBound(*pool).find_solution(incumbent=best), best)
+
+    def test_top_solutions_match_brute_force(self):
+        rnd = random.Random(21)
+        slots = sum(SMALL_COMP.values())
+        for trial in range(200):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            top = rnd.randint(1, 6)
+            min_difference = rnd.randint(1, slots)
+            solver = BranchAndBound(names, classes, values, costs, capacity, SMALL_COMP)
+            found = [team_of(names, lineup) for lineup in solver.find_top_solutions(top, min_difference)]
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            self.assertEqual(found, brute_force_top(teams, top, min_difference, slots))
+
+    def test_top_solutions_on_the_sample_slate(self):
+        lineups = BranchAndBound(*(sample_pool() + (CAPACITY, TEAM_COMP))).find_top_solutions(5, 2)
+        self.assertEqual(len(lineups), 5)
+        self.assertAlmostEqual(lineups[0].value, 105.58)
+        values = [lineup.value for lineup in lineups]
+        self.assertEqual(values, sorted(values, reverse=True))
+        for i, lineup in enumerate(lineups):
+            for other in lineups[:i]:
+                self.assertTrue(len(set(lineup.names) - set(other.names)) >= 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
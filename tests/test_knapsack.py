@@ -0,0 +1,37 @@
+import random
+import unittest
+
+from knapsack import ModifiedKnapsack
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+class ModifiedKnapsackTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(17)
+        for trial in range(200):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            lineup = ModifiedKnapsack(names, classes, values, costs, capacity, SMALL_COMP).find_solution()
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            if not teams:
+                self.assertEqual(lineup, None)
+                continue
+            self.assertEqual(team_of(names, lineup), teams[0][1])
+            self.assertAlmostEqual(lineup.value, teams[0][0])
+            self.assertTrue(lineup.cost < capacity)
+
+    def test_capacity_is_strict(self):
+        names = ['p', 'c', 'cheap c']
+        lineup = ModifiedKnapsack(names, ['P', 'C', 'C'], [5.0, 4.0, 1.0], [1000, 1000, 500], 2000,
+                                  {'P': 1, 'C': 1}).find_solution()
+        self.assertEqual(lineup.names, ('cheap c', 'p'))
+        self.assertEqual(lineup.cost, 1500)
+
+    def test_sample_slate(self):
+        lineup = ModifiedKnapsack(*(sample_pool() + (CAPACITY, TEAM_COMP))).find_solution()
+        self.assertAlmostEqual(lineup.value, 105.58)
+        self.assertTrue(lineup.cost < CAPACITY)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+from collections import Counter
+import random
+import unittest
+
+from cooling import GeometricCooling
+import mcmc as mcmc_module
+from mcmc import TeamMCMC, REPLICA_TEMPS
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+class WatchedMCMC(TeamMCMC):
+    # remembers the best team value the chain has been on
+
+    def step(self, temp):
+        accepted = TeamMCMC.step(self, temp)
+        self.best_seen = max(getattr(self, 'best_seen', self.current_value), self.current_value)
+        return accepted
+
+
+class CountingMCMC(TeamMCMC):
+    # counts the falls back from sampling to listing every neighbor
+
+    fallbacks = 0
+
+    def enumerate_neighbor(self):
+        self.fallbacks += 1
+        return TeamMCMC.enumerate_neighbor(self)
+
+
+def tight_pool(alternative):
+    # the cheap P and C are the only team under the cap; with alternative a
+    # second cheap C gives exactly one swap
+    names = ['p0', 'c0'] + ['p%d' % i for i in range(1, 10)] + ['c%d' % i for i in range(1, 10)]
+    classes = ['P', 'C'] + ['P'] * 9 + ['C'] * 9
+    costs = [1000, 1000] + [9000] * 18
+    if alternative:
+        names, classes, costs = names + ['c10'], classes + ['C'], costs + [1400]
+    return names, classes, [1.0] * len(names), costs, 2500, {'P': 1, 'C': 1}
+
+
+class SampleNeighborTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tries = mcmc_module.NEIGHBOR_TRIES
+
+    def tearDown(self):
+        mcmc_module.NEIGHBOR_TRIES = self.tries
+
+    def check_neighbor(self, mcmc, neighbor):
+        slot, new = neighbor
+        team = set(mcmc.slots)
+        self.assertFalse(new in team)
+        self.assertEqual(mcmc.classes[new], mcmc.slot_classes[slot])
+        self.assertTrue(mcmc.current_cost - mcmc.costs[mcmc.slots[slot]] + mcmc.costs[new] < mcmc.capacity)
+
+    def test_samples_only_feasible_swaps(self):
+        random.seed(12)
+        mcmc = CountingMCMC(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+        mcmc.make_random_team()
+        for n in range(500):
+            neighbor = mcmc.sample_neighbor()
+            self.check_neighbor(mcmc, neighbor)
+            mcmc.transition_to_neighbor(*neighbor)
+            self.assertTrue(mcmc.current_cost < CAPACITY)
+        self.assertEqual(mcmc.fallbacks, 0)
+
+    def test_no_swap_under_a_tight_cap(self):
+        random.seed(12)
+        mcmc = CountingMCMC(*tight_pool(alternative=False))
+        self.assertTrue(mcmc.make_random_team())
+        # every draw is the player already in the slot, so all tries fail
+        self.assertEqual(mcmc.sample_neighbor(), None)
+        self.assertEqual(mcmc.fallbacks, 1)
+        self.assertEqual(mcmc.step(1.0), None)
+
+    def test_fallback_finds_the_only_swap(self):
+        random.seed(12)
+        mcmc = CountingMCMC(*tight_pool(alternative=True))
+        mcmc.make_random_team()
+        mcmc_module.NEIGHBOR_TRIES = 0
+        for n in range(20):
+            neighbor = mcmc.sample_neighbor()
+            self.check_neighbor(mcmc, neighbor)
+            self.assertEqual(mcmc.names[neighbor[1]], 'c10' if 'c0' in mcmc.get_team() else 'c0')
+            mcmc.transition_to_neighbor(*neighbor)
+        self.assertEqual(mcmc.fallbacks, 20)
+
+
+class AnnealTest(unittest.TestCase):
+
+    def setUp(self):
+        self.mcmc = WatchedMCMC(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+
+    def check_best_seen(self, **options):
+        random.seed(3)
+        self.mcmc.best_seen = float('-inf')
+        lineup = self.mcmc.anneal(**options)
+        self.assertAlmostEqual(lineup.value, self.mcmc.best_seen)
+        self.assertTrue(lineup.cost < CAPACITY)
+        self.assertEqual(len(lineup.names), sum(TEAM_COMP.values()))
+        return lineup
+
+    def test_returns_best_seen(self):
+        self.check_best_seen()
+
+    def test_time_budget_returns_best_seen(self):
+        self.check_best_seen(time_budget=0.05)
+
+    def test_patience_waits_for_the_chain_to_cool(self):
+        # the first 2000 proposals are a random walk at these temperatures
+        self.check_best_seen(schedule=GeometricCooling(), patience=300)
+        self.assertTrue(self.mcmc.iterations > 2000)
+
+
+class ParallelRestartsTest(unittest.TestCase):
+
+    def test_restarts_return_best_seen_lineups(self):
+        mcmc = TeamMCMC(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+        serial = mcmc.find_parallel_solutions(restarts=4, top=4, workers=1, seed=7)
+        self.assertEqual(len(mcmc.restart_iterations), 4)
+
+        # every restart on its own, seeded the same way
+        restarts = []
+        for i in range(4):
+            random.seed(7 + i)
+            restarts.append(mcmc.anneal())
+            self.assertTrue(isinstance(mcmc.iterations, int))
+        best = max(lineup.value for lineup in restarts)
+        self.assertAlmostEqual(serial[0].value, best)
+
+        parallel = mcmc.find_parallel_solutions(restarts=4, top=4, workers=2, seed=7)
+        self.assertEqual(parallel, serial)
+
+
+class ReplicaExchangeTest(unittest.TestCase):
+
+    def test_lineups_and_swap_stats(self):
+        names, classes, values, costs = sample_pool()
+        mcmc = TeamMCMC(names, classes, values, costs, CAPACITY, TEAM_COMP)
+        lineups = mcmc.find_replica_exchange_solution(steps=1000, swap_every=10, top=5, seed=1)
+
+        self.assertEqual(len(lineups), 5)
+        self.assertEqual(len(set(lineup.names for lineup in lineups)), 5)
+        values_found = [lineup.value for lineup in lineups]
+        self.assertEqual(values_found, sorted(values_found, reverse=True))
+        index = dict((name, i) for i, name in enumerate(names))
+        for lineup in lineups:
+            team = [index[name] for name in lineup.names]
+            self.assertEqual(Counter(classes[i] for i in team), Counter(TEAM_COMP))
+            self.assertEqual(lineup.cost, sum(costs[i] for i in team))
+            self.assertTrue(lineup.cost < CAPACITY)
+            self.assertAlmostEqual(lineup.value, sum(values[i] for i in team))
+
+        # 100 swap rounds alternate between the even and the odd pairs
+        self.assertEqual(len(mcmc.swap_stats), len(REPLICA_TEMPS) - 1)
+        for r, stats in enumerate(mcmc.swap_stats):
+            self.assertEqual(stats['temps'], (REPLICA_TEMPS[r], REPLICA_TEMPS[r + 1]))
+            self.assertEqual(stats['tried'], 50)
+            self.assertTrue(0 <= stats['accepted'] <= stats['tried'])
+            self.assertAlmostEqual(stats['rate'], 1.0 * stats['accepted'] / stats['tried'])
+
+        self.assertEqual(mcmc.find_replica_exchange_solution(steps=1000, swap_every=10, top=5, seed=1), lineups)
+
+    def test_finds_the_brute_force_optimum(self):
+        rnd = random.Random(15)
+        for trial in range(50):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            mcmc = TeamMCMC(names, classes, values, costs, capacity, SMALL_COMP)
+            lineups = mcmc.find_replica_exchange_solution(steps=200, top=3, seed=trial)
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            if not teams:
+                self.assertEqual(lineups, [])
+                continue
+            self.assertEqual(team_of(names, lineups[0]), teams[0][1])
+            valid = set(team for value, team in teams)
+            self.assertTrue(all(team_of(names, lineup) in valid for lineup in lineups))
+
+
+if __name__ == '__main__':
+    unittest.main()
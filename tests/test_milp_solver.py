@@ -0,0 +1,93 @@
+import random
+import unittest
+
+import milp_solver
+from milp_solver import MILPSolver
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+class BranchAndBoundFallbackTest(unittest.TestCase):
+    # solve_branch_bound is called directly, so it runs with or without scipy
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(20)
+        for trial in range(200):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            solver = MILPSolver(names, classes, values, costs, capacity, SMALL_COMP)
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+
+            # one player forced in and one forced out on every other pool
+            if trial % 2:
+                included, excluded = rnd.sample(range(len(names)), 2)
+                solver.include(names[included])
+                solver.exclude(names[excluded])
+                teams = [(value, team) for value, team in teams if included in team and excluded not in team]
+
+            lineup = solver.solve_branch_bound(None)
+            self.assertTrue(solver.optimal)
+            if not teams:
+                self.assertEqual(lineup, None)
+                continue
+            self.assertEqual(team_of(names, lineup), teams[0][1])
+            self.assertAlmostEqual(lineup.value, teams[0][0])
+            self.assertTrue(lineup.cost < capacity)
+
+    def test_infeasible_is_proven(self):
+        solver = MILPSolver(['p', 'c'], ['P', 'C'], [1.0, 1.0], [1000, 1000], 2000, {'P': 1, 'C': 1})
+        self.assertEqual(solver.solve_branch_bound(None), None)
+        self.assertTrue(solver.optimal)
+
+        # a forced player whose class has no slot
+        solver = MILPSolver(['p', 'c', 'dh'], ['P', 'C', 'DH'], [1.0, 1.0, 1.0], [1000, 1000, 1000], 5000,
+                            {'P': 1, 'C': 1})
+        solver.include('dh')
+        self.assertEqual(solver.solve_branch_bound(None), None)
+        self.assertTrue(solver.optimal)
+
+    def test_sample_slate(self):
+        solver = MILPSolver(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+        lineup = solver.solve_branch_bound(None)
+        self.assertAlmostEqual(lineup.value, 105.58)
+        self.assertTrue(solver.optimal)
+
+    @unittest.skipIf(milp_solver.HAVE_MILP, 'scipy.optimize.milp is installed')
+    def test_find_solution_without_scipy(self):
+        solver = MILPSolver(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+        self.assertAlmostEqual(solver.find_solution().value, 105.58)
+        solver.add_constraint({solver.names[0]: 1}, lb=1)
+        self.assertRaises(ImportError, solver.find_solution)
+
+
+@unittest.skipUnless(milp_solver.HAVE_MILP, 'needs scipy.optimize.milp (scipy 1.9 or later)')
+class MILPTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(20)
+        for trial in range(100):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            solver = MILPSolver(names, classes, values, costs, capacity, SMALL_COMP)
+            lineup = solver.solve_milp(None)
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            self.assertTrue(solver.optimal)
+            if not teams:
+                self.assertEqual(lineup, None)
+                continue
+            self.assertEqual(team_of(names, lineup), teams[0][1])
+
+    def test_extra_constraint(self):
+        names, classes, values, costs = sample_pool()
+        solver = MILPSolver(names, classes, values, costs, CAPACITY, TEAM_COMP)
+        best = solver.find_solution()
+        # the best team without two of its players
+        solver.add_constraint(dict((name, 1) for name in best.names[:2]), ub=0)
+        lineup = solver.find_solution()
+        self.assertTrue(solver.optimal)
+        self.assertTrue(lineup.value <= best.value)
+        self.assertFalse(set(best.names[:2]) & set(lineup.names))
+
+        solver.exclude(lineup.names[0])
+        self.assertFalse(lineup.names[0] in solver.find_solution().names)
+
+
+if __name__ == '__main__':
+    unittest.main()
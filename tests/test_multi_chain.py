@@ -0,0 +1,49 @@
+import random
+import unittest
+
+import numpy as np
+
+from multi_chain import MultiChainAnnealer
+from tests.pools import SMALL_COMP, random_pool, all_teams, team_of
+
+TEMPS = np.arange(5, 0, -0.01)
+
+
+class MultiChainAnnealerTest(unittest.TestCase):
+
+    def test_against_brute_force(self):
+        rnd = random.Random(14)
+        for trial in range(100):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            annealer = MultiChainAnnealer(names, classes, values, costs, capacity, SMALL_COMP,
+                                          chains=64, seed=trial)
+            lineups = annealer.find_solutions(3, TEMPS)
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            if not teams:
+                self.assertEqual(lineups, [])
+                continue
+
+            valid = dict((team, value) for value, team in teams)
+            found = [team_of(names, lineup) for lineup in lineups]
+            self.assertEqual(found[0], teams[0][1])
+            self.assertEqual(len(set(found)), len(found))
+            for team, lineup in zip(found, lineups):
+                self.assertTrue(team in valid)
+                self.assertAlmostEqual(lineup.value, valid[team])
+                self.assertTrue(lineup.cost < capacity)
+            values_found = [lineup.value for lineup in lineups]
+            self.assertEqual(values_found, sorted(values_found, reverse=True))
+
+    def test_no_lineup_under_the_cap(self):
+        annealer = MultiChainAnnealer(['p', 'c'], ['P', 'C'], [1.0, 1.0], [1000, 1000], 2000,
+                                      {'P': 1, 'C': 1}, chains=8, seed=0)
+        self.assertEqual(annealer.find_solutions(3, TEMPS), [])
+
+    def test_class_without_players(self):
+        annealer = MultiChainAnnealer(['p', 'c'], ['P', 'C'], [1.0, 1.0], [1000, 1000], 5000,
+                                      {'P': 1, 'C': 1, 'OF': 1}, chains=8, seed=0)
+        self.assertEqual(annealer.find_solutions(3, TEMPS), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+from collections import Counter
+import random
+import unittest
+
+from multi_entry import MultiEntryGenerator
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+def brute_force_entries(teams, entries, max_exposure, max_overlap):
+    cap = max(1, int(max_exposure * entries))
+    exposure = Counter()
+    chosen = []
+    while len(chosen) < entries:
+        allowed = [team for value, team in teams
+                   if all(exposure[i] < cap for i in team)
+                   and all(len(team & other) <= max_overlap for other in chosen)]
+        if not allowed:
+            break
+        chosen.append(allowed[0])
+        exposure.update(allowed[0])
+    return chosen
+
+
+class MultiEntryTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rnd = random.Random(9)
+        slots = sum(SMALL_COMP.values())
+        for trial in range(100):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            entries = rnd.randint(1, 8)
+            max_exposure = rnd.choice([0.3, 0.5, 1.0])
+            max_overlap = rnd.choice([2, 3, 4, None])
+
+            generator = MultiEntryGenerator(names, classes, values, costs, capacity, SMALL_COMP,
+                                            max_exposure, max_overlap)
+            found = [team_of(names, lineup) for lineup in generator.generate(entries)]
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            expected = brute_force_entries(teams, entries, max_exposure,
+                                           slots - 1 if max_overlap is None else max_overlap)
+            self.assertEqual(found, expected)
+
+    def test_entries_are_distinct_by_default(self):
+        generator = MultiEntryGenerator(*(sample_pool() + (CAPACITY, TEAM_COMP)))
+        lineups = list(generator.generate(4))
+        self.assertEqual(len(lineups), 4)
+        self.assertEqual(len(set(lineup.names for lineup in lineups)), 4)
+        self.assertAlmostEqual(lineups[0].value, 105.58)
+
+    def test_exposure_cap(self):
+        generator = MultiEntryGenerator(*(sample_pool() + (CAPACITY, TEAM_COMP, 0.4)))
+        lineups = list(generator.generate(10))
+        self.assertEqual(len(set(lineup.names for lineup in lineups)), len(lineups))
+        self.assertTrue(max(generator.get_exposures().values()) <= 0.4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from multiprocessing.queues import Queue
+import time
+import unittest
+
+import anytime
+import portfolio
+from anytime import AnytimeSolver
+from knapsack import ModifiedKnapsack
+from lineup import Lineup
+from portfolio import Portfolio
+from tests.pools import CAPACITY, TEAM_COMP, sample_pool
+
+FOUND = Lineup(10.0, 100, ('a', 'b'))
+
+
+class FindingEngine(AnytimeSolver):
+    # finds one lineup and keeps running
+
+    def incumbents(self, deadline, bound=None):
+        yield FOUND, False
+        while time.time() < deadline:
+            time.sleep(0.01)
+            yield FOUND, False
+
+
+class ProvingEngine(AnytimeSolver):
+    # proves the bound best as soon as there is one, without a lineup of its own
+
+    def incumbents(self, deadline, bound=None):
+        while bound() == float('-inf') and time.time() < deadline:
+            pass
+        yield None, True
+
+
+class SlowQueue(Queue):
+    # holds back the lineups of FindingEngine, as a busy feeder thread could
+
+    def put(self, item, *args):
+        if item[0] == 'finding' and item[1] is not None:
+            time.sleep(0.3)
+        Queue.put(self, item, *args)
+
+
+class PortfolioTest(unittest.TestCase):
+
+    def setUp(self):
+        anytime.ENGINES['finding'] = FindingEngine
+        anytime.ENGINES['proving'] = ProvingEngine
+        self.queue = portfolio.Queue
+
+    def tearDown(self):
+        del anytime.ENGINES['finding']
+        del anytime.ENGINES['proving']
+        portfolio.Queue = self.queue
+
+    def test_waits_for_the_proven_lineup(self):
+        # the proof arrives before the lineup whose value it proves
+        portfolio.Queue = SlowQueue
+        progress = Portfolio([], [], [], [], CAPACITY, TEAM_COMP, ('finding', 'proving')).run(5)
+        self.assertEqual(progress.lineup, FOUND)
+        self.assertTrue(progress.optimal)
+        self.assertTrue(progress.elapsed < 5)
+
+    def test_finds_the_optimum(self):
+        pool = sample_pool()
+        best = ModifiedKnapsack(*(pool + (CAPACITY, TEAM_COMP))).find_solution()
+        for engines in (('knapsack', 'tabu'), ('branch_bound', 'tabu', 'annealing')):
+            progress = Portfolio(*(pool + (CAPACITY, TEAM_COMP, engines))).run(10)
+            self.assertAlmostEqual(progress.lineup.value, best.value)
+            self.assertTrue(progress.optimal)
+
+    def test_deadline_without_exact_engine(self):
+        pool = sample_pool()
+        start = time.time()
+        progress = Portfolio(*(pool + (CAPACITY, TEAM_COMP, ('annealing',)))).run(0.5)
+        self.assertTrue(time.time() - start < 2)
+        self.assertFalse(progress.optimal)
+        self.assertTrue(progress.lineup.cost < CAPACITY)
+
+
+if __name__ == '__main__':
+    unittest.main()
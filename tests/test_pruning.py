@@ -0,0 +1,67 @@
+from collections import Counter
+import random
+import unittest
+
+from knapsack import ModifiedKnapsack
+from pruning import prune_players
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, sample_pool
+
+
+def random_pools(seed, count=300):
+    # every other pool has whole number values and few distinct salaries, so
+    # players tie on cost, value or both
+    rnd = random.Random(seed)
+    for trial in range(count):
+        names, classes, values, costs, capacity = random_pool(rnd)
+        if trial % 2:
+            values = [float(int(v)) for v in values]
+            costs = [c - c % 500 + 1000 for c in costs]
+        yield names, classes, values, costs, capacity
+
+
+def best_value(names, classes, values, costs, capacity, composition):
+    lineup = ModifiedKnapsack(names, classes, values, costs, capacity, composition).find_solution()
+    return None if lineup is None else lineup.value
+
+
+class PruningTest(unittest.TestCase):
+
+    def test_optimum_is_unchanged(self):
+        for names, classes, values, costs, capacity in random_pools(18):
+            pool, report = prune_players(names, classes, values, costs, SMALL_COMP)
+            full = best_value(names, classes, values, costs, capacity, SMALL_COMP)
+            pruned = best_value(*(pool + (capacity, SMALL_COMP)))
+            if full is None:
+                self.assertEqual(pruned, None)
+            else:
+                self.assertAlmostEqual(pruned, full)
+
+    def test_classes_keep_their_slots(self):
+        for names, classes, values, costs, capacity in random_pools(19):
+            pool, report = prune_players(names, classes, values, costs, SMALL_COMP)
+            left = Counter(pool[1])
+            before = Counter(classes)
+            for c, count in SMALL_COMP.items():
+                self.assertTrue(left[c] >= min(count, before[c]))
+
+    def test_report_adds_up(self):
+        names, classes, values, costs = sample_pool()
+        # a class without slots is pruned entirely
+        names, classes, values, costs = names + ['dh'], classes + ['DH'], values + [99.0], costs + [100]
+        pool, report = prune_players(names, classes, values, costs, TEAM_COMP)
+        left, before = Counter(pool[1]), Counter(classes)
+        self.assertEqual(sorted(report), sorted(before))
+        for c in report:
+            self.assertEqual(report[c], (left[c], before[c]))
+        self.assertEqual(report['DH'], (0, 1))
+        self.assertEqual(sum(l for l, b in report.values()), len(pool[0]))
+        self.assertEqual(sum(b for l, b in report.values()), len(names))
+        self.assertEqual(len(set(pool[0])), len(pool[0]))
+        self.assertTrue(set(pool[0]) <= set(names))
+
+        self.assertAlmostEqual(best_value(*(pool + (CAPACITY, TEAM_COMP))),
+                               best_value(names, classes, values, costs, CAPACITY, TEAM_COMP))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import BaseHTTPServer
+import shutil
+import StringIO
+import sys
+import tempfile
+import threading
+import unittest
+import urllib2
+
+from stat_parsers.player_stats import PlayerStats
+from stat_parsers.roster_cache import RosterCache
+from stat_parsers.team_stats import get_teams
+
+ROSTER_PAGE = """<html><body><table>
+<tr><td>ROSTER</td></tr>
+<tr><td>NO.</td><td>NAME</td><td>POS</td><td>BAT</td><td>THW</td></tr>
+<tr><td>1</td><td>%s</td><td>SP</td><td>R</td><td>L</td></tr>
+<tr><td>2</td><td>%s DL15</td><td>C</td><td>B</td><td>R</td></tr>
+</table></body></html>"""
+
+
+class RosterHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    # serves /<espn code>/<location>-<mascot> with two players named after the code
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.headers.getheader('If-None-Match')))
+        if server.failing:
+            self.send_error(500)
+            return
+        etag = '"%d"' % server.version
+        if self.headers.getheader('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        code = self.path.split('/')[1]
+        body = ROSTER_PAGE % ('arm %s %d' % (code, server.version), 'bat %s' % code)
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RosterFetchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), RosterHandler)
+        self.server.requests = []
+        self.server.failing = False
+        self.server.version = 1
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/%%s/%%s-%%s' % self.server.server_address[1]
+        self.teams = len(get_teams())
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.statsDir)
+
+    def read(self, ttl, workers=1):
+        player_stats = PlayerStats(self.statsDir, roster_workers=workers, roster_ttl=ttl, roster_url=self.url)
+        player_stats.read_rosters(retries=1)
+        return player_stats
+
+    def test_rosters_are_parsed_and_cached(self):
+        player_stats = self.read(60, workers=4)
+        self.assertEqual(len(self.server.requests), self.teams)
+        self.assertEqual(player_stats.info['arm bos 1'], {'team': 'BOS', 'bats': 'right', 'throws': 'left'})
+        self.assertEqual(player_stats.info['bat bos'], {'team': 'BOS', 'bats': 'switch', 'throws': 'right'})
+        self.assertEqual(RosterCache(self.statsDir).get_validators('BOS'), ('"1"', None))
+
+    def test_fresh_rosters_are_not_requested(self):
+        self.read(60)
+        del self.server.requests[:]
+        player_stats = self.read(60)
+        self.assertEqual(self.server.requests, [])
+        self.assertEqual(player_stats.info['arm bos 1']['team'], 'BOS')
+
+    def test_stale_rosters_are_revalidated(self):
+        self.read(0)
+        del self.server.requests[:]
+        player_stats = self.read(0)
+        self.assertEqual(len(self.server.requests), self.teams)
+        self.assertTrue(all(etag == '"1"' for path, etag in self.server.requests))
+        self.assertEqual(player_stats.info['arm bos 1']['team'], 'BOS')
+
+        # a changed page replaces the cached roster
+        self.server.version = 2
+        player_stats = self.read(0)
+        self.assertEqual(player_stats.info['arm bos 2']['team'], 'BOS')
+        self.assertFalse('arm bos 1' in player_stats.info)
+        self.assertEqual(RosterCache(self.statsDir).get_validators('BOS'), ('"2"', None))
+
+    def test_stale_roster_is_used_when_the_request_fails(self):
+        self.read(0)
+        fetched = RosterCache(self.statsDir).teams['BOS']['fetched']
+        self.server.failing = True
+        stdout, sys.stdout = sys.stdout, StringIO.StringIO()
+        try:
+            player_stats = self.read(0)
+        finally:
+            sys.stdout = stdout
+        self.assertEqual(player_stats.info['arm bos 1']['team'], 'BOS')
+        # not marked fresh, so the next run asks again
+        self.assertEqual(RosterCache(self.statsDir).teams['BOS']['fetched'], fetched)
+
+    def test_failure_without_a_cached_roster_raises(self):
+        self.server.failing = True
+        self.assertRaises(urllib2.HTTPError, self.read, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
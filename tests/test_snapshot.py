@@ -0,0 +1,80 @@
+import os
+import shutil
+import StringIO
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from stat_equations import StatEquations
+from stat_parsers.snapshot import compile_snapshot, load_stats
+from stat_parsers.stat_store import StatStore
+from tests.synthetic_stats import make_stats, players
+
+
+def snapshot_order(objects):
+    # make_stats returns the StatEquations order, the snapshot swaps team and ballpark
+    player_stats, team_stats, ballpark_stats, league_stats, daily_stats = objects
+    return player_stats, ballpark_stats, team_stats, league_stats, daily_stats
+
+
+def equations_order(objects):
+    player_stats, ballpark_stats, team_stats, league_stats, daily_stats = objects
+    return player_stats, team_stats, ballpark_stats, league_stats, daily_stats
+
+
+def state(obj, attr):
+    value = getattr(obj, attr)
+    if isinstance(value, StatStore):
+        return value.as_dict()
+    return dict(value)
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+        self.source = os.path.join(self.statsDir, 'notes.csv')
+        with open(self.source, 'w') as f:
+            f.write('a,b\n1,2\n')
+        self.stats = make_stats(self.statsDir)
+        compile_snapshot(self.statsDir, snapshot_order(self.stats))
+
+    def tearDown(self):
+        shutil.rmtree(self.statsDir)
+
+    def test_round_trip(self):
+        loaded = equations_order(load_stats(self.statsDir, offline=True))
+        for obj, saved in zip(loaded, self.stats):
+            self.assertEqual(obj.loaded, saved.loaded)
+            for attr in ('stats', 'info', 'starting_pitchers'):
+                if hasattr(saved, attr):
+                    self.assertEqual(state(obj, attr), state(saved, attr))
+        self.assertTrue(isinstance(loaded[0].stats.columns.values()[0], np.memmap))
+
+        names = players(self.stats[0])
+        expected = [StatEquations(*self.stats).get_score(name) for name in names]
+        scores = [StatEquations(*loaded).get_score(name) for name in names]
+        np.testing.assert_array_equal(scores, expected)
+
+    def test_unchanged_source_keeps_the_snapshot(self):
+        later = time.time() + 10
+        os.utime(self.source, (later, later))
+        player_stats = load_stats(self.statsDir, offline=True)[0]
+        self.assertEqual(player_stats.get_team('pitcher BOS'), 'BOS')
+
+    def test_changed_source_discards_the_snapshot(self):
+        with open(self.source, 'w') as f:
+            f.write('a,b\n3,4\n')
+        stdout, sys.stdout = sys.stdout, StringIO.StringIO()
+        try:
+            player_stats = load_stats(self.statsDir, offline=True)[0]
+        finally:
+            sys.stdout = stdout
+        self.assertFalse('pitcher BOS' in player_stats.info)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import math
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from stat_equations import StatEquations
+from stat_parsers.player_stats import PlayerStats
+from stat_parsers.ballpark_stats import BallparkStats
+from stat_parsers.team_stats import TeamStats
+from stat_parsers.league_stats import LeagueStats
+from stat_parsers.daily_stats import DailyStats
+from tests.synthetic_stats import make_stats, players
+
+
+def empty_stats(statsDir):
+    # the five stats objects over a directory without any stat files
+    return (PlayerStats(statsDir, offline=True), TeamStats(statsDir), BallparkStats(statsDir),
+            LeagueStats(statsDir), DailyStats(statsDir))
+
+
+class LazyConstructionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.statsDir)
+
+    def test_matchups_are_built_on_first_use(self):
+        stats = empty_stats(self.statsDir)
+        equations = StatEquations(*stats)
+        for obj in stats:
+            self.assertEqual(obj.loaded, set())
+        self.assertRaises((IOError, OSError), equations.matchups.get, 'BOS')
+
+    def test_rates_are_built_on_first_use(self):
+        stats = empty_stats(self.statsDir)
+        equations = StatEquations(*stats)
+        self.assertEqual(equations.rates.features, None)
+        self.assertRaises((IOError, OSError), equations.pitcher_expected_ip, 'arm')
+
+
+class RateFeaturesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+        self.stats = empty_stats(self.statsDir)
+        player_stats = self.stats[0]
+        player_stats.stats.set('starter', 'ip_total', 2014, 180.0)
+        player_stats.stats.set('starter', 'gs_total', 2014, 30.0)
+        player_stats.stats.set('reliever', 'ip_total', 2014, 60.0)
+        player_stats.stats.set('reliever', 'gs_total', 2014, 0.0)
+        player_stats.set_loaded()
+
+    def tearDown(self):
+        shutil.rmtree(self.statsDir)
+
+    def test_missing_or_undefined_rates_are_nan(self):
+        equations = StatEquations(*self.stats)
+        self.assertEqual(equations.pitcher_expected_ip('starter'), 6.0)
+        self.assertTrue(math.isnan(equations.pitcher_expected_ip('reliever')))
+        self.assertTrue(math.isnan(equations.pitcher_expected_ip('nobody')))
+        self.assertTrue(math.isnan(equations.rates.get('starter', 'exp_ab', 2014)))
+
+
+class ScoreManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+        self.stats = make_stats(self.statsDir)
+        self.players = players(self.stats[0])
+
+    def tearDown(self):
+        shutil.rmtree(self.statsDir)
+
+    def test_matches_get_score(self):
+        equations = StatEquations(*self.stats)
+        components, totals = equations.score_many(self.players)
+        scores = [equations.get_score(player) for player in self.players]
+        self.assertTrue(np.isfinite(totals).all())
+        np.testing.assert_allclose(totals, scores, rtol=1e-12)
+
+    def test_reads_only_the_families_it_uses(self):
+        player_stats = self.stats[0]
+        player_stats.loaded.discard('catcher_fielding')
+        equations = StatEquations(*self.stats)
+        components, totals = equations.score_many(self.players)
+        self.assertTrue(np.isfinite(totals).all())
+        self.assertFalse('catcher_fielding' in player_stats.loaded)
+
+    def test_no_home_or_away_split_without_a_matchup_side(self):
+        team_stats = self.stats[1]
+        del team_stats.info['NYY']['home_or_away']
+        equations = StatEquations(*self.stats)
+        components, totals = equations.score_many(['pitcher NYY', 'pitcher BOS'])
+        er = StatEquations.SCORE_COMPONENTS.index('er')
+        self.assertTrue(math.isnan(components[0, er]))
+        self.assertFalse(math.isnan(components[1, er]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from stat_parsers.loader_registry import read_table, get_parse_counts, clear_tables
+from stat_parsers.player_stats import PlayerStats
+from stat_parsers.team_stats import (TeamStats, get_teams, get_team_espn_code, get_team_location,
+                                     get_team_mascot, get_team_by_city, get_team_by_mascot, resolve_team)
+
+
+class InfoLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.statsDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.statsDir)
+
+    def test_unknown_names_are_not_added(self):
+        player_stats = PlayerStats(self.statsDir, offline=True)
+        player_stats.info['mike trout']['team'] = 'LAA'
+        player_stats.set_loaded()
+        self.assertEqual(player_stats.get_team('mike trout'), 'LAA')
+        for getter in (player_stats.get_team, player_stats.get_batting_hand, player_stats.get_throwing_hand,
+                       player_stats.get_fielding_position, player_stats.get_player_salary,
+                       player_stats.get_player_starting_status):
+            self.assertEqual(getter('nobody'), None)
+        self.assertEqual(player_stats.info.keys(), ['mike trout'])
+
+        team_stats = TeamStats(self.statsDir)
+        team_stats.set_loaded()
+        self.assertEqual(team_stats.get_opponent('XXX'), None)
+        self.assertEqual(team_stats.get_home_or_away('XXX'), None)
+        self.assertEqual(len(team_stats.info), 0)
+
+
+class TeamLookupTest(unittest.TestCase):
+
+    def test_every_team_resolves(self):
+        for team in get_teams():
+            self.assertEqual(resolve_team(team), team)
+            self.assertEqual(resolve_team(get_team_espn_code(team)), team)
+            self.assertEqual(resolve_team(get_team_mascot(team)), team)
+            self.assertEqual(resolve_team('%s %s' % (get_team_location(team), get_team_mascot(team))), team)
+            self.assertEqual(get_team_by_mascot(get_team_mascot(team)), team)
+
+    def test_names(self):
+        cases = [(' bos ', 'BOS'), ('Kan', 'KAN'),
+                 ('LAD', 'LOS'), ('chw', 'CWS'), ('SD', 'SDP'), ('SF', 'SFG'),
+                 ('Dodgers', 'LOS'), ('blue jays', 'TOR'),
+                 ('Los Angeles Angels', 'LAA'), ('new york mets', 'NYM'), ('St Louis Cardinals', 'STL'),
+                 ('KC', 'KAN'), ('TB', 'TAM'), ('WSH', 'WAS'), ('WSN', 'WAS'), ('D-backs', 'ARI'),
+                 ('Boston', 'BOS'), ('kansas city', 'KAN')]
+        for name, team in cases:
+            self.assertEqual(resolve_team(name), team)
+
+    def test_ambiguous_or_unknown_names(self):
+        # a city with two teams, or LA for either Los Angeles team
+        for name in ('Los Angeles', 'New York', 'Chicago', 'LA', 'Jays', 'XYZ', ''):
+            self.assertEqual(resolve_team(name), None)
+
+    def test_city_and_mascot(self):
+        self.assertEqual(get_team_by_city('Boston'), 'BOS')
+        self.assertEqual(get_team_by_city(' tampa bay '), 'TAM')
+        for city in ('Los Angeles', 'new york', 'Chicago', 'Brooklyn'):
+            self.assertEqual(get_team_by_city(city), None)
+        self.assertEqual(get_team_by_mascot('white sox'), 'CWS')
+        self.assertEqual(get_team_by_mascot('Sox'), None)
+
+
+class ReadTableTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_tables()
+        self.statsDir = tempfile.mkdtemp()
+        self.path = os.path.join(self.statsDir, 'table.csv')
+        self.write('name,hr\nmike trout,36\n', 1000000000)
+
+    def tearDown(self):
+        clear_tables()
+        shutil.rmtree(self.statsDir)
+
+    def write(self, text, mtime):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_second_read_is_reused(self):
+        header, rows = read_table(self.path)
+        self.assertEqual(header, ('name', 'hr'))
+        self.assertEqual(rows, [('mike trout', '36')])
+        self.assertTrue(read_table(self.path)[1] is rows)
+        self.assertEqual(get_parse_counts(), {'parsed': 1, 'reused': 1})
+
+    def test_changed_mtime_is_parsed_again(self):
+        read_table(self.path)
+        self.write('name,hr\nmike trout,41\n', 1000000060)
+        self.assertEqual(read_table(self.path)[1], [('mike trout', '41')])
+        self.assertEqual(get_parse_counts(), {'parsed': 2, 'reused': 0})
+
+    def test_header_options_are_cached_separately(self):
+        self.assertEqual(read_table(self.path, header=False), (None, [('name', 'hr'), ('mike trout', '36')]))
+        self.assertEqual(read_table(self.path, header=True), (('name', 'hr'), [('mike trout', '36')]))
+        self.assertEqual(get_parse_counts(), {'parsed': 2, 'reused': 0})
+        self.assertEqual(read_table(self.path, header=False)[0], None)
+        self.assertEqual(read_table(self.path, header=True)[0], ('name', 'hr'))
+        self.assertEqual(get_parse_counts(), {'parsed': 2, 'reused': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
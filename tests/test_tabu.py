@@ -0,0 +1,40 @@
+from collections import Counter
+import random
+import unittest
+
+from tabu import TabuSearch
+from tests.pools import SMALL_COMP, CAPACITY, TEAM_COMP, random_pool, all_teams, team_of, sample_pool
+
+
+class TabuSearchTest(unittest.TestCase):
+
+    def test_against_brute_force(self):
+        rnd = random.Random(23)
+        optimal = pools = 0
+        for trial in range(300):
+            names, classes, values, costs, capacity = random_pool(rnd)
+            lineup = TabuSearch(names, classes, values, costs, capacity, SMALL_COMP).find_solution()
+            teams = all_teams(classes, values, costs, capacity, SMALL_COMP)
+            if not teams:
+                self.assertEqual(lineup, None)
+                continue
+
+            # always a valid team, never better than the optimum, and mostly the optimum
+            team = team_of(names, lineup)
+            self.assertEqual(Counter(classes[i] for i in team), Counter(SMALL_COMP))
+            self.assertTrue(lineup.cost < capacity)
+            self.assertAlmostEqual(lineup.value, sum(values[i] for i in team))
+            self.assertTrue(lineup.value <= teams[0][0] + 1e-9)
+            pools += 1
+            optimal += abs(lineup.value - teams[0][0]) < 1e-9
+        self.assertTrue(optimal >= 0.9 * pools)
+
+    def test_sample_slate(self):
+        pool = sample_pool() + (CAPACITY, TEAM_COMP)
+        lineup = TabuSearch(*pool).find_solution()
+        self.assertAlmostEqual(lineup.value, 105.58)
+        self.assertEqual(TabuSearch(*pool).find_solution(), lineup)
+
+
+if __name__ == '__main__':
+    unittest.main()